@@ -1,4 +1,5 @@
 from .strike import BoundedInstance, Algorithm
+from .batch import BatchAlgorithm
 import numpy as np
 
 
@@ -25,3 +26,30 @@ class FastGreedy(Algorithm):
         else:
             self.CC += f_ceil * p_i
             return f_ceil
+
+
+class FastGreedyBatch(BatchAlgorithm):
+    algorithm = FastGreedy
+
+    def setup(self):
+        self.p_max = self.B.p_max
+        self.p_min = self.B.p_max
+        self.CC = np.zeros(self.B.N)
+
+    def decide(self, i: int, n_i: np.ndarray, s_i: np.ndarray, p_i: np.ndarray, h_i: np.ndarray) -> np.ndarray:
+        if i == self.B.m:
+            return np.minimum(n_i, s_i)
+        # Same operations in the same order as FastGreedy.decide, so the
+        # floating point decisions are identical.
+        self.p_min = np.minimum(self.p_min, p_i)
+        numer = (self.p_max - self.p_min) * n_i - (self.p_min - 1) * self.CC
+        denom = self.p_max + p_i * self.p_min - p_i - self.p_min
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f_est = np.where(denom != 0, np.maximum(0, numer / denom), n_i)
+        worst_cost = (lambda f_i:
+            np.maximum((self.CC + p_i * f_i + self.p_max * (n_i - f_i)) / (self.p_min * self.B.n),
+                       (self.CC + p_i * f_i + n_i - f_i) / self.B.n))
+        f_floor, f_ceil = np.floor(f_est), np.ceil(f_est)
+        f_i = np.where(worst_cost(f_floor) < worst_cost(f_ceil), f_floor, f_ceil)
+        self.CC = self.CC + f_i * p_i
+        return f_i
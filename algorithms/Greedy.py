@@ -1,12 +1,21 @@
 from .strike import BoundedInstance, Algorithm
+from .batch import BatchAlgorithm
+from bisect import bisect_left
 import numpy as np
 
 class GreedyOnline(Algorithm):
+    """
+    Buy the number of tickets f_i that minimizes the worst-case ratio
+    max(a(f_i), b(f_i)), where a (the price goes up to p_max from now on) is
+    decreasing in f_i and b (the price drops to 1 from now on) is increasing
+    in f_i when p_i >= 1 + h_i, and decreasing otherwise.
+    Both are evaluated exactly like np.argmin over all f_i in 0..n_i would,
+    but the minimizer is found by bisection in O(log n_i).
+    """
     def setup(self):
         assert isinstance(self.I, BoundedInstance)
         self.p_max = self.I.p_max
-        self.hcumsum = [0]
-        self.mineffprice = self.p_max
+        self.hcumsum = 0
         self.mineffprice = self.p_max
         self.CC = 0
 
@@ -14,13 +23,62 @@ class GreedyOnline(Algorithm):
         if i >= self.I.m:
             return min(n_i, s_i)
         else:
-            self.mineffprice = p_i + self.hcumsum[-1]
-            self.hcumsum.append(self.hcumsum[-1] + h_i)
-            ns = np.linspace(0, n_i, n_i+1)
-            cs = np.maximum((self.CC+p_i*ns+(self.p_max+h_i)*(n_i-ns))
-                            / (self.mineffprice*self.I.n),
-                            (self.CC+p_i*ns+(1+h_i)*(n_i-ns))
-                            / ((np.minimum(self.mineffprice,1+self.hcumsum[-1]))*self.I.n))
-            f_i = np.argmin(cs) # number tickets to buy
+            self.mineffprice = p_i + self.hcumsum
+            self.hcumsum += h_i
+            a = lambda f: ((self.CC+p_i*f+(self.p_max+h_i)*(n_i-f))
+                           / (self.mineffprice*self.I.n))
+            b = lambda f: ((self.CC+p_i*f+(1+h_i)*(n_i-f))
+                           / (min(self.mineffprice,1+self.hcumsum)*self.I.n))
+            worst = lambda f: max(a(f), b(f))
+            fs = range(n_i+1)
+            # worst is a before the crossing point and b from there on.
+            f_cross = bisect_left(fs, True, key=lambda f: a(f) <= b(f)) if p_i >= 1 + h_i else n_i+1
+            if f_cross <= n_i and (f_cross == 0 or b(f_cross) < a(f_cross-1)):
+                f_i = f_cross
+            else:
+                # Smallest f_i on the decreasing part that attains the minimum,
+                # like np.argmin picks the first of equal values.
+                target = worst(f_cross-1)
+                f_i = bisect_left(fs, True, hi=f_cross, key=lambda f: worst(f) <= target)
             self.CC += f_i * p_i + (n_i - f_i) * h_i
             return f_i
+
+
+def first(pred, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Smallest f in [lo, hi] with pred(f), or hi + 1, for every row; pred must be monotone."""
+    hi = hi + 1
+    while np.any(active := lo < hi):
+        mid = (lo + hi) // 2
+        t = pred(mid)
+        hi = np.where(active & t, mid, hi)
+        lo = np.where(active & ~t, mid + 1, lo)
+    return lo
+
+
+class GreedyOnlineBatch(BatchAlgorithm):
+    algorithm = GreedyOnline
+
+    def setup(self):
+        self.p_max = self.B.p_max
+        self.hcumsum = np.zeros(self.B.N, dtype=int)
+        self.CC = np.zeros(self.B.N, dtype=int)
+
+    def decide(self, i: int, n_i: np.ndarray, s_i: np.ndarray, p_i: np.ndarray, h_i: np.ndarray) -> np.ndarray:
+        if i >= self.B.m:
+            return np.minimum(n_i, s_i)
+        mineffprice = p_i + self.hcumsum
+        self.hcumsum = self.hcumsum + h_i
+        n_i = n_i.astype(int)
+        a = lambda f: ((self.CC+p_i*f+(self.p_max+h_i)*(n_i-f))
+                       / (mineffprice*self.B.n))
+        b = lambda f: ((self.CC+p_i*f+(1+h_i)*(n_i-f))
+                       / (np.minimum(mineffprice,1+self.hcumsum)*self.B.n))
+        worst = lambda f: np.maximum(a(f), b(f))
+        zero = np.zeros_like(n_i)
+        # Same case analysis as GreedyOnline.decide, for all rows at once.
+        f_cross = np.where(p_i >= 1 + h_i, first(lambda f: a(f) <= b(f), zero, n_i), n_i+1)
+        at_cross = (f_cross <= n_i) & ((f_cross == 0) | (b(f_cross) < a(f_cross-1)))
+        target = worst(f_cross-1)
+        f_i = np.where(at_cross, f_cross, first(lambda f: worst(f) <= target, zero, f_cross-1))
+        self.CC = self.CC + f_i * p_i + (n_i - f_i) * h_i
+        return f_i
@@ -1,4 +1,10 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Iterable
 from .strike import Algorithm, BoundedInstance
+from .batch import BatchAlgorithm, InstanceBatch
+from .offline import offline_batch
+from .store import InstanceStore
 import numpy as np
 
 class QThreshold(Algorithm):
@@ -20,3 +26,101 @@ class QThreshold(Algorithm):
 
     def decide(self, i: int, n_i: int, s_i: int, p_i: int, h_i: int) -> int:
         return min(s_i, n_i) if i == self.I.m or p_i <= self.threshold else 0
+
+
+class QThresholdBatch(BatchAlgorithm):
+    algorithm = QThreshold
+
+    def setup(self, q: float | np.ndarray) -> None:
+        self.threshold = np.floor(q * self.B.p_max)
+
+    def decide(self, i: int, n_i: np.ndarray, s_i: np.ndarray, p_i: np.ndarray, h_i: np.ndarray) -> np.ndarray:
+        if i == self.B.m:
+            return np.minimum(s_i, n_i)
+        return np.where(p_i <= self.threshold, np.minimum(s_i, n_i), 0)
+
+
+# For s[i] = n and h[i] = 0, QThreshold sends everybody on the first day before
+# the last with p[i] <= floor(q * p_max), or else on the last day. Only the days
+# whose price is a new prefix minimum can ever be that first day: with records
+# v_1 > v_2 > ... > v_K, the cost is n * v_k for v_k <= q * p_max < v_(k-1), and
+# n * p[m] below v_K. So the cost of every q follows from the prefix minima.
+
+def _records(B: InstanceBatch) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Row and price of every prefix-minimum record on days 1..m-1, in day order,
+    with the cost per person just below that price (the next record, or p[m]).
+    """
+    assert np.all(B.s == B.n[:, None]) and np.all(B.h == 0), "only for s[i] = n and h[i] = 0"
+    prefix = np.minimum.accumulate(B.p[:, :-1], axis=1)
+    record = np.ones(prefix.shape, dtype=bool)
+    record[:, 1:] = prefix[:, 1:] < prefix[:, :-1]
+    rows, days = np.nonzero(record)
+    v = prefix[rows, days]
+    last = np.ones(len(rows), dtype=bool)
+    last[:-1] = rows[1:] != rows[:-1]
+    below = np.where(last, B.p[rows, -1], np.roll(v, -1))
+    return rows, v, below
+
+
+def _breakpoints(v: np.ndarray, p_max: np.ndarray) -> np.ndarray:
+    """The smallest floats q with floor(q * p_max) >= v, exactly as QThreshold rounds."""
+    q = v / p_max
+    while np.any(low := np.floor(q * p_max) < v):
+        q = np.where(low, np.nextafter(q, np.inf), q)
+    while np.any(high := np.floor(np.nextafter(q, 0) * p_max) >= v):
+        q = np.where(high, np.nextafter(q, 0), q)
+    return q
+
+
+def threshold_curve(I: BoundedInstance) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The cost of QThreshold(I, q) for every q at once: ascending breakpoints
+    q[0] = 0 < q[1] < ... and the cost for q[k] <= q < q[k+1].
+    """
+    rows, v, below = _records(InstanceBatch.from_instances([I]))
+    return np.r_[0, _breakpoints(v[::-1], I.p_max)], I.n * np.r_[I.p[-1], v[::-1]]
+
+
+@dataclass(frozen=True)
+class ThresholdCurve:
+    """Mean competitive ratio of QThreshold over a corpus for every q: ratio[k] on q[k] <= q < q[k+1]."""
+    q: np.ndarray
+    ratio: np.ndarray
+    N: int
+
+    def __call__(self, q: float | np.ndarray) -> float | np.ndarray:
+        return self.ratio[np.searchsorted(self.q, q, side='right') - 1]
+
+    def best(self) -> tuple[float, float]:
+        """The q with the lowest mean ratio (the middle of its interval) and that ratio."""
+        k = int(np.argmin(self.ratio))
+        upper = self.q[k + 1] if k + 1 < len(self.q) else self.q[k] + 1
+        return float((self.q[k] + upper) / 2), float(self.ratio[k])
+
+
+def corpus_curve(instances: InstanceBatch | InstanceStore | Iterable[BoundedInstance],
+                 opt: np.ndarray | None = None) -> ThresholdCurve:
+    """
+    The ThresholdCurve of a corpus with s[i] = n and h[i] = 0, in O(m log m)
+    per instance instead of one run of QThreshold per instance and candidate q.
+    opt optionally holds the offline costs of the instances, in corpus order.
+    """
+    if isinstance(instances, InstanceBatch):
+        batches = [(np.arange(instances.N), instances)]
+    else:
+        if not isinstance(instances, InstanceStore):
+            instances = InstanceStore.from_instances(instances)
+        batches = instances.batches()
+    base, qs, steps, N = 0.0, [], [], 0
+    for ks, B in batches:
+        opt_B = offline_batch(B.n, B.s, B.p, B.h) if opt is None else np.asarray(opt)[ks]
+        rows, v, below = _records(B)
+        base += float(np.sum(B.n * B.p[:, -1] / opt_B))
+        qs.append(_breakpoints(v, B.p_max[rows]))
+        steps.append(B.n[rows] * (v - below) / opt_B[rows])
+        N += B.N
+    assert N > 0, "need at least one instance"
+    q, inverse = np.unique(np.concatenate(qs), return_inverse=True)
+    step = np.bincount(inverse, np.concatenate(steps), len(q))
+    return ThresholdCurve(np.r_[0, q], (base + np.r_[0, np.cumsum(step)]) / N, N)
@@ -1,4 +1,7 @@
 from .strike import RandomAlgorithm, BoundedInstance
+from .batch import BatchAlgorithm
+from .streams import default_generator
+from collections import Counter
 import numpy as np
 
 
@@ -6,12 +9,37 @@ class Random(RandomAlgorithm):
     """
     Basic randomized algoithm, aka the "haha randint go brrrrr"-algorithm.
     """
-    def setup(self) -> None:
+    exact_supported = True
+
+    def setup(self, rng: np.random.Generator | None = None) -> None:
         assert isinstance(self.I, BoundedInstance)
-        rng = np.random.default_rng()
-        self.decisions = [0] * self.I.m
-        for i in rng.integers(0, self.I.m, size=self.I.n):
-            self.decisions[i] += 1
+        self.rng = default_generator() if rng is None else rng
 
     def decide(self, i: int, n_i: int, s_i: int, p_i: int, h_i: int) -> int:
+        if i == 1:
+            # Every person flies on a uniformly random day, drawn anew for every run.
+            # A Counter keeps this O(n) in memory, however long the horizon.
+            self.decisions = Counter(self.rng.integers(0, self.I.m, size=self.I.n).tolist())
         return self.decisions[i-1]
+
+    def buy_probabilities(self) -> np.ndarray:
+        # Someone still left on day i picked one of the days i..m uniformly.
+        return 1 / np.arange(self.I.m, 0, -1)
+
+
+class RandomBatch(BatchAlgorithm):
+    algorithm = Random
+
+    def setup(self, rng: np.random.Generator | list[np.random.Generator] | None = None) -> None:
+        if isinstance(rng, (list, tuple)):
+            # One generator per row, drawn from exactly as Random draws from it.
+            assert len(rng) == self.B.N, "need one generator per instance"
+            self.decisions = np.array([np.bincount(g.integers(0, self.B.m, size=n), minlength=self.B.m)
+                                       for g, n in zip(rng, self.B.n.tolist())]).reshape(self.B.N, self.B.m)
+            return
+        rng = default_generator() if rng is None else rng
+        # The number of people per day is multinomial over the m days.
+        self.decisions = rng.multinomial(self.B.n, np.full(self.B.m, 1 / self.B.m))
+
+    def decide(self, i: int, n_i: np.ndarray, s_i: np.ndarray, p_i: np.ndarray, h_i: np.ndarray) -> np.ndarray:
+        return self.decisions[:, i-1]
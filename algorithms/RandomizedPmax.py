@@ -1,4 +1,6 @@
 from .strike import RandomAlgorithm, BoundedInstance
+from .batch import BatchAlgorithm
+from .streams import default_generator
 import numpy as np
 
 
@@ -6,11 +8,13 @@ class RandomizedPmax(RandomAlgorithm):
     """
     Send the more people home the lower the ratio between the current seat price and the max price is
     """
-    def setup(self, alpha, beta):
+    exact_supported = True
+
+    def setup(self, alpha, beta, rng: np.random.Generator | None = None):
         assert isinstance(self.I, BoundedInstance)
         assert 0 <= alpha <= 1
         assert 0 <= beta <= 1
-        self.rng = np.random.default_rng()
+        self.rng = default_generator() if rng is None else rng
         self.p_max = self.I.p_max
         self.alpha = alpha # alpha \in (0,1) alpha*floor(sqrt(pmax)) will be right bound of interval
         self.beta = beta # beta \in (0,1) floor(sqrt(pmax)) + beta*(pmax - floor(sqrt(pmax))) will be right bound of interval
@@ -39,3 +43,36 @@ class RandomizedPmax(RandomAlgorithm):
             else: #self.b <= p_i
                 probability_buy = 0
             return self.rng.binomial(n_i, probability_buy) # number tickets to buy
+
+    def buy_probabilities(self) -> np.ndarray:
+        assert self.I.s[-1] >= self.I.n, "everybody has to fit on the last day"
+        p = np.array(self.I.p, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            q = np.where(p < self.a, 1, np.where(p < self.b, 1/(self.a - self.b) * p - self.b / (self.a - self.b), 0))
+        q[-1] = 1
+        return np.clip(q, 0, 1)
+
+
+class RandomizedPmaxBatch(BatchAlgorithm):
+    algorithm = RandomizedPmax
+
+    def setup(self, alpha, beta, rng: np.random.Generator | list[np.random.Generator] | None = None):
+        assert 0 <= alpha <= 1
+        assert 0 <= beta <= 1
+        # With one generator per row, every row draws exactly as RandomizedPmax would.
+        assert not isinstance(rng, (list, tuple)) or len(rng) == self.B.N, "need one generator per instance"
+        self.rng = default_generator() if rng is None else rng
+        p_max_round = np.floor(np.sqrt(self.B.p_max))
+        self.a = alpha * p_max_round
+        self.b = p_max_round + beta*(self.B.p_max - p_max_round)
+
+    def decide(self, i: int, n_i: np.ndarray, s_i: np.ndarray, p_i: np.ndarray, h_i: np.ndarray) -> np.ndarray:
+        if i == self.B.m:
+            return np.minimum(n_i, s_i)
+        a, b = self.a, self.b
+        with np.errstate(divide='ignore', invalid='ignore'):
+            probability_buy = np.where(p_i < a, 1, np.where(p_i < b, 1/(a - b) * p_i - b / (a - b), 0))
+        probability_buy = np.clip(probability_buy, 0, 1)
+        if isinstance(self.rng, (list, tuple)):
+            return np.array([g.binomial(n, q) for g, n, q in zip(self.rng, n_i.tolist(), probability_buy.tolist())])
+        return self.rng.binomial(n_i, probability_buy)
@@ -0,0 +1,241 @@
+from __future__ import annotations
+import copy
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import numpy as np
+from .strike import Algorithm, RandomAlgorithm, BoundedInstance
+from .batch import InstanceBatch, ratios
+
+
+@dataclass(frozen=True)
+class Witness:
+    ratio: float  # Competitive ratio of the algorithm on I
+    I: BoundedInstance
+
+
+def mutate(p: np.ndarray, h: np.ndarray, p_max: int, h_max: int,
+           rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Apply one random mutation to every row of the (K, m) prices and hotel costs:
+    a new uniform price, an extreme price (1 or p_max), a small step, a swap of
+    two days, or (if h_max > 0) a new hotel cost.
+    """
+    K, m = p.shape
+    p, h = p.copy(), h.copy()
+    rows = np.arange(K)
+    day, other = rng.integers(0, m, K), rng.integers(0, m, K)
+    kind = rng.integers(0, 5 if h_max > 0 else 4, K)
+    step = max(1, p_max // 10)
+    p_day = p[rows, day]
+    p_new = np.select([kind == 0, kind == 1, kind == 2, kind == 3],
+                      [rng.integers(1, p_max + 1, K),
+                       np.where(rng.random(K) < 0.5, 1, p_max),
+                       np.clip(p_day + rng.integers(-step, step + 1, K), 1, p_max),
+                       p[rows, other]],
+                      p_day)
+    swap = kind == 3
+    p[rows[swap], other[swap]] = p_day[swap]
+    p[rows, day] = p_new
+    hotel = kind == 4
+    h[rows[hotel], day[hotel]] = rng.integers(0, h_max + 1, hotel.sum())
+    return p, h
+
+
+def anneal(algorithm: type[Algorithm], n: int, m: int, p_max: int, h_max: int,
+           args: tuple = (), kwargs: dict | None = None, chains: int = 64, steps: int = 1000,
+           t0: float = 0.5, t1: float = 1e-3, keep: int = 10,
+           rng: np.random.Generator | None = None) -> list[Witness]:
+    """
+    Simulated annealing over the prices and hotel costs (s[i] = n), with
+    `chains` independent chains evaluated as one batch per step. The
+    temperature decays geometrically from t0 to t1; t0 = 0 is plain local
+    search. Returns the `keep` highest-ratio instances seen.
+    """
+    kwargs = {} if kwargs is None else kwargs
+    rng = np.random.default_rng() if rng is None else rng
+    evaluate = lambda p, h: ratios(algorithm, InstanceBatch(
+        np.full(chains, n), np.full((chains, m), n), p, h, np.full(chains, p_max), np.full(chains, h_max)),
+        args, kwargs)
+
+    p = rng.integers(1, p_max + 1, size=(chains, m))
+    h = rng.integers(0, h_max + 1, size=(chains, m))
+    ratio = evaluate(p, h)
+    best: dict[bytes, tuple[float, np.ndarray, np.ndarray]] = {}
+
+    def record(ratio, p, h):
+        for k in np.argsort(-ratio)[:keep]:
+            best[p[k].tobytes() + h[k].tobytes()] = (float(ratio[k]), p[k], h[k])
+
+    record(ratio, p, h)
+    for step in range(steps):
+        T = t0 * (t1 / t0) ** (step / max(1, steps - 1)) if t0 > 0 else 0
+        p_new, h_new = mutate(p, h, p_max, h_max, rng)
+        ratio_new = evaluate(p_new, h_new)
+        accept = ratio_new >= ratio
+        if T > 0:
+            with np.errstate(over='ignore'):
+                accept |= rng.random(chains) < np.exp((ratio_new - ratio) / T)
+        p = np.where(accept[:, None], p_new, p)
+        h = np.where(accept[:, None], h_new, h)
+        ratio = np.where(accept, ratio_new, ratio)
+        record(ratio_new, p_new, h_new)
+
+    top = sorted(best.values(), key=lambda x: -x[0])[:keep]
+    return [Witness(r, BoundedInstance(n, m, [n] * m, p_k.tolist(), h_k.tolist(), p_max, h_max))
+            for r, p_k, h_k in top]
+
+
+def search(algorithm: type[Algorithm], n: int, m: int, p_max: int, h_max: int,
+           args: tuple = (), kwargs: dict | None = None, restarts: int = 8, workers: int | None = None,
+           seed: int | None = None, keep: int = 10, **options) -> list[Witness]:
+    """
+    Run independent annealing restarts on a process pool, each with its own
+    child of the seed, and merge their best instances. Options go to anneal().
+    """
+    seeds = np.random.SeedSequence(seed).spawn(restarts)
+    jobs = [(algorithm, n, m, p_max, h_max,
+             dict(args=args, kwargs=kwargs, keep=keep, rng=np.random.default_rng(s), **options))
+            for s in seeds]
+    if workers == 1:
+        results = list(map(_anneal, jobs))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_anneal, jobs))
+    best = {}
+    for witnesses in results:
+        for witness in witnesses:
+            best[(tuple(witness.I.p), tuple(witness.I.h))] = witness
+    return sorted(best.values(), key=lambda w: -w.ratio)[:keep]
+
+
+def _anneal(job):
+    algorithm, n, m, p_max, h_max, options = job
+    return anneal(algorithm, n, m, p_max, h_max, **options)
+
+
+# For s[i] = n and h[i] = 0 (the setting of QThreshold's analysis), the worst
+# case of a deterministic algorithm is a finite game: every day the adversary
+# picks p[i] in [1, p_max] and the algorithm answers with f[i]. OPT is n times
+# the lowest price, so the ratio at the end only depends on the accumulated
+# cost and the prefix minimum, and Game searches the states
+# (day, remaining people, prefix minimum, cost, state of the algorithm).
+
+def _state(algorithm: Algorithm) -> tuple:
+    """The attributes of the algorithm (except the instance), hashable."""
+    freeze = lambda v: ((v.dtype.str, v.shape, v.tobytes()) if isinstance(v, np.ndarray) else
+                        tuple(map(freeze, v)) if isinstance(v, (list, tuple)) else
+                        tuple(sorted((k, freeze(x)) for k, x in v.items())) if isinstance(v, dict) else v)
+    return tuple(sorted((k, freeze(v)) for k, v in vars(algorithm).items() if v is not algorithm.I))
+
+
+def _copy(algorithm: Algorithm) -> Algorithm:
+    """A copy that decide() can change independently, sharing the instance."""
+    if all(isinstance(v, (int, float, str, bytes, tuple, np.generic, type(None)))
+           for k, v in vars(algorithm).items() if v is not algorithm.I):
+        return copy.copy(algorithm)  # Much faster, and enough for scalar attributes
+    return copy.deepcopy(algorithm, {id(algorithm.I): algorithm.I})
+
+
+class Game:
+    """
+    Memoized search of the adversary game of one deterministic algorithm. The
+    algorithm is run on an OpenInstance, so it cannot look at future prices,
+    and it is copied for every move, so it may keep any state. Two states of
+    the algorithm are the same if all its attributes are equal.
+
+    The value of a state is the highest ratio the adversary can still force.
+    It grows with the cost and shrinks with the prefix minimum, so among the
+    moves that lead to the same remaining people and algorithm state only
+    those that are not dominated on both are searched. Once everybody has
+    flown, the adversary just ends with price 1.
+    """
+    def __init__(self, algorithm: type[Algorithm], n: int, m: int, p_max: int,
+                 args: tuple = (), kwargs: dict | None = None) -> None:
+        assert not issubclass(algorithm, RandomAlgorithm), "only deterministic algorithms"
+        from .session import OpenInstance
+        self.I = OpenInstance.open(n, m, p_max, 0)
+        self.algorithm, self.args, self.kwargs = algorithm, args, kwargs or {}
+        self.memo: dict[tuple, tuple[float, int]] = {}  # state -> (value, best price)
+
+    def root(self) -> Algorithm:
+        return self.algorithm(self.I, *self.args, **self.kwargs)
+
+    def moves(self, i: int, r: int, p_min: int, cost: float,
+              algorithm: Algorithm) -> list[tuple[int, int, int, float, Algorithm]]:
+        """The moves (p, r, p_min, cost, algorithm after day i + 1) that are not dominated."""
+        groups = {}
+        for p in range(1, self.I.p_max + 1):
+            child = _copy(algorithm)
+            f = child.decide(i + 1, r, self.I.n, p, 0)
+            assert 0 <= f <= r and f == int(f), "f[i] must be an integer between 0 and n[i]"
+            assert i + 1 < self.I.m or f == r, "r[m-1] must be 0"
+            move = (p, r - int(f), min(p_min, p), cost + f * p, child)
+            groups.setdefault((move[1], _state(child)), []).append(move)
+        front = []
+        for group in groups.values():
+            # Highest cost first, then lowest prefix minimum, then lowest price.
+            group.sort(key=lambda move: (-move[3], move[2], move[0]))
+            lowest = None
+            for move in group:
+                if lowest is None or move[2] < lowest:
+                    front.append(move)
+                    lowest = move[2]
+        return sorted(front, key=lambda move: move[0])
+
+    def value(self, i: int, r: int, p_min: int, cost: float, algorithm: Algorithm) -> float:
+        """The worst ratio the adversary can force from after day i."""
+        if r == 0:
+            return cost / (self.I.n * (p_min if i == self.I.m else 1))
+        key = (i, r, p_min, cost, _state(algorithm))
+        if key not in self.memo:
+            best = (-1.0, 0)
+            for p, r_, p_min_, cost_, child in self.moves(i, r, p_min, cost, algorithm):
+                v = self.value(i + 1, r_, p_min_, cost_, child)
+                if v > best[0]:
+                    best = (v, p)
+            self.memo[key] = best
+        return self.memo[key][0]
+
+    def witness(self, prefix: tuple[int, ...] = ()) -> Witness:
+        """The worst-case ratio and an instance that attains it, after the given first prices."""
+        I, algorithm = self.I, self.root()
+        r, p_min, cost, p = I.n, I.p_max + 1, 0, list(prefix)
+        for i, p_i in enumerate(prefix):
+            f = algorithm.decide(i + 1, r, I.n, p_i, 0)
+            r, p_min, cost = r - int(f), min(p_min, p_i), cost + f * p_i
+        ratio = self.value(len(p), r, p_min, cost, algorithm)
+        while len(p) < I.m:
+            if r == 0:
+                p += [1] * (I.m - len(p))
+                break
+            p_i = self.memo[(len(p), r, p_min, cost, _state(algorithm))][1]
+            f = algorithm.decide(len(p) + 1, r, I.n, p_i, 0)
+            r, p_min, cost = r - int(f), min(p_min, p_i), cost + f * p_i
+            p.append(p_i)
+        return Witness(ratio, BoundedInstance(I.n, I.m, [I.n] * I.m, p, [0] * I.m, I.p_max, 0))
+
+
+def worst_case(algorithm: type[Algorithm], n: int, m: int, p_max: int, args: tuple = (),
+               kwargs: dict | None = None, workers: int | None = None) -> Witness:
+    """
+    The exact worst-case ratio of a deterministic algorithm over all instances
+    with s[i] = n, h[i] = 0 and prices in [1, p_max], with a witness instance.
+    The subtrees of the first day's prices are searched on a process pool.
+    Unlike anneal() and search() this is a guarantee, but the number of states
+    grows quickly, so it is only for small n, m and p_max.
+    """
+    game = Game(algorithm, n, m, p_max, args, kwargs)
+    first = [p for p, *_ in game.moves(0, n, p_max + 1, 0, game.root())]
+    jobs = [(algorithm, n, m, p_max, args, kwargs, p) for p in first]
+    if workers == 1:
+        witnesses = list(map(_worst_case, jobs))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            witnesses = list(pool.map(_worst_case, jobs))
+    # The first of the worst, so the witness does not depend on the workers.
+    return max(witnesses, key=lambda witness: witness.ratio)
+
+
+def _worst_case(job) -> Witness:
+    algorithm, n, m, p_max, args, kwargs, p = job
+    return Game(algorithm, n, m, p_max, args, kwargs).witness((p,))
@@ -0,0 +1,216 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from hashlib import blake2b
+from typing import Iterable
+import numpy as np
+from .strike import Instance, BoundedInstance, Algorithm, RandomAlgorithm
+from .offline import offline_batch
+
+
+@dataclass(frozen=True)
+class InstanceBatch:
+    """
+    N instances with the same number of days m, stored as arrays.
+    Row k of every (N, m) array is instance k; p_max and h_max are per row.
+    """
+    n: np.ndarray  # (N,) number of people
+    s: np.ndarray  # (N, m) number of seats on day i
+    p: np.ndarray  # (N, m) price of a seat on day i
+    h: np.ndarray  # (N, m) hotel cost on day i
+    p_max: np.ndarray  # (N,) upper bound on p
+    h_max: np.ndarray  # (N,) upper bound on h
+
+    def __post_init__(self) -> None:
+        assert self.s.ndim == 2, "s, p, h must be (N, m) arrays"
+        assert self.s.shape == self.p.shape == self.h.shape, "s, p, h must have the same shape"
+        assert self.n.shape == self.p_max.shape == self.h_max.shape == (self.N,), \
+            "n, p_max, h_max must have length N"
+        assert self.m >= 1, "m must be at least 1"
+        assert np.all(self.n >= 1), "n must be at least 1"
+        assert np.all(self.p >= 1), "p[i] must be at least 1"
+        assert np.all(self.s >= 1), "s[i] must be at least 1"
+        assert np.all(self.h >= 0), "h[i] must be at least 0"
+        assert np.all(self.s.sum(axis=1) >= self.n), "sum(s) must be at least n"
+        assert np.all(self.p <= self.p_max[:, None]), "p[i] must be at most p_max"
+        assert np.all(self.h <= self.h_max[:, None]), "h[i] must be at most h_max"
+
+    @classmethod
+    def from_instances(cls, instances: Iterable[Instance]) -> InstanceBatch:
+        """Stack instances with equal m. Plain Instances are bounded by their own maxima."""
+        instances = list(instances)
+        assert len(instances) >= 1, "need at least one instance"
+        assert len({I.m for I in instances}) == 1, "all instances must have the same m"
+        s = np.array([I.s for I in instances])
+        p = np.array([I.p for I in instances])
+        h = np.array([I.h for I in instances])
+        p_max = np.array([I.p_max if isinstance(I, BoundedInstance) else max(I.p) for I in instances])
+        h_max = np.array([I.h_max if isinstance(I, BoundedInstance) else max(I.h) for I in instances])
+        return cls(np.array([I.n for I in instances]), s, p, h, p_max, h_max)
+
+    @classmethod
+    def random(cls, N: int, n: int, m: int, p_max: int, h_max: int,
+               rng: np.random.Generator | None = None) -> InstanceBatch:
+        """Vectorized BoundedInstance.random for N instances at once."""
+        rng = np.random.default_rng() if rng is None else rng
+        s = np.full((N, m), n)
+        p = rng.integers(1, p_max + 1, size=(N, m))
+        h = rng.integers(0, h_max + 1, size=(N, m))
+        return cls(np.full(N, n), s, p, h, np.full(N, p_max), np.full(N, h_max))
+
+    @classmethod
+    def repeat(cls, I: Instance, N: int) -> InstanceBatch:
+        """N copies of one instance, as read-only views of a single row."""
+        row = lambda x: np.broadcast_to(np.asarray(x), (N, I.m))
+        bounded = isinstance(I, BoundedInstance)
+        return cls(np.full(N, I.n), row(I.s), row(I.p), row(I.h),
+                   np.full(N, I.p_max if bounded else max(I.p)),
+                   np.full(N, I.h_max if bounded else max(I.h)))
+
+    @property
+    def N(self) -> int:
+        return self.s.shape[0]
+
+    @property
+    def m(self) -> int:
+        return self.s.shape[1]
+
+    def __len__(self) -> int:
+        return self.N
+
+    def digests(self) -> list[str]:
+        """BoundedInstance.digest of every row."""
+        rows = np.concatenate([self.n[:, None], np.full((self.N, 1), self.m), self.s, self.p, self.h,
+                               self.p_max[:, None], self.h_max[:, None]], axis=1).astype('<i8')
+        return [blake2b(row.tobytes(), digest_size=16).hexdigest() for row in rows]
+
+    def take(self, ks: np.ndarray) -> InstanceBatch:
+        """The batch of the selected rows."""
+        return InstanceBatch(self.n[ks], self.s[ks], self.p[ks], self.h[ks], self.p_max[ks], self.h_max[ks])
+
+    def __getitem__(self, k: int) -> BoundedInstance:
+        return BoundedInstance(int(self.n[k]), self.m,
+                               self.s[k].tolist(), self.p[k].tolist(), self.h[k].tolist(),
+                               int(self.p_max[k]), int(self.h_max[k]))
+
+    def __iter__(self) -> Iterable[BoundedInstance]:
+        return (self[k] for k in range(self.N))
+
+
+@dataclass(frozen=True)
+class BatchSolution:
+    B: InstanceBatch
+    f: np.ndarray  # (N, m)
+    r: np.ndarray  # (N, m)
+    cost: np.ndarray  # (N,)
+
+    def __post_init__(self) -> None:
+        assert self.f.shape == self.r.shape == self.B.s.shape, "f and r must have shape (N, m)"
+        assert np.all(self.f >= 0), "f[i] must be at least 0"
+        assert np.all(self.r >= 0), "r[i] must be at least 0"
+        assert np.all(self.f.sum(axis=1) == self.B.n), "sum(f) must be n"
+        assert np.all(self.r[:, -1] == 0), "r[m-1] must be 0"
+
+
+# Maps a scalar Algorithm subclass to its vectorized counterpart.
+BATCH_ALGORITHMS: dict[type[Algorithm], type[BatchAlgorithm]] = {}
+
+
+class BatchAlgorithm(ABC):
+    """
+    Vectorized counterpart of an Algorithm. decide() is called once per day
+    with (N,) arrays holding day i of every instance in the batch, and must
+    return the same decisions as the scalar algorithm, so that the costs match
+    exactly. Subclasses set `algorithm` to the scalar class they mirror.
+    """
+    algorithm: type[Algorithm]
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if 'algorithm' in cls.__dict__:
+            BATCH_ALGORITHMS[cls.algorithm] = cls
+
+    @classmethod
+    def name(cls) -> str:
+        return cls.algorithm.name()
+
+    def __init__(self, B: InstanceBatch, *args, **kwargs) -> None:
+        self.__B = B
+        self.setup(*args, **kwargs)
+
+    @property
+    def B(self) -> InstanceBatch:
+        return self.__B
+
+    @abstractmethod
+    def setup(self, *args, **kwargs) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def decide(self, i: int, n_i: np.ndarray, s_i: np.ndarray,
+               p_i: np.ndarray, h_i: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def solution(self) -> BatchSolution:
+        B = self.B
+        f = np.empty(B.s.shape, dtype=float)
+        r = np.empty(B.s.shape, dtype=float)
+        n_i = B.n
+        # Accumulate the cost day by day, in the same order as Solution.no_cost,
+        # so that floating point decisions give bit-identical costs.
+        cost = 0
+        for i in range(B.m):
+            r_i = n_i - self.decide(i + 1, n_i, B.s[:, i], B.p[:, i], B.h[:, i])
+            f_i = n_i - r_i
+            cost = cost + (f_i * B.p[:, i] + B.h[:, i] * r_i)
+            f[:, i], r[:, i] = f_i, r_i
+            n_i = r_i
+        return BatchSolution(B, f, r, cost)
+
+
+def batch(algorithm: type[Algorithm]) -> type[BatchAlgorithm]:
+    """Look up the vectorized counterpart of an algorithm."""
+    # Importing the modules registers their batch algorithms.
+    from . import Qthreshold, FastGreedy, Greedy, Random, RandomizedPmax  # noqa: F401
+    if algorithm not in BATCH_ALGORITHMS:
+        raise KeyError(f"no batch implementation of {algorithm.name()}")
+    return BATCH_ALGORITHMS[algorithm]
+
+
+def offline(B: InstanceBatch) -> BatchSolution:
+    """Vectorized algorithms.offline.offline."""
+    cost, f, r = offline_batch(B.n, B.s, B.p, B.h, fr=True)
+    return BatchSolution(B, f, r, cost)
+
+
+def ratios(algorithm: type[Algorithm], B: InstanceBatch, args: tuple = (), kwargs: dict | None = None,
+           opt: np.ndarray | None = None, streams=None, statistics: bool = False) -> np.ndarray:
+    """
+    Competitive ratio of the algorithm on every instance of the batch: its
+    (expected) cost divided by the optimum, which is computed if not given.
+    Deterministic algorithms run on the whole batch at once, or instance by
+    instance if they have no batch version. Randomized ones run instance by
+    instance: exactly if they are exact_supported, and otherwise simulated
+    (from the streams, a streams.Streams, if given).
+    With statistics, returns an (N, 4) array of the mean, std, min and max of
+    the ratio over the runs instead.
+    """
+    kwargs = {} if kwargs is None else kwargs
+    opt = offline_batch(B.n, B.s, B.p, B.h) if opt is None else np.asarray(opt)
+    if issubclass(algorithm, RandomAlgorithm):
+        cost = []
+        for I in B:
+            runs = algorithm(I, *args, **kwargs)
+            runs = runs.exact().cost if algorithm.exact_supported else \
+                runs.solution(vectorized=True, streams=streams).cost
+            cost.append([runs.mean, runs.std, runs.min, runs.max])
+        cost = np.array(cost, dtype=float).reshape(-1, 4)
+    else:
+        try:
+            mean = batch(algorithm)(B, *args, **kwargs).solution().cost
+        except KeyError:
+            mean = [algorithm(I, *args, **kwargs).solution().cost for I in B]
+        mean = np.asarray(mean, dtype=float)
+        cost = np.stack([mean, np.zeros_like(mean), mean, mean], axis=1)
+    ratio = cost / opt[:, None]
+    return ratio if statistics else ratio[:, 0]
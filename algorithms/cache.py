@@ -0,0 +1,96 @@
+from __future__ import annotations
+import json
+import sqlite3
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Any, Iterable
+from .strike import Instance, Solution
+from .offline import offline
+
+OFFLINE_CACHE_SIZE = 2**16
+
+
+class _Content:
+    """Key for the offline cache: only the days matter, not the bounds."""
+    __slots__ = ('I', 'digest')
+
+    def __init__(self, I: Instance) -> None:
+        self.I = I
+        self.digest = Instance.digest(I)
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Content) and self.digest == other.digest
+
+
+@lru_cache(maxsize=OFFLINE_CACHE_SIZE)
+def _offline(content: _Content) -> Solution:
+    return offline(content.I)
+
+
+def offline_cached(I: Instance) -> Solution:
+    """offline(I), memoized on the content of I in a process-wide LRU cache."""
+    return _offline(_Content(I))
+
+
+offline_cached.cache_info = _offline.cache_info
+offline_cached.cache_clear = _offline.cache_clear
+
+
+class ResultCache:
+    """
+    On-disk, content-addressed cache of results, keyed by the algorithm, its
+    parameters, the seed and the digest of the instance. Backed by SQLite, so
+    several processes can share it and an interrupted sweep can resume.
+    Values are anything that JSON can store.
+    """
+    def __init__(self, file: str, timeout: float = 60) -> None:
+        self.db = sqlite3.connect(file, timeout=timeout)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.db.commit()
+
+    @staticmethod
+    def key(algorithm: str, params: Iterable = (), seed: int | None = None,
+            digest: str = '') -> str:
+        data = json.dumps([algorithm, list(params), seed, digest], default=repr)
+        return blake2b(data.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self.db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """The cached values of those keys that are present."""
+        found = {}
+        for k in range(0, len(keys), 500):  # SQLite limits the number of parameters
+            chunk = keys[k:k + 500]
+            rows = self.db.execute(
+                f"SELECT key, value FROM results WHERE key IN ({','.join('?' * len(chunk))})", chunk)
+            found.update((key, json.loads(value)) for key, value in rows)
+        return found
+
+    def put(self, key: str, value: Any) -> None:
+        self.put_many({key: value})
+
+    def put_many(self, items: dict[str, Any]) -> None:
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?)",
+                                ((key, json.dumps(value)) for key, value in items.items()))
+
+    def __contains__(self, key: str) -> bool:
+        return self.db.execute("SELECT 1 FROM results WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> ResultCache:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
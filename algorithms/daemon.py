@@ -0,0 +1,232 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Iterator, TextIO
+import numpy as np
+from .strike import Algorithm, Instance, BoundedInstance
+from .registry import get
+from . import files
+
+DONE = None  # Put on the queue when the input ends
+
+
+@dataclass
+class Request:
+    """What to solve, with which algorithm, and where to write the schedules."""
+    id: Any
+    instances: list[Instance]
+    algorithm: str
+    params: dict[str, float] = field(default_factory=dict)
+    output: str | None = None  # File name in the output directory
+
+
+def parse(line: str, number: int, algorithm: str) -> Request:
+    """
+    One JSON line: {"path": "input/1"}, {"text": "<instance file contents>"} or
+    {"instance": {"n": .., "m": .., "s": [..], "p": [..], "h": [..]}} (with
+    optional p_max and h_max), plus optional "id", "algorithm", "params" and
+    "output". A line that is not JSON is taken as a path. The output must be a
+    plain file name, so a client cannot write outside the output directory.
+    """
+    line = line.strip()
+    data = json.loads(line) if line.startswith('{') else {"path": line}
+    output = data.get("output")
+    if "path" in data:
+        instances = list(files.load(data["path"]))
+        output = output or os.path.basename(data["path"])
+    elif "text" in data:
+        instances = list(files.parse(data["text"]))
+    else:
+        I = data["instance"]
+        if "p_max" in I:
+            instances = [BoundedInstance(I["n"], I["m"], I["s"], I["p"], I["h"], I["p_max"], I.get("h_max", max(I["h"])))]
+        else:
+            instances = [BoundedInstance(I["n"], I["m"], I["s"], I["p"], I["h"], max(I["p"]), max(I["h"]))]
+    assert output is None or (isinstance(output, str) and os.path.basename(output) == output
+                              and output not in ('', '.', '..')), f"output must be a file name, not {output!r}"
+    return Request(data.get("id", number), instances, get(data.get("algorithm", algorithm)).name,
+                   data.get("params", {}), output)
+
+
+def solve(job: tuple[str, dict, int | None, list[Instance]]) -> list[tuple[list[int], list[int], float]]:
+    """
+    Solve instances with the same m with one algorithm: (f, r, cost) per
+    instance. Deterministic algorithms with a batch version and offline run on
+    the whole group at once; randomized ones run one trajectory per instance,
+    from its own stream of the seed.
+    """
+    name, params, seed, instances = job
+    entry = get(name)
+    kwargs = [entry.kwargs(I, **params) for I in instances]
+    from .batch import InstanceBatch, batch
+    B = InstanceBatch.from_instances(instances)
+    if name == "offline":
+        from .offline import offline_batch
+        cost, f, r = offline_batch(B.n, B.s, B.p, B.h, fr=True)
+        return [(f_k.tolist(), r_k.tolist(), int(c)) for f_k, r_k, c in zip(f, r, cost)]
+    algorithm = entry.load()
+    if entry.randomized:
+        from .streams import Streams
+        streams = Streams(seed)
+        solutions = [Algorithm.solution(algorithm(I, **kw, rng=streams.generator(I, name)))
+                     for I, kw in zip(instances, kwargs)]
+        return [(list(map(int, s.f)), list(map(int, s.r)), float(s.cost)) for s in solutions]
+    try:
+        stacked = {key: np.array([kw[key] for kw in kwargs]) for key in kwargs[0]}
+        solution = batch(algorithm)(B, **stacked).solution()
+    except KeyError:
+        solutions = [algorithm(I, **kw).solution() for I, kw in zip(instances, kwargs)]
+        return [(list(map(int, s.f)), list(map(int, s.r)), float(s.cost)) for s in solutions]
+    return [(f_k.astype(np.int64).tolist(), r_k.astype(np.int64).tolist(), float(c))
+            for f_k, r_k, c in zip(solution.f, solution.r, solution.cost)]
+
+
+def process(requests: list[Request], pool: ProcessPoolExecutor | None,
+            seed: int | None) -> list[list[tuple[list[int], list[int], float]]]:
+    """Solve a batch of requests, grouped by algorithm, parameters and m across requests."""
+    groups: dict[tuple, list[tuple[int, int]]] = {}
+    for k, request in enumerate(requests):
+        key = (request.algorithm, json.dumps(request.params, sort_keys=True))
+        for j, I in enumerate(request.instances):
+            groups.setdefault((*key, I.m), []).append((k, j))
+    jobs = [(name, json.loads(params), seed, [requests[k].instances[j] for k, j in members])
+            for (name, params, _), members in groups.items()]
+    results = [[None] * len(request.instances) for request in requests]
+    for members, solutions in zip(groups.values(), pool.map(solve, jobs) if pool else map(solve, jobs)):
+        for (k, j), solution in zip(members, solutions):
+            results[k][j] = solution
+    return results
+
+
+def respond(request: Request, solutions: list, output: str | None, out: TextIO) -> None:
+    if output and request.output:
+        with open(os.path.join(output, request.output), 'w') as f:
+            f.write(''.join(f"{f_i}, {r_i}\n" for f, r, _ in solutions for f_i, r_i in zip(f, r)))
+    out.write(json.dumps({"id": request.id, "algorithm": request.algorithm,
+                          "solutions": [{"cost": cost, "f": f, "r": r} for f, r, cost in solutions]}) + "\n")
+
+
+def read_lines(stream: TextIO, requests: queue.Queue) -> None:
+    for line in stream:
+        if line.strip():
+            requests.put(line)
+    requests.put(DONE)
+
+
+def watch(directory: str, requests: queue.Queue, interval: float = 0.2) -> None:
+    """Queue every file that appears in (or changes in) the directory, once it stops changing."""
+    seen, pending = {}, {}
+    while True:
+        for entry in os.scandir(directory):
+            if not entry.is_file() or entry.name.startswith('.'):
+                continue
+            stamp = entry.stat().st_mtime_ns, entry.stat().st_size
+            if seen.get(entry.path) == stamp:
+                continue
+            if pending.get(entry.path) == stamp:
+                seen[entry.path] = stamp
+                requests.put(json.dumps({"path": entry.path}))
+            else:
+                pending[entry.path] = stamp
+        time.sleep(interval)
+
+
+def batches(requests: queue.Queue, size: int, linger: float) -> Iterator[list[str]]:
+    """Wait for a line, then collect more for at most linger seconds, up to size lines."""
+    while True:
+        line = requests.get()
+        if line is DONE:
+            return
+        lines, deadline = [line], time.monotonic() + linger
+        while len(lines) < size:
+            try:
+                line = requests.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if line is DONE:
+                yield lines
+                return
+            lines.append(line)
+        yield lines
+
+
+def serve(source: TextIO | None = sys.stdin, directory: str | None = None, output: str | None = 'output',
+          algorithm: str = 'offline', workers: int | None = 1, size: int = 256, linger: float = 0.002,
+          seed: int | None = None, out: TextIO = sys.stdout) -> None:
+    """
+    Solve requests until the input ends (or forever when watching a directory),
+    writing one JSON line per request to out and the schedules to output/. A
+    request that fails for any reason gets an {"id": .., "error": ..} line
+    instead, and the daemon carries on.
+    """
+    requests = queue.Queue()
+    if output:
+        # Schedules written to a watched directory would be solved as instances.
+        assert directory is None or not os.path.exists(output) or not os.path.samefile(directory, output), \
+            "the watched directory and the output directory must differ"
+        os.makedirs(output, exist_ok=True)
+    if source is not None:
+        threading.Thread(target=read_lines, args=(source, requests), daemon=True).start()
+    if directory is not None:
+        threading.Thread(target=watch, args=(directory, requests), daemon=True).start()
+    pool = ProcessPoolExecutor(workers) if workers != 1 else None
+    number = 0
+    try:
+        for lines in batches(requests, size, linger):
+            parsed = []
+            for line in lines:
+                number += 1
+                try:
+                    parsed.append(parse(line, number, algorithm))
+                except Exception as error:
+                    out.write(json.dumps({"id": number, "error": str(error)}) + "\n")
+            try:
+                results = process(parsed, pool, seed)
+            except Exception:
+                # Solve one by one, to report only the requests that fail.
+                results = []
+                for request in parsed:
+                    try:
+                        results.append(process([request], pool, seed)[0])
+                    except Exception as error:
+                        results.append(error)
+            for request, solutions in zip(parsed, results):
+                if not isinstance(solutions, Exception):
+                    try:
+                        respond(request, solutions, output, out)
+                        continue
+                    except Exception as error:
+                        solutions = error
+                out.write(json.dumps({"id": request.id, "error": str(solutions)}) + "\n")
+            out.flush()
+    finally:
+        if pool:
+            pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve instances from stdin (JSON lines or paths) "
+                                                 "or from a watched directory, without restarting.")
+    parser.add_argument("--watch", metavar="DIR", help="also solve every file that appears in DIR")
+    parser.add_argument("--no-stdin", action="store_true", help="do not read requests from stdin")
+    parser.add_argument("--output", default="output", help="directory for the schedules (default output)")
+    parser.add_argument("--algorithm", default="offline", help="default algorithm (default offline)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default 1)")
+    parser.add_argument("--batch", type=int, default=256, help="maximum requests per batch")
+    parser.add_argument("--linger", type=float, default=0.002,
+                        help="seconds to wait for more requests to batch (default 0.002)")
+    parser.add_argument("--seed", type=int, help="root seed of the randomized algorithms")
+    args = parser.parse_args()
+    serve(None if args.no_stdin else sys.stdin, args.watch, args.output, args.algorithm,
+          args.workers, args.batch, args.linger, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import numpy as np
+from .strike import Instance
+
+
+@dataclass(frozen=True)
+class Statistic:
+    """Exact mean, variance, min and max, like a WelfordArray over infinitely many runs."""
+    mean: np.ndarray
+    variance: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(np.maximum(self.variance, 0))
+
+    def __float__(self) -> float:
+        return float(self.mean)
+
+
+@dataclass(frozen=True)
+class ExactSolution:
+    I: Instance
+    people: np.ndarray  # (m+1, n+1): people[i, k] = P(k people left after day i)
+    f: Statistic  # (m,) statistics of f[i]
+    r: Statistic  # (m,) statistics of r[i]
+    cost: Statistic  # statistics of the total cost
+
+    def __iter__(self) -> zip[tuple[float, float]]:
+        return zip(self.f.mean, self.r.mean)
+
+
+def binomials(n: int, q: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (n+1, n+1) matrices with P(f = k | j people left) for f ~ Binomial(j, q)
+    in row j, and whether that probability is non-zero.
+    """
+    j, k = np.arange(n + 1)[:, None], np.arange(n + 1)[None, :]
+    if q <= 0 or q >= 1:
+        support = k == (j if q >= 1 else 0)
+        return support.astype(float), support
+    support = k <= j
+    log_factorial = np.concatenate([[0], np.cumsum(np.log(np.arange(1, n + 1)))])
+    log_pmf = (log_factorial[j] - log_factorial[k] - log_factorial[np.clip(j - k, 0, None)]
+               + k * np.log(q) + (j - k) * np.log1p(-q))
+    return np.where(support, np.exp(np.where(support, log_pmf, 0)), 0), support
+
+
+def propagate(I: Instance, q: np.ndarray) -> ExactSolution:
+    """
+    Exact statistics of an algorithm that, with j people left on day i,
+    lets each of them fly independently with probability q[i], i.e.
+    f[i] ~ Binomial(j, q[i]). This is RandomizedPmax (q[i] depends on p[i])
+    and Random (q[i] = 1 / (m - i)). The distribution of the number of people
+    left is propagated forward day by day, and the moments of the cost
+    backward, in O(m n^2).
+    """
+    n, m = I.n, I.m
+    q = np.asarray(q, dtype=float)
+    assert q.shape == (m,), "q must have length m"
+    assert q[-1] == 1, "everybody has to fly on the last day"
+    j, k = np.arange(n + 1)[:, None], np.arange(n + 1)[None, :]
+    left = np.clip(j - k, 0, None)  # people left after flying k out of j
+
+    # Forward: marginals of the number of people left, and where they are non-zero.
+    people = np.zeros((m + 1, n + 1))
+    people[0, n] = 1
+    support = np.zeros((m + 1, n + 1), dtype=bool)
+    support[0, n] = True
+    # The binomial matrices are rebuilt in both passes, so only one (n+1, n+1)
+    # matrix is alive at a time: O(n^2) memory instead of O(m n^2).
+    for i in range(m):
+        pmf, possible = binomials(n, q[i])
+        people[i + 1] = np.bincount(left.ravel(), (people[i][:, None] * pmf).ravel(), n + 1)
+        support[i + 1] = np.bincount(left.ravel(), (support[i][:, None] & possible).ravel(), n + 1) > 0
+
+    people_j = np.arange(n + 1)
+    before, after = people[:-1], people[1:]
+    f_mean = (before * people_j * q[:, None]).sum(axis=1)
+    f_square = (before * (people_j * q[:, None] * (1 - q[:, None]) + (people_j * q[:, None]) ** 2)).sum(axis=1)
+    supported = lambda values: np.where(support[:-1], values, np.nan)
+    f = Statistic(f_mean, f_square - f_mean ** 2,
+                  np.nanmin(supported(np.where(q[:, None] >= 1, people_j, 0)), axis=1),
+                  np.nanmax(supported(np.where(q[:, None] <= 0, 0, people_j)), axis=1))
+    r_mean = (after * people_j).sum(axis=1)
+    r = Statistic(r_mean, (after * people_j ** 2).sum(axis=1) - r_mean ** 2,
+                  np.nanmin(np.where(support[1:], people_j, np.nan), axis=1),
+                  np.nanmax(np.where(support[1:], people_j, np.nan), axis=1))
+
+    # Backward: moments, min and max of the cost from day i on, given j people left.
+    E1 = E2 = low = high = np.zeros(n + 1)
+    for i in reversed(range(m)):
+        pmf, possible = binomials(n, q[i])
+        day_cost = j * I.h[i] + k * (I.p[i] - I.h[i])
+        E1, E2 = ((pmf * (day_cost + E1[left])).sum(axis=1),
+                  (pmf * (day_cost ** 2 + 2 * day_cost * E1[left] + E2[left])).sum(axis=1))
+        low = np.where(possible, day_cost + low[left], np.inf).min(axis=1)
+        high = np.where(possible, day_cost + high[left], -np.inf).max(axis=1)
+    cost = Statistic(E1[n], E2[n] - E1[n] ** 2, low[n], high[n])
+    return ExactSolution(I, people, f, r, cost)
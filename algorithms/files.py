@@ -0,0 +1,171 @@
+from __future__ import annotations
+from typing import Iterable, Iterator
+import numpy as np
+from .strike import Instance
+from .store import InstanceStore, InstanceView
+
+
+def parse(text: str | bytes, source: str = "<text>", first: int = 0) -> InstanceStore:
+    """
+    Parse one or more instances in the input/ format (n, m, then m lines
+    "s, p, h"), written back to back, with a single NumPy call.
+    The instances are bounded by their own maximum p and h. Malformed text
+    raises a ValueError naming the source and the index of the instance
+    (counted from first).
+    """
+    if isinstance(text, bytes):
+        text = text.decode()
+    try:
+        tokens = np.fromstring(text.replace(',', ' '), dtype=np.int64, sep=' ')
+    except ValueError:
+        raise _not_an_integer(text, source, first) from None
+    # Only the headers have to be located one instance at a time.
+    starts, k = [], 0
+    while k < len(tokens):
+        if k + 2 > len(tokens):
+            raise _malformed(source, first + len(starts), "the header has no m")
+        if tokens[k + 1] < 1:
+            raise _malformed(source, first + len(starts), f"m is {tokens[k + 1]}, it must be at least 1")
+        starts.append(k)
+        k += 2 + 3 * int(tokens[k + 1])
+    if k > len(tokens):
+        raise _malformed(source, first + len(starts) - 1, f"it is truncated, m is {tokens[starts[-1] + 1]} "
+                         f"but there are only {len(tokens) - starts[-1] - 2} numbers for the days")
+    starts = np.array(starts, dtype=np.int64)
+    is_day = np.ones(len(tokens), dtype=bool)
+    is_day[starts] = is_day[starts + 1] = False
+    n, m = tokens[starts], tokens[starts + 1]
+    days = tokens[is_day].reshape(-1, 3)
+    s, p, h = days.T
+    if len(m) == 0:
+        return InstanceStore(n, m, n, n, s, p, h)
+    offsets = np.concatenate([[0], np.cumsum(m)[:-1]])
+    return InstanceStore(n, m, np.maximum.reduceat(p, offsets), np.maximum.reduceat(h, offsets),
+                         s, p, h)
+
+
+def _malformed(source: str, k: int, problem: str) -> ValueError:
+    return ValueError(f"{source}, instance {k}: {problem}")
+
+
+def _not_an_integer(text: str, source: str, first: int) -> ValueError:
+    """The error for the first token of the text that is not an integer, in plain Python (it is rare)."""
+    words = text.replace(',', ' ').split()
+    j = next((j for j, word in enumerate(words) if not word.lstrip('+-').isdigit()), None)
+    if j is None:
+        return _malformed(source, first, "it contains something that is not an integer")
+    k = index = 0
+    # Walk the headers before the token to find the instance it is in.
+    while j >= k + 2 and j >= (end := k + 2 + 3 * max(int(words[k + 1]), 0)):
+        k, index = end, index + 1
+    return _malformed(source, first + index, f"{words[j]!r} is not an integer")
+
+
+def load(*files: str) -> InstanceStore:
+    """Load instance files, e.g. the input/ corpus, into one InstanceStore."""
+    text = []
+    for file in files:
+        with open(file, 'r') as f:
+            text.append(f.read())
+    try:
+        return parse('\n'.join(text))
+    except ValueError:
+        # Parse the files one by one, so the error names the file and its instance.
+        for file, file_text in zip(files, text):
+            parse(file_text, file)
+        raise
+
+
+def days(file: str) -> tuple[int, int, Iterator[tuple[int, int, int]]]:
+    """
+    n, m and the days (s[i], p[i], h[i]) of an instance file, read one line at
+    a time, e.g. for offline_stream on instances too long to hold in memory.
+    """
+    with open(file, 'r') as f:
+        n, m = int(f.readline()), int(f.readline())
+
+    def stream():
+        # Opened only once the days are read, and closed when they are exhausted
+        # (or when the generator is closed or collected).
+        with open(file, 'r') as f:
+            f.readline(), f.readline()
+            for _ in range(m):
+                s_i, p_i, h_i = f.readline().split(',')
+                yield int(s_i), int(p_i), int(h_i)
+    return n, m, stream()
+
+
+def to_text(I: Instance) -> str:
+    return f"{I.n}\n{I.m}\n" + ''.join(f"{s_i}, {p_i}, {h_i}\n" for s_i, p_i, h_i in I)
+
+
+def write(file: str, instances: Iterable[Instance]) -> None:
+    """Write instances back to back in the input/ format; parse() reads them all."""
+    with open(file, 'w') as f:
+        for I in instances:
+            f.write(to_text(I))
+
+
+# A container is a header line with the number of instances and the position
+# of the index, the instances in the input/ format, and the index: the byte
+# offset of every instance and of the end of the last one, one per line.
+HEADER = "#strike-instances {:>20} {:>20}\n"
+
+
+def write_container(file: str, instances: Iterable[Instance]) -> None:
+    with open(file, 'wb') as f:
+        f.write(HEADER.format(0, 0).encode())
+        offsets = [f.tell()]
+        for I in instances:
+            f.write(to_text(I).encode())
+            offsets.append(f.tell())
+        f.write(''.join(f"{offset}\n" for offset in offsets).encode())
+        f.seek(0)
+        f.write(HEADER.format(len(offsets) - 1, offsets[-1]).encode())
+
+
+class Container:
+    """Random access to and streaming of the instances in a container file."""
+    def __init__(self, file: str) -> None:
+        self.file = open(file, 'rb')
+        try:
+            header = self.file.readline().split()
+            assert len(header) == 3 and header[0] == b'#strike-instances', \
+                f"{file} is not an instance container"
+            N, index = int(header[1]), int(header[2])
+            self.file.seek(index)
+            self.offsets = np.fromstring(self.file.read().decode(), dtype=np.int64, sep=' ')
+            assert len(self.offsets) == N + 1, f"{file} has a corrupt index"
+        except BaseException:
+            self.file.close()
+            raise
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> Container:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def read(self, start: int = 0, stop: int | None = None) -> InstanceStore:
+        """Parse instances start up to stop in one go."""
+        stop = len(self) if stop is None else stop
+        self.file.seek(self.offsets[start])
+        return parse(self.file.read(self.offsets[stop] - self.offsets[start]), self.file.name, start)
+
+    def __getitem__(self, k: int) -> InstanceView:
+        k = range(len(self))[k]
+        return self.read(k, k + 1)[0]
+
+    def __iter__(self) -> Iterator[InstanceView]:
+        return self.stream()
+
+    def stream(self, chunk: int = 1024) -> Iterator[InstanceView]:
+        """Yield all instances, parsing chunk of them at a time."""
+        for start in range(0, len(self), chunk):
+            yield from self.read(start, min(start + chunk, len(self)))
@@ -0,0 +1,142 @@
+from __future__ import annotations
+from statistics import NormalDist
+from typing import Callable, Iterator
+import numpy as np
+from .batch import InstanceBatch
+
+# A price model draws an (N, m) block of prices in [1, p_max].
+PriceModel = Callable[..., np.ndarray]
+PRICE_MODELS: dict[str, PriceModel] = {}
+ROUNDS = 16  # redraws of the rejected samples before falling back to an exact, slower method
+
+
+def price_model(function: PriceModel) -> PriceModel:
+    PRICE_MODELS[function.__name__] = function
+    return function
+
+
+def truncated_normal(rng: np.random.Generator, shape: tuple[int, ...], mu: float | np.ndarray,
+                     sigma: float, low: int, high: int) -> np.ndarray:
+    """
+    Normal samples rounded to integers, conditioned on lying in [low, high].
+    Samples outside are redrawn ROUNDS times; the few left (a mu far outside
+    [low, high] for sigma) are drawn by inverting the CDF, so it always ends.
+    """
+    mu = np.broadcast_to(mu, shape)
+    x = np.rint(rng.normal(mu, sigma)).astype(np.int64)
+    outside = (x < low) | (x > high)
+    for _ in range(ROUNDS):
+        if not outside.any():
+            return x
+        x[outside] = np.rint(rng.normal(mu[outside], sigma))
+        outside = (x < low) | (x > high)
+    x[outside] = [_inverse_cdf(rng, mu_i, sigma, low, high) for mu_i in mu[outside]]
+    return x
+
+
+def _inverse_cdf(rng: np.random.Generator, mu: float, sigma: float, low: int, high: int) -> int:
+    """One normal sample that rounds into [low, high], from the CDF of the interval."""
+    a, b = (low - 0.5 - mu) / sigma, (high + 0.5 - mu) / sigma
+    # Take the interval on the left of the mean, where the CDF is accurate far into the tail.
+    flip = a > 0
+    if flip:
+        a, b = -b, -a
+    lo, hi = NormalDist().cdf(a), NormalDist().cdf(b)
+    u = rng.uniform(lo, hi)
+    # All but no mass in the interval lies at the end nearest to the mean.
+    z = NormalDist().inv_cdf(u) if 0 < u < 1 and hi > lo else b
+    return int(np.clip(np.rint(mu + sigma * (-z if flip else z)), low, high))
+
+
+def reflect(x: np.ndarray, low: int, high: int) -> np.ndarray:
+    """Fold x into [low, high] by reflecting at the bounds."""
+    if high == low:
+        return np.full_like(x, low)
+    period = 2 * (high - low)
+    x = np.mod(x - low, period)
+    return low + np.where(x > high - low, period - x, x)
+
+
+@price_model
+def uniform(rng: np.random.Generator, N: int, m: int, p_max: int) -> np.ndarray:
+    return rng.integers(1, p_max + 1, size=(N, m))
+
+
+@price_model
+def normal(rng: np.random.Generator, N: int, m: int, p_max: int,
+           mu: float | None = None, sigma: float | None = None) -> np.ndarray:
+    """Truncated normal, by default centred in [1, p_max] with 3 standard deviations to either side."""
+    mu = (1 + p_max) / 2 if mu is None else mu
+    sigma = max((p_max - 1) / 6, 0.5) if sigma is None else sigma
+    return truncated_normal(rng, (N, m), mu, sigma, 1, p_max)
+
+
+@price_model
+def walk(rng: np.random.Generator, N: int, m: int, p_max: int, step: float = 0.05) -> np.ndarray:
+    """Random walk from a uniform start, with normal steps of step * p_max, reflected into [1, p_max]."""
+    start = rng.uniform(1, p_max, size=(N, 1))
+    steps = rng.normal(0, step * p_max, size=(N, m - 1))
+    x = np.concatenate([start, start + np.cumsum(steps, axis=1)], axis=1)
+    return np.clip(np.rint(reflect(x, 1, p_max)), 1, p_max).astype(np.int64)
+
+
+@price_model
+def seasonal(rng: np.random.Generator, N: int, m: int, p_max: int, period: float = 7,
+             amplitude: float = 0.25, noise: float = 0.05) -> np.ndarray:
+    """A sine of the given period (in days) and random phase around the middle price, plus noise."""
+    phase = rng.uniform(0, 2 * np.pi, size=(N, 1))
+    days = np.arange(m)[None, :]
+    mu = (1 + p_max) / 2 + amplitude * (p_max - 1) * np.sin(2 * np.pi * days / period + phase)
+    return truncated_normal(rng, (N, m), mu, max(noise * p_max, 0.5), 1, p_max)
+
+
+@price_model
+def spike(rng: np.random.Generator, N: int, m: int, p_max: int, base: float = 0.25,
+          probability: float = 0.1) -> np.ndarray:
+    """Prices uniform in [1, base * p_max], jumping to p_max with the given probability."""
+    p = rng.integers(1, max(1, int(base * p_max)) + 1, size=(N, m))
+    return np.where(rng.random((N, m)) < probability, p_max, p)
+
+
+def generate(N: int, n: int, m: int, p_max: int, h_max: int = 0, prices: str = 'uniform',
+             seats: tuple[int, int] | None = None, rng: np.random.Generator | None = None,
+             **params) -> InstanceBatch:
+    """
+    N random instances as one (N, m) block. The prices come from one of the
+    PRICE_MODELS with its params, hotel costs are uniform in [0, h_max] and
+    seats are n (or uniform in the seats range, conditioned on sum(s) >= n).
+    """
+    assert prices in PRICE_MODELS, f"prices must be one of {set(PRICE_MODELS)}"
+    rng = np.random.default_rng() if rng is None else rng
+    p = PRICE_MODELS[prices](rng, N, m, p_max, **params)
+    h = rng.integers(0, h_max + 1, size=(N, m))
+    s = np.full((N, m), n) if seats is None else _seats(rng, N, n, m, *seats)
+    return InstanceBatch(np.full(N, n), s, p, h, np.full(N, p_max), np.full(N, h_max))
+
+
+def _seats(rng: np.random.Generator, N: int, n: int, m: int, low: int, high: int) -> np.ndarray:
+    """Seats uniform in [low, high]; instances with sum(s) < n are redrawn (cheaply, so up to 64 * ROUNDS times)."""
+    assert 1 <= low <= high, "seats must be a range (low, high) with 1 <= low <= high"
+    assert high * m >= n, f"with at most {high} seats on each of {m} days, n = {n} people never fit"
+    s = rng.integers(low, high + 1, size=(N, m))
+    short = s.sum(axis=1) < n
+    for _ in range(64 * ROUNDS):
+        if not short.any():
+            return s
+        s[short] = rng.integers(low, high + 1, size=(int(short.sum()), m))
+        short = s.sum(axis=1) < n
+    assert not short.any(), f"seats in [{low}, {high}] rarely add up to n = {n} over {m} days, raise them"
+    return s
+
+
+def blocks(N: int, n: int, m: int, p_max: int, h_max: int = 0, block: int = 1 << 16,
+           seed: int | np.random.SeedSequence | None = None, **options) -> Iterator[InstanceBatch]:
+    """
+    N random instances in blocks of at most `block`. Block k is drawn from the
+    k-th child of the seed, so the blocks are independent streams and can be
+    generated in any order or in parallel with the same result.
+    """
+    seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    for k, start in enumerate(range(0, N, block)):
+        child = np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + (k,))
+        yield generate(min(block, N - start), n, m, p_max, h_max, rng=np.random.default_rng(child), **options)
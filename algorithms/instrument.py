@@ -0,0 +1,152 @@
+from __future__ import annotations
+import inspect
+import json
+import marshal
+from contextlib import contextmanager
+from time import perf_counter_ns
+from typing import Iterator
+import numpy as np
+from . import strike
+from .strike import Algorithm, Solution
+
+BINS = 64  # bin k holds durations of [2^(k-1), 2^k) nanoseconds
+
+
+class Histogram:
+    """Counts of durations in nanoseconds, in power-of-two bins."""
+    def __init__(self) -> None:
+        self.counts = np.zeros(BINS, dtype=np.int64)
+        self.total = 0
+
+    def add(self, ns: list[int]) -> None:
+        self.counts += np.bincount([x.bit_length() for x in ns], minlength=BINS)[:BINS]
+        self.total += sum(ns)
+
+    def merge(self, other: Histogram) -> Histogram:
+        self.counts += other.counts
+        self.total += other.total
+        return self
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bin holding quantile q, in nanoseconds."""
+        if self.count == 0:
+            return float('nan')
+        k = int(np.searchsorted(np.cumsum(self.counts), q * self.count))
+        return float(2 ** k)
+
+    def to_json(self) -> dict:
+        nonzero = np.flatnonzero(self.counts)
+        return {"count": self.count, "total_ns": self.total,
+                "mean_ns": self.total / self.count if self.count else None,
+                "p50_ns": self.quantile(0.5), "p99_ns": self.quantile(0.99),
+                "bins": {f"<{2 ** int(k)}": int(self.counts[k]) for k in nonzero}}
+
+
+class Record:
+    """What was measured for one algorithm."""
+    def __init__(self) -> None:
+        self.setup = Histogram()
+        self.decide = Histogram()
+        self.construct = Histogram()  # building and validating the Solution
+        self.iterations = Histogram()  # Monte Carlo runs per RandomAlgorithm.solution, not durations
+
+    def merge(self, other: Record) -> Record:
+        for name in ("setup", "decide", "construct", "iterations"):
+            getattr(self, name).merge(getattr(other, name))
+        return self
+
+
+class Recorder:
+    """
+    Timings of setup(), every decide() and the construction of the Solution,
+    and the number of Monte Carlo runs, per algorithm. Only active while
+    installed (see instrument()); otherwise the algorithms check a single
+    global once per setup() and solution() call.
+    """
+    def __init__(self) -> None:
+        self.records: dict[type[Algorithm], Record] = {}
+
+    def record(self, algorithm: type[Algorithm]) -> Record:
+        if algorithm not in self.records:
+            self.records[algorithm] = Record()
+        return self.records[algorithm]
+
+    def setup(self, algorithm: Algorithm, *args, **kwargs) -> None:
+        start = perf_counter_ns()
+        algorithm.setup(*args, **kwargs)
+        self.record(type(algorithm)).setup.add([perf_counter_ns() - start])
+
+    def solution(self, algorithm: Algorithm) -> Solution:
+        I, decide, clock = algorithm.I, algorithm.decide, perf_counter_ns
+        r, times, r_i = [], [], I.n
+        for i, (s_i, p_i, h_i) in enumerate(I, start=1):
+            start = clock()
+            r_i -= decide(i, r_i, s_i, p_i, h_i)
+            times.append(clock() - start)
+            r.append(r_i)
+        start = clock()
+        solution = Solution.from_r(I, r)
+        record = self.record(type(algorithm))
+        record.construct.add([clock() - start])
+        record.decide.add(times)
+        return solution
+
+    def iterations(self, algorithm: Algorithm, runs: int) -> None:
+        self.record(type(algorithm)).iterations.add([runs])
+
+    def merge(self, other: Recorder) -> Recorder:
+        """Combine the measurements of another process."""
+        for algorithm, record in other.records.items():
+            self.record(algorithm).merge(record)
+        return self
+
+    def to_json(self) -> dict:
+        return {algorithm.name(): {
+                    "setup": record.setup.to_json(),
+                    "decide": record.decide.to_json(),
+                    "construct": record.construct.to_json(),
+                    "iterations": {"solutions": record.iterations.count,
+                                   "runs": record.iterations.total},
+                } for algorithm, record in self.records.items()}
+
+    def dump_json(self, file: str) -> None:
+        with open(file, "w") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def dump_stats(self, file: str) -> None:
+        """
+        Write the timings in the format of cProfile's dump_stats, so that
+        pstats.Stats(file) and tools like snakeviz can read them. Every method
+        is one function, called from nowhere.
+        """
+        stats = {}
+        for algorithm, record in self.records.items():
+            for method, histogram in (("setup", record.setup), ("decide", record.decide)):
+                function = getattr(algorithm, method)
+                try:
+                    location = inspect.getsourcefile(function), inspect.getsourcelines(function)[1]
+                except (OSError, TypeError):
+                    location = "~", 0
+                seconds = histogram.total / 1e9
+                stats[(*location, f"{algorithm.name()}.{method}")] = (
+                    histogram.count, histogram.count, seconds, seconds, {})
+            seconds = record.construct.total / 1e9
+            stats[("~", 0, f"{algorithm.name()}.Solution")] = (
+                record.construct.count, record.construct.count, seconds, seconds, {})
+        with open(file, "wb") as f:
+            marshal.dump(stats, f)
+
+
+@contextmanager
+def instrument(recorder: Recorder | None = None) -> Iterator[Recorder]:
+    """Record all algorithms run in this process inside the with block."""
+    recorder = Recorder() if recorder is None else recorder
+    previous, strike.RECORDER = strike.RECORDER, recorder
+    try:
+        yield recorder
+    finally:
+        strike.RECORDER = previous
@@ -1,7 +1,14 @@
+from __future__ import annotations
 import sys
+import heapq
+from dataclasses import dataclass
+from typing import Iterable
 from .strike import Instance, Solution
 from itertools import accumulate, chain
 
+# offline() is plain Python; the other solvers import NumPy themselves, so that
+# solving one instance does not wait for it to load.
+
 
 def offline(I: Instance) -> Solution:
     n_i = I.n
@@ -12,6 +19,103 @@ def offline(I: Instance) -> Solution:
     return Solution.from_f(I, [f_i for _, f_i, _ in f])
 
 
+def offline_batch(n: np.ndarray, s: np.ndarray, p: np.ndarray, h: np.ndarray,
+                  fr: bool = False) -> np.ndarray | tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized offline for N stacked instances with the same m.
+    n has shape (N,), s, p and h have shape (N, m).
+    Returns the optimal costs, or (cost, f, r) if fr is True.
+    """
+    import numpy as np
+    n, s, p, h = (np.asarray(x, dtype=np.int64) for x in (n, s, p, h))
+    t = p + np.cumsum(h, axis=1) - h
+    # A stable sort breaks ties on the day index, exactly like sorted() in offline.
+    order = np.argsort(t, axis=1, kind='stable')
+    s_sorted = np.take_along_axis(s, order, axis=1)
+    seats_before = np.cumsum(s_sorted, axis=1) - s_sorted
+    f_sorted = np.clip(n[:, None] - seats_before, 0, s_sorted)
+    # Everybody flying on day i paid the hotel for all days before i, so the
+    # cost is the effective price times the number of people flying.
+    cost = (f_sorted * np.take_along_axis(t, order, axis=1)).sum(axis=1)
+    if not fr:
+        return cost
+    f = np.empty_like(f_sorted)
+    np.put_along_axis(f, order, f_sorted, axis=1)
+    r = n[:, None] - np.cumsum(f, axis=1)
+    return cost, f, r
+
+
+@dataclass(frozen=True)
+class SparseSolution:
+    """An offline solution as only the days on which people fly (ascending) and how many."""
+    n: int
+    m: int
+    days: np.ndarray
+    f: np.ndarray
+    cost: int
+
+    def to_solution(self, I: Instance) -> Solution:
+        import numpy as np
+        f = np.zeros(self.m, dtype=np.int64)
+        f[self.days] = self.f
+        return Solution.from_f(I, f.tolist())
+
+
+def _sparse(n: int, m: int, days: np.ndarray, s: np.ndarray, t: np.ndarray) -> SparseSolution:
+    """Fill the days, given in the order of their effective price t, until n people fly."""
+    import numpy as np
+    seats_before = np.cumsum(s) - s
+    f = np.clip(n - seats_before, 0, s)
+    used = f > 0
+    order = np.argsort(days[used])
+    return SparseSolution(n, m, days[used][order], f[used][order], int((f * t).sum()))
+
+
+def offline_select(n: int, s: np.ndarray, p: np.ndarray, h: np.ndarray) -> SparseSolution:
+    """
+    offline for very long horizons: instead of sorting all m days, select the
+    k cheapest days with a partial sort, doubling k until they cover n seats.
+    """
+    import numpy as np
+    s, p, h = (np.asarray(x, dtype=np.int64) for x in (s, p, h))
+    m = len(p)
+    t = p + np.cumsum(h) - h
+    k = min(m, max(1, n))
+    while True:
+        v = np.partition(t, k - 1)[k - 1]
+        # All days up to the k-th price, with ties in day order like sorted() in offline.
+        days = np.flatnonzero(t <= v)
+        days = days[np.argsort(t[days], kind='stable')]
+        if k == m or s[days].sum() >= n:
+            return _sparse(n, m, days, s[days], t[days])
+        k = min(m, 2 * k)
+
+
+def offline_stream(n: int, days: Iterable[tuple[int, int, int]]) -> SparseSolution:
+    """
+    offline over a stream of days (s[i], p[i], h[i]), e.g. read from a file one
+    line at a time. The effective prices are computed on the fly and a heap
+    keeps only the cheapest days that are needed to cover n seats, so the
+    memory is proportional to the number of days used, not to m.
+    """
+    heap = []  # (-t[i], -i, s[i]): the most expensive day, latest first on ties, on top
+    seats = hotel = m = 0
+    for i, (s_i, p_i, h_i) in enumerate(days):
+        t_i = p_i + hotel
+        hotel += h_i
+        m = i + 1
+        if seats >= n and (t_i, i) > (-heap[0][0], -heap[0][1]):
+            continue
+        heapq.heappush(heap, (-t_i, -i, s_i))
+        seats += s_i
+        while seats - heap[0][2] >= n:
+            seats -= heapq.heappop(heap)[2]
+    assert seats >= n, "there are not enough seats for everybody"
+    import numpy as np
+    heap = np.array(sorted(heap, reverse=True), dtype=np.int64).reshape(-1, 3)
+    return _sparse(n, m, -heap[:, 1], heap[:, 2], -heap[:, 0])
+
+
 if __name__ == "__main__":
     if len(sys.argv) != 2:
         print("Usage: python3 offline.py <instance>")
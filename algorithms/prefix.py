@@ -0,0 +1,135 @@
+from __future__ import annotations
+import heapq
+from math import inf
+import numpy as np
+from .strike import Instance
+
+
+class PrefixOptimum:
+    """
+    The offline optimum for n people over the days seen so far, kept up to date
+    as days are appended, in O(log m) per day instead of an offline run per
+    prefix. Appending a day never changes the effective price
+    t[i] = p[i] + h[0] + ... + h[i-1] of earlier days, so the optimum is always
+    the cheapest days (ties on the earliest) that cover n seats: a max-heap of
+    those, with only the most expensive one possibly partially used.
+
+    With revisable=True, the days that are not used are kept in a min-heap as
+    well, and revise() changes the price of an earlier day in O(log m).
+    Otherwise they are dropped, and memory is proportional to the days used.
+    """
+    def __init__(self, n: int, revisable: bool = False) -> None:
+        assert n >= 1, "n must be at least 1"
+        self.n = n
+        self.revisable = revisable
+        self.m = 0
+        self.hotel = 0  # h[0] + ... + h[m-1]
+        # Per day, only kept when revisable: hotel cost before it, seats, effective
+        # price, whether it is used, and the version of its latest heap entry.
+        # Older entries are stale and skipped.
+        self.before: list[int] = []
+        self.s: list[int] = []
+        self.t: list[int] = []
+        self.is_used: list[bool] = []
+        self.version: list[int] = []
+        self.used: list[tuple[int, int, int, int]] = []  # Max-heap of (-t[i], -i, s[i], version)
+        self.unused: list[tuple[int, int, int, int]] = []  # Min-heap of (t[i], i, s[i], version)
+        self.seats = 0  # Seats on the used days
+        self.total = 0  # Sum of s[i] * t[i] over the used days
+
+    @property
+    def feasible(self) -> bool:
+        return self.seats >= self.n
+
+    @property
+    def cost(self) -> float:
+        """Cost of the optimum so far, inf while there are not enough seats yet."""
+        if not self.feasible:
+            return inf
+        self._clean()
+        # Only the most expensive used day is not completely filled.
+        return self.total - (self.seats - self.n) * -self.used[0][0]
+
+    def append(self, s_i: int, p_i: int, h_i: int) -> float:
+        """Add the next day and return the new optimum."""
+        assert s_i >= 1, "s[i] must be at least 1"
+        i, t_i = self.m, p_i + self.hotel
+        if self.revisable:
+            self.before.append(self.hotel)
+            self.s.append(s_i)
+            self.t.append(t_i)
+            self.is_used.append(False)
+            self.version.append(0)
+        self.m += 1
+        self.hotel += h_i
+        self._use(t_i, i, s_i)
+        self._balance()
+        return self.cost
+
+    def revise(self, i: int, p_i: int) -> float:
+        """Change the price of day i (from 0) to p_i and return the new optimum."""
+        assert self.revisable, "revise() needs revisable=True"
+        assert 0 <= i < self.m, "unknown day"
+        if self.is_used[i]:
+            self.seats -= self.s[i]
+            self.total -= self.s[i] * self.t[i]
+        self._use(self.before[i] + p_i, i, self.s[i])
+        self._balance()
+        return self.cost
+
+    def f(self) -> dict[int, int]:
+        """The number of people flying on every used day (from 0)."""
+        days = sorted((-t_i, -i, s_i) for t_i, i, s_i, v in self.used if self._current(-i, v))
+        f, left = {}, self.n
+        for _, i, s_i in days:
+            if left > 0:
+                f[i] = min(left, s_i)
+                left -= f[i]
+        return f
+
+    def _current(self, i: int, v: int) -> bool:
+        return not self.revisable or self.version[i] == v
+
+    def _push(self, heap: list, entry: tuple[int, int, int], i: int) -> None:
+        v = 0
+        if self.revisable:
+            v = self.version[i] = self.version[i] + 1
+        heapq.heappush(heap, (*entry, v))
+
+    def _use(self, t_i: int, i: int, s_i: int) -> None:
+        self._push(self.used, (-t_i, -i, s_i), i)
+        if self.revisable:
+            self.t[i], self.is_used[i] = t_i, True
+        self.seats += s_i
+        self.total += s_i * t_i
+
+    def _clean(self) -> None:
+        """Pop stale entries off both heaps."""
+        while self.used and not self._current(-self.used[0][1], self.used[0][3]):
+            heapq.heappop(self.used)
+        while self.unused and not self._current(self.unused[0][1], self.unused[0][3]):
+            heapq.heappop(self.unused)
+
+    def _balance(self) -> None:
+        """Restore: the used days are the cheapest ones covering n seats, and no more."""
+        while True:
+            self._clean()
+            if self.unused and (not self.feasible or
+                                self.unused[0][:2] < (-self.used[0][0], -self.used[0][1])):
+                t_i, i, s_i, _ = heapq.heappop(self.unused)
+                self._use(t_i, i, s_i)
+            elif self.used and self.seats - self.used[0][2] >= self.n:
+                t_i, i, s_i, _ = heapq.heappop(self.used)
+                self.seats -= s_i
+                self.total -= s_i * -t_i
+                if self.revisable:
+                    self.is_used[-i] = False
+                    self._push(self.unused, (-t_i, -i, s_i), -i)
+            else:
+                return
+
+
+def prefix_costs(I: Instance) -> np.ndarray:
+    """The offline optimum of every prefix of I (inf while the seats do not cover n)."""
+    tracker = PrefixOptimum(I.n)
+    return np.array([tracker.append(s_i, p_i, h_i) for s_i, p_i, h_i in I], dtype=float)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from importlib import import_module
+from math import sqrt
+from typing import Any, Callable
+from .strike import Instance, BoundedInstance
+
+# A default parameter value, or a function of the instance giving it.
+Default = float | Callable[[BoundedInstance], float]
+
+
+@dataclass(frozen=True)
+class Entry:
+    """
+    A solver by name: where it lives, its parameters with their defaults, and
+    whether it is randomized. The module is only imported by load().
+    """
+    name: str
+    module: str
+    attribute: str
+    params: tuple[tuple[str, Default], ...] = ()
+    randomized: bool = False
+    description: str = ""
+
+    def load(self) -> Any:
+        return getattr(import_module(self.module, __package__), self.attribute)
+
+    def kwargs(self, I: Instance, **overrides: float) -> dict[str, float]:
+        """The parameters for I: the defaults, evaluated on I, updated with the overrides."""
+        unknown = set(overrides) - {name for name, _ in self.params}
+        assert not unknown, f"{self.name} has no parameters {sorted(unknown)}"
+        kwargs = {name: default(I) if callable(default) else default for name, default in self.params}
+        kwargs.update(overrides)
+        return kwargs
+
+
+REGISTRY: dict[str, Entry] = {}
+
+
+def register(entry: Entry) -> Entry:
+    REGISTRY[entry.name] = entry
+    return entry
+
+
+def get(name: str) -> Entry:
+    """The entry by name, ignoring case."""
+    for entry in REGISTRY.values():
+        if entry.name.lower() == name.lower():
+            return entry
+    raise KeyError(f"unknown algorithm {name!r}, choose from {sorted(REGISTRY)}")
+
+
+register(Entry("offline", ".offline", "offline", description="optimal offline solution"))
+register(Entry("QThreshold", ".Qthreshold", "QThreshold", (("q", lambda I: 1 / sqrt(I.p_max)),),
+               description="send everybody once p[i] <= q * p_max"))
+register(Entry("FastGreedy", ".FastGreedy", "FastGreedy", description="greedy on the worst-case ratio, closed form"))
+register(Entry("GreedyOnline", ".Greedy", "GreedyOnline", description="greedy on the worst-case ratio"))
+register(Entry("Random", ".Random", "Random", randomized=True,
+               description="everybody flies on a uniformly random day"))
+register(Entry("RandomizedPmax", ".RandomizedPmax", "RandomizedPmax", (("alpha", 0.9), ("beta", 0.1)),
+               randomized=True, description="fly with a probability decreasing in p[i]"))
@@ -0,0 +1,189 @@
+from __future__ import annotations
+import csv
+import json
+import os
+from typing import Any, Callable, Iterable
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+# One row per (instance, algorithm): the instance parameters, its number within
+# the cell, the algorithm with its parameters and the statistics of its ratio.
+SCHEMA: dict[str, np.dtype] = {
+    "n": np.dtype(np.int64),
+    "m": np.dtype(np.int64),
+    "p_max": np.dtype(np.int64),
+    "I": np.dtype(np.int64),
+    "algorithm": np.dtype(str),
+    "params": np.dtype(str),
+    "mean": np.dtype(np.float64),
+    "std": np.dtype(np.float64),
+    "min": np.dtype(np.float64),
+    "max": np.dtype(np.float64),
+}
+CHUNK = 1 << 16  # rows per chunk file
+INDEX = "index.json"
+
+Filter = Any | Iterable | Callable[[np.ndarray], np.ndarray]
+
+
+class ResultStore:
+    """
+    Append-only columnar store of results in a directory: rows are buffered
+    and written as chunks of typed columns (Parquet when pyarrow is available,
+    .npz otherwise). index.json lists the chunks with the range (or the set of
+    values) of every column, so filtered loads skip chunks that cannot match,
+    and only the requested columns are read from the others. With mode "a" the
+    rows are added to those already in the directory; mode "w" starts empty,
+    deleting the chunks and the index of an earlier run.
+    """
+    def __init__(self, directory: str, chunk: int = CHUNK, format: str | None = None, mode: str = "a") -> None:
+        assert mode in ("a", "w"), "mode must be 'a' or 'w'"
+        assert format in (None, "npz", "parquet"), "format must be 'npz' or 'parquet'"
+        assert format != "parquet" or pq is not None, "parquet needs pyarrow"
+        self.directory = directory
+        self.chunk = chunk
+        self.format = format or ("parquet" if pq is not None else "npz")
+        os.makedirs(directory, exist_ok=True)
+        self.chunks: list[dict] = []
+        if mode == "w":
+            # Also the chunks of a run that crashed before updating the index.
+            for file in os.listdir(directory):
+                if file.startswith("chunk-") or file in (INDEX, INDEX + ".tmp"):
+                    os.remove(self.path(file))
+        if os.path.exists(self.path(INDEX)):
+            with open(self.path(INDEX)) as f:
+                self.chunks = json.load(f)
+        self.buffer: dict[str, list] = {name: [] for name in SCHEMA}
+        self.buffered = 0
+
+    def path(self, file: str) -> str:
+        return os.path.join(self.directory, file)
+
+    def append(self, **columns: Any) -> None:
+        """Append rows given as columns of equal length; scalars are repeated."""
+        length = max((len(x) for x in columns.values() if np.ndim(x) > 0), default=1)
+        assert set(columns) == set(SCHEMA), f"columns must be {list(SCHEMA)}"
+        for name, x in columns.items():
+            x = np.asarray(x, dtype=SCHEMA[name])
+            assert x.ndim <= 1 and x.size in (1, length), f"column {name} has the wrong length"
+            self.buffer[name].append(np.broadcast_to(x, (length,)))
+        self.buffered += length
+        if self.buffered >= self.chunk:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows as a new chunk."""
+        if self.buffered == 0:
+            return
+        columns = {name: np.concatenate(parts) for name, parts in self.buffer.items()}
+        file = f"chunk-{len(self.chunks):06d}.{self.format}"
+        if self.format == "parquet":
+            pq.write_table(pa.table(columns), self.path(file))
+        else:
+            np.savez(self.path(file), **columns)
+        stats = {}
+        for name, x in columns.items():
+            if x.dtype.kind in "iuf":
+                stats[name] = [x.min().item(), x.max().item()]
+            else:
+                stats[name] = sorted(set(x.tolist()))
+        self.chunks.append({"file": file, "rows": len(columns["n"]), "stats": stats})
+        # The index is replaced atomically, so a crash loses at most the buffer.
+        with open(self.path(INDEX + ".tmp"), "w") as f:
+            json.dump(self.chunks, f)
+        os.replace(self.path(INDEX + ".tmp"), self.path(INDEX))
+        self.buffer = {name: [] for name in SCHEMA}
+        self.buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> ResultStore:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(chunk["rows"] for chunk in self.chunks) + self.buffered
+
+    def load(self, columns: Iterable[str] | None = None, **where: Filter) -> dict[str, np.ndarray]:
+        """
+        The selected columns (all by default) of the rows matching every filter.
+        A filter is a value, a list or set of values, or a function from the
+        column to a boolean mask, e.g. load(["n", "mean"], algorithm="QThreshold", m=10).
+        """
+        self.flush()
+        columns = list(SCHEMA) if columns is None else list(columns)
+        assert set(columns) | set(where) <= set(SCHEMA), "unknown column"
+        needed = list(dict.fromkeys(columns + list(where)))
+        parts = {name: [] for name in columns}
+        for chunk in self.chunks:
+            if not all(_may_match(chunk["stats"][name], test) for name, test in where.items()):
+                continue
+            data = self._read(chunk["file"], needed)
+            mask = np.ones(chunk["rows"], dtype=bool)
+            for name, test in where.items():
+                mask &= _matches(data[name], test)
+            for name in columns:
+                parts[name].append(data[name][mask])
+        return {name: np.concatenate(x) if x else np.empty(0, dtype=SCHEMA[name])
+                for name, x in parts.items()}
+
+    def _read(self, file: str, columns: list[str]) -> dict[str, np.ndarray]:
+        if file.endswith(".parquet"):
+            table = pq.read_table(self.path(file), columns=columns)
+            return {name: table.column(name).to_numpy().astype(SCHEMA[name]) for name in columns}
+        # Members of an .npz are only read when accessed.
+        with np.load(self.path(file)) as data:
+            return {name: data[name] for name in columns}
+
+
+def _matches(x: np.ndarray, test: Filter) -> np.ndarray:
+    if callable(test):
+        return np.asarray(test(x), dtype=bool)
+    if isinstance(test, (list, tuple, set, frozenset, np.ndarray, range)):
+        return np.isin(x, list(test))
+    return x == test
+
+
+def _may_match(stats: list, test: Filter) -> bool:
+    """Whether a chunk with these column statistics can contain a matching row."""
+    if callable(test):
+        return True
+    values = list(test) if isinstance(test, (list, tuple, set, frozenset, np.ndarray, range)) else [test]
+    if len(stats) == 2 and all(isinstance(x, (int, float)) for x in stats):
+        return any(stats[0] <= value <= stats[1] for value in values)
+    return any(value in stats for value in values)
+
+
+def import_csv(store: ResultStore, file: str, algorithm: str, params: str = "") -> None:
+    """Append a CSV file written by the old generate_data (n, m, p_max, I, mean, std, min, max)."""
+    with open(file, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = np.array(list(reader), dtype=float).reshape(-1, len(header))
+    columns = dict(zip(header, rows.T))
+    store.append(algorithm=algorithm, params=params,
+                 **{name: columns[name] for name in SCHEMA if name not in ("algorithm", "params")})
+
+
+def open_results(suffix: str, data: str = "data") -> ResultStore:
+    """
+    The ResultStore data/<suffix> written by generate_data. If it does not
+    exist yet, it is created from the old CSV files data/<algorithm>_<suffix>.csv.
+    """
+    directory = os.path.join(data, suffix)
+    if not os.path.exists(directory):
+        ending = f"_{suffix}.csv"
+        files = sorted(file for file in os.listdir(data) if file.endswith(ending))
+        with ResultStore(directory) as store:
+            for file in files:
+                import_csv(store, os.path.join(data, file), file[:-len(ending)])
+    return ResultStore(directory)
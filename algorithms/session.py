@@ -0,0 +1,89 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+from .strike import BoundedInstance, Algorithm
+from .prefix import PrefixOptimum
+
+
+@dataclass(frozen=True, eq=False)
+class OpenInstance(BoundedInstance):
+    """
+    What an online algorithm knows before the first day: n, m and the bounds.
+    s, p and h stay empty, the days are fed to an OnlineSession one at a time.
+    """
+    def __post_init__(self) -> None:
+        assert self.n >= 1, "n must be at least 1"
+        assert self.m >= 1, "m must be at least 1"
+        assert self.p_max >= 1, "p_max must be at least 1"
+        assert self.h_max >= 0, "h_max must be at least 0"
+
+    @classmethod
+    def open(cls, n: int, m: int, p_max: int, h_max: int) -> OpenInstance:
+        return cls(n, m, [], [], [], p_max, h_max)
+
+
+@dataclass(frozen=True)
+class Step:
+    i: int  # Day, starting at 1
+    f: int  # Number of people flying on day i
+    r: int  # Number of people staying after day i
+    cost: int  # Total cost up to and including day i
+    opt: float | None = None  # Offline optimum of days 1..i, if the session tracks it
+
+
+class OnlineSession:
+    """
+    Run an Algorithm day by day, as the days arrive. Memory does not grow with
+    the number of days, as long as the algorithm's own state does not.
+    The algorithms need to know the last day, so m must be given up front.
+    With track_optimum, every Step also holds the offline optimum of the days
+    so far (see prefix.PrefixOptimum), e.g. to follow the ratio day by day.
+    """
+    def __init__(self, algorithm: type[Algorithm], n: int, m: int, p_max: int, h_max: int,
+                 *args, track_optimum: bool = False, **kwargs) -> None:
+        self.I = OpenInstance.open(n, m, p_max, h_max)
+        # Algorithm.solution is never called, so a RandomAlgorithm runs a single trajectory.
+        self.algorithm = algorithm(self.I, *args, **kwargs)
+        self.i = 0
+        self.r = n
+        self.cost = 0
+        self.optimum = PrefixOptimum(n) if track_optimum else None
+
+    @property
+    def done(self) -> bool:
+        return self.i == self.I.m
+
+    def feed(self, s_i: int, p_i: int, h_i: int) -> Step:
+        """Reveal the next day and return the decision for it."""
+        assert not self.done, "all m days have been fed"
+        assert s_i >= 1, "s[i] must be at least 1"
+        assert 1 <= p_i <= self.I.p_max, "p[i] must be between 1 and p_max"
+        assert 0 <= h_i <= self.I.h_max, "h[i] must be between 0 and h_max"
+        self.i += 1
+        f_i = self.algorithm.decide(self.i, self.r, s_i, p_i, h_i)
+        assert 0 <= f_i <= self.r, "f[i] must be between 0 and n[i]"
+        self.r -= f_i
+        assert self.r == 0 or not self.done, "r[m-1] must be 0"
+        self.cost += f_i * p_i + h_i * self.r
+        opt = self.optimum.append(s_i, p_i, h_i) if self.optimum is not None else None
+        return Step(self.i, f_i, self.r, self.cost, opt)
+
+    def stream(self, days: Iterable[tuple[int, int, int]]) -> Iterator[Step]:
+        """Feed (s_i, p_i, h_i) tuples lazily, e.g. from a long-running feed."""
+        for s_i, p_i, h_i in days:
+            yield self.feed(s_i, p_i, h_i)
+            if self.done:
+                return
+
+
+def session(algorithm: type[Algorithm], n: int, m: int, p_max: int, h_max: int,
+            *args, **kwargs):
+    """
+    Coroutine version of OnlineSession: prime it with next(), then send
+    (s_i, p_i, h_i) and receive the Step for that day.
+    """
+    online = OnlineSession(algorithm, n, m, p_max, h_max, *args, **kwargs)
+    step = None
+    while not online.done:
+        step = online.feed(*(yield step))
+    yield step
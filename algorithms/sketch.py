@@ -0,0 +1,290 @@
+from __future__ import annotations
+import json
+from math import ceil
+import numpy as np
+from .strike import WelfordArray
+
+
+class KLL:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty) of a stream of floats.
+    Level h holds samples that each stand for 2^h samples of the stream. When
+    a level is over its capacity it is sorted and every other sample (from a
+    random offset) moves up a level, so the memory is O(k log(N / k)) and the
+    rank error is about 1.7 / k, whatever the number of samples N. update()
+    takes whole blocks, and sketches with the same k can be merged, e.g. to
+    combine the sketches of parallel workers. min and max are exact. The
+    offsets come from the seed, so the same updates give the same sketch.
+    """
+    def __init__(self, k: int = 200, seed: int | None = 0) -> None:
+        assert k >= 8, "k must be at least 8"
+        self.k = k
+        self.c = 2 / 3  # Capacity ratio between a level and the one above it
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)  # Offsets of the compactions
+        self.n = 0
+        self.min_ = float('inf')
+        self.max_ = float('-inf')
+
+    def capacity(self, h: int) -> int:
+        return max(2, ceil(self.k * self.c ** (len(self.levels) - 1 - h)))
+
+    def update(self, x: np.ndarray) -> KLL:
+        """Add a block of samples."""
+        x = np.asarray(x, dtype=float).ravel()
+        if len(x) > 0:
+            self.n += len(x)
+            self.min_ = min(self.min_, float(x.min()))
+            self.max_ = max(self.max_, float(x.max()))
+            self.levels[0] = np.concatenate([self.levels[0], x])
+            self._compress()
+        return self
+
+    def merge(self, other: KLL) -> KLL:
+        assert self.k == other.k, "k mismatch"
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.n += other.n
+        self.min_ = min(self.min_, other.min_)
+        self.max_ = max(self.max_, other.max_)
+        self._compress()
+        return self
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self.capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                level = np.sort(level)
+                # With an odd number of samples, the largest one stays behind.
+                even = len(level) - len(level) % 2
+                offset = int(self.rng.integers(2))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], level[offset:even:2]])
+                self.levels[h] = level[even:]
+                # Adding a level lowers the capacities below it, so start over.
+                h = 0
+            else:
+                h += 1
+
+    def _weighted(self) -> tuple[np.ndarray, np.ndarray]:
+        """The samples in the sketch, sorted, and their cumulative weights."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.int64)
+                                  for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    @property
+    def count(self) -> int:
+        return self.n
+
+    @property
+    def size(self) -> int:
+        """Number of samples kept."""
+        return sum(len(level) for level in self.levels)
+
+    def quantile(self, q: float | np.ndarray) -> float | np.ndarray:
+        """The (approximate) q-quantile(s), with q = 0 the minimum and q = 1 the maximum."""
+        q = np.asarray(q, dtype=float)
+        if self.n == 0:
+            return np.full(q.shape, np.nan)[()]
+        items, weights = self._weighted()
+        k = np.searchsorted(weights, q * weights[-1], side='left')
+        x = items[np.minimum(k, len(items) - 1)]
+        return np.where(q <= 0, self.min_, np.where(q >= 1, self.max_, x))[()]
+
+    def cdf(self, x: float | np.ndarray) -> float | np.ndarray:
+        """The (approximate) fraction of the samples <= x."""
+        if self.n == 0:
+            return np.full(np.shape(x), np.nan)[()]
+        items, weights = self._weighted()
+        k = np.searchsorted(items, x, side='right')
+        return (np.concatenate([[0], weights])[k] / weights[-1])[()]
+
+    def to_json(self) -> dict:
+        return dict(k=self.k, n=self.n, min=self.min_, max=self.max_,
+                    levels=[level.tolist() for level in self.levels],
+                    rng=self.rng.bit_generator.state)
+
+    @classmethod
+    def from_json(cls, data: dict) -> KLL:
+        sketch = cls(data['k'])
+        sketch.n, sketch.min_, sketch.max_ = data['n'], data['min'], data['max']
+        sketch.levels = [np.asarray(level, dtype=float) for level in data['levels']]
+        sketch.rng.bit_generator.state = data['rng']
+        return sketch
+
+    def __repr__(self) -> str:
+        return f"KLL(n={self.n}, median={self.quantile(0.5)})"
+
+
+class LogHistogram:
+    """
+    Counts of samples in logarithmic bins: bin j (from 1) holds
+    [low * 2^((j-1)/b), low * 2^(j/b)) for b bins per octave, bin 0 everything
+    below low and the last bin everything from high. Good for competitive
+    ratios, which start at 1 and have a long tail. Histograms with the same
+    bins are merged by adding the counts.
+    """
+    def __init__(self, low: float = 1.0, high: float = 2.0 ** 16, bins_per_octave: int = 16) -> None:
+        assert 0 < low < high, "need 0 < low < high"
+        self.low, self.high, self.b = low, high, bins_per_octave
+        self.bins = ceil(np.log2(high / low) * bins_per_octave)
+        self.counts = np.zeros(self.bins + 2, dtype=np.int64)
+
+    @property
+    def edges(self) -> np.ndarray:
+        """The edges of bins 1 up to the last one (which starts at high)."""
+        return np.minimum(self.low * 2.0 ** (np.arange(self.bins + 1) / self.b), self.high)
+
+    def update(self, x: np.ndarray) -> LogHistogram:
+        """Add a block of samples."""
+        x = np.asarray(x, dtype=float).ravel()
+        self.counts += np.bincount(np.searchsorted(self.edges, x, side='right'), minlength=len(self.counts))
+        return self
+
+    def merge(self, other: LogHistogram) -> LogHistogram:
+        assert (self.low, self.high, self.b) == (other.low, other.high, other.b), "bin mismatch"
+        self.counts += other.counts
+        return self
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def quantile(self, q: float | np.ndarray) -> float | np.ndarray:
+        """
+        The q-quantile(s), interpolated geometrically within its bin. Quantiles
+        below low or from high are clamped to low and high.
+        """
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)[()]
+        cumulative = np.cumsum(self.counts)
+        target = q * cumulative[-1]
+        j = np.minimum(np.searchsorted(cumulative, target, side='left'), len(self.counts) - 1)
+        before = np.where(j > 0, cumulative[j - 1], 0)
+        fraction = np.clip((target - before) / np.maximum(self.counts[j], 1), 0, 1)
+        edges = np.concatenate([[self.low], self.edges, [self.high]])
+        x = edges[j] * (edges[j + 1] / edges[j]) ** fraction
+        return x[()]
+
+    def density(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Centres (geometric) of the bins between low and high and the fraction of
+        the samples per unit of x in each, e.g. for the outline of a violin.
+        """
+        edges = self.edges
+        centres = np.sqrt(edges[:-1] * edges[1:])
+        return centres, self.counts[1:-1] / max(self.count, 1) / np.diff(edges)
+
+    def to_json(self) -> dict:
+        nonzero = np.flatnonzero(self.counts)
+        return dict(low=self.low, high=self.high, bins_per_octave=self.b,
+                    counts={int(j): int(self.counts[j]) for j in nonzero})
+
+    @classmethod
+    def from_json(cls, data: dict) -> LogHistogram:
+        histogram = cls(data['low'], data['high'], data['bins_per_octave'])
+        for j, count in data['counts'].items():
+            histogram.counts[int(j)] = count
+        return histogram
+
+
+class Summary:
+    """
+    Everything kept of a stream of ratios in bounded memory: the Welford mean,
+    std, min and max, a KLL sketch of the quantiles and a LogHistogram, all
+    updated in blocks and mergeable. Enough for quantile and violin plots
+    without the raw samples (see violin()).
+    """
+    def __init__(self, k: int = 200, seed: int | None = 0, **histogram) -> None:
+        self.welford = WelfordArray()
+        self.sketch = KLL(k, seed)
+        self.histogram = LogHistogram(**histogram)
+
+    @classmethod
+    def from_block(cls, x: np.ndarray, **options) -> Summary:
+        return cls(**options).update(x)
+
+    def update(self, x: np.ndarray) -> Summary:
+        """Add a block of samples."""
+        x = np.asarray(x, dtype=float).ravel()
+        self.welford.update(x)
+        self.sketch.update(x)
+        self.histogram.update(x)
+        return self
+
+    def merge(self, other: Summary) -> Summary:
+        self.welford.merge(other.welford)
+        self.sketch.merge(other.sketch)
+        self.histogram.merge(other.histogram)
+        return self
+
+    @property
+    def count(self) -> int:
+        return int(self.welford.count)
+
+    @property
+    def mean(self) -> float:
+        return float(self.welford.mean)
+
+    @property
+    def std(self) -> float:
+        return float(self.welford.std)
+
+    @property
+    def min(self) -> float:
+        return float(self.welford.min)
+
+    @property
+    def max(self) -> float:
+        return float(self.welford.max)
+
+    def quantile(self, q: float | np.ndarray) -> float | np.ndarray:
+        return self.sketch.quantile(q)
+
+    def violin(self, points: int = 100) -> dict:
+        """
+        The statistics matplotlib's Axes.violin draws: the density at points
+        between min and max (from the histogram), mean, median, min and max.
+        """
+        centres, density = self.histogram.density()
+        coords = np.geomspace(max(self.min, self.histogram.low), max(self.max, self.histogram.low), points)
+        vals = np.interp(coords, centres, density, left=density[0], right=0)
+        return dict(coords=coords, vals=vals, mean=self.mean, median=float(self.quantile(0.5)),
+                    min=self.min, max=self.max)
+
+    def to_json(self) -> dict:
+        w = self.welford
+        return dict(k=int(w.k), M=float(w.M), S=float(w.S), min=float(w.min_), max=float(w.max_),
+                    sketch=self.sketch.to_json(), histogram=self.histogram.to_json())
+
+    @classmethod
+    def from_json(cls, data: dict) -> Summary:
+        summary = cls.__new__(cls)
+        summary.welford = WelfordArray()
+        w = summary.welford
+        w.k, w.M, w.S = np.int64(data['k']), np.float64(data['M']), np.float64(data['S'])
+        w.min_, w.max_ = np.float64(data['min']), np.float64(data['max'])
+        summary.sketch = KLL.from_json(data['sketch'])
+        summary.histogram = LogHistogram.from_json(data['histogram'])
+        return summary
+
+    def __repr__(self) -> str:
+        return f"Summary(n={self.count}, mean={self.mean}, median={float(self.quantile(0.5))})"
+
+
+def save(summaries: dict[str, Summary], file: str) -> None:
+    """Write summaries by name to a JSON file, e.g. next to a ResultStore."""
+    with open(file, 'w') as f:
+        json.dump({name: summary.to_json() for name, summary in summaries.items()}, f)
+
+
+def load(file: str) -> dict[str, Summary]:
+    with open(file) as f:
+        return {name: Summary.from_json(data) for name, data in json.load(f).items()}
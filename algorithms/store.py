@@ -0,0 +1,134 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+import numpy as np
+from .strike import Instance, BoundedInstance
+from .batch import InstanceBatch
+
+
+@dataclass(frozen=True, eq=False)
+class InstanceView(BoundedInstance):
+    """
+    A BoundedInstance handed out by an InstanceStore. The store validates all
+    of its instances at once, so the per-instance checks are skipped here.
+    Despite the name, s, p and h are lists copied out of the store, like those
+    of any other Instance, so changing the store does not change the instance.
+    """
+    def __post_init__(self) -> None:
+        pass
+
+
+# File layout, all little-endian int64:
+#   MAGIC, VERSION, N, total number of days
+#   n[N], m[N], p_max[N], h_max[N], offsets[N+1], s[total], p[total], h[total]
+MAGIC = int.from_bytes(b'STRIKEIS', 'little')
+VERSION = 1
+HEADER = 4
+DTYPE = np.dtype('<i8')
+
+
+class InstanceStore:
+    """
+    Columnar storage for many instances. The per-instance scalars live in
+    (N,) arrays and the days of all instances are concatenated into flat
+    s, p and h arrays; the days of instance k are offsets[k]:offsets[k+1].
+    """
+    def __init__(self, n: np.ndarray, m: np.ndarray, p_max: np.ndarray, h_max: np.ndarray,
+                 s: np.ndarray, p: np.ndarray, h: np.ndarray, validate: bool = True) -> None:
+        self.n, self.m, self.p_max, self.h_max, self.s, self.p, self.h = \
+            (np.asarray(x, dtype=DTYPE) for x in (n, m, p_max, h_max, s, p, h))
+        self.offsets = np.zeros(len(self.m) + 1, dtype=DTYPE)
+        np.cumsum(self.m, out=self.offsets[1:])
+        if validate:
+            self.validate()
+
+    @classmethod
+    def from_instances(cls, instances: Iterable[Instance]) -> InstanceStore:
+        """Consumes the instances one at a time. Plain Instances are bounded by their own maxima."""
+        n, m, p_max, h_max, s, p, h = [], [], [], [], [], [], []
+        for I in instances:
+            bounded = isinstance(I, BoundedInstance)
+            n.append(I.n)
+            m.append(I.m)
+            p_max.append(I.p_max if bounded else max(I.p))
+            h_max.append(I.h_max if bounded else max(I.h))
+            s.extend(I.s)
+            p.extend(I.p)
+            h.extend(I.h)
+        return cls(n, m, p_max, h_max, s, p, h)
+
+    @classmethod
+    def from_batch(cls, B: InstanceBatch) -> InstanceStore:
+        return cls(B.n, np.full(B.N, B.m), B.p_max, B.h_max,
+                   B.s.ravel(), B.p.ravel(), B.h.ravel(), validate=False)
+
+    @classmethod
+    def load(cls, file: str, mmap: bool = True) -> InstanceStore:
+        """Open a store saved with save(). With mmap the arrays are read lazily from disk."""
+        data = np.memmap(file, dtype=DTYPE, mode='r') if mmap else np.fromfile(file, dtype=DTYPE)
+        magic, version, N, total = (int(x) for x in data[:HEADER])
+        assert magic == MAGIC, f"{file} is not an instance store"
+        assert version == VERSION, f"unsupported instance store version {version}"
+        assert len(data) == HEADER + 5 * N + 1 + 3 * total, f"{file} is truncated"
+        store = cls.__new__(cls)
+        k = HEADER
+        for name, size in (('n', N), ('m', N), ('p_max', N), ('h_max', N), ('offsets', N + 1),
+                           ('s', total), ('p', total), ('h', total)):
+            setattr(store, name, data[k:k + size])
+            k += size
+        return store
+
+    def save(self, file: str) -> None:
+        with open(file, 'wb') as f:
+            header = [MAGIC, VERSION, len(self), len(self.s)]
+            for x in (header, self.n, self.m, self.p_max, self.h_max,
+                      self.offsets, self.s, self.p, self.h):
+                np.asarray(x, dtype=DTYPE).tofile(f)
+
+    def validate(self) -> None:
+        """The checks of BoundedInstance, for all instances at once."""
+        assert len(self.n) == len(self.m) == len(self.p_max) == len(self.h_max), \
+            "n, m, p_max, h_max must have length N"
+        assert len(self.s) == len(self.p) == len(self.h) == self.offsets[-1], \
+            "s, p, h must have length sum(m)"
+        assert np.all(self.n >= 1), "n must be at least 1"
+        assert np.all(self.m >= 1), "m must be at least 1"
+        assert np.all(self.p_max >= 1), "p_max must be at least 1"
+        assert np.all(self.h_max >= 0), "h_max must be at least 0"
+        if len(self) == 0:
+            return
+        assert np.all(self.p >= 1), "p[i] must be at least 1"
+        assert np.all(self.s >= 1), "s[i] must be at least 1"
+        assert np.all(self.h >= 0), "h[i] must be at least 0"
+        assert np.all(np.add.reduceat(self.s, self.offsets[:-1]) >= self.n), \
+            "sum(s) must be at least n"
+        assert np.all(self.p <= np.repeat(self.p_max, self.m)), "p[i] must be at most p_max"
+        assert np.all(self.h <= np.repeat(self.h_max, self.m)), "h[i] must be at most h_max"
+
+    def __len__(self) -> int:
+        return len(self.n)
+
+    def __getitem__(self, k: int) -> InstanceView:
+        k = range(len(self))[k]  # Negative indices count from the end, others raise IndexError
+        a, b = self.offsets[k], self.offsets[k + 1]
+        return InstanceView(int(self.n[k]), int(self.m[k]),
+                            self.s[a:b].tolist(), self.p[a:b].tolist(), self.h[a:b].tolist(),
+                            int(self.p_max[k]), int(self.h_max[k]))
+
+    def __iter__(self) -> Iterator[InstanceView]:
+        return (self[k] for k in range(len(self)))
+
+    def batch(self, ks: np.ndarray | slice = slice(None)) -> InstanceBatch:
+        """The selected instances as an InstanceBatch; they must all have the same m."""
+        ks = np.arange(len(self))[ks]
+        m = np.unique(self.m[ks])
+        assert len(m) == 1, "all instances in a batch must have the same m"
+        days = self.offsets[ks][:, None] + np.arange(m[0])
+        return InstanceBatch(self.n[ks], self.s[days], self.p[days], self.h[days],
+                             self.p_max[ks], self.h_max[ks])
+
+    def batches(self) -> Iterator[tuple[np.ndarray, InstanceBatch]]:
+        """Split the store into batches of equal m, with the indices of their instances."""
+        for m in np.unique(self.m):
+            ks = np.flatnonzero(self.m == m)
+            yield ks, self.batch(ks)
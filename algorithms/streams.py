@@ -0,0 +1,61 @@
+from __future__ import annotations
+import os
+from hashlib import blake2b
+from typing import Sequence
+import numpy as np
+from .strike import Instance
+
+_default: np.random.Generator | None = None
+_pid: int | None = None
+
+
+def default_generator() -> np.random.Generator:
+    """
+    A process-wide unseeded Generator, for algorithms that get no rng. Creating
+    a fresh default_rng() for every instance is slow. A forked worker would
+    inherit the state of its parent, so every process seeds its own.
+    """
+    global _default, _pid
+    if _pid != os.getpid():
+        _default, _pid = np.random.default_rng(), os.getpid()
+    return _default
+
+
+def _word(x: int | str | Instance) -> int:
+    """A 64-bit word identifying an instance (by content), an algorithm (by name) or an index."""
+    if isinstance(x, Instance):
+        return int(x.digest()[:16], 16)
+    if isinstance(x, str):
+        return int.from_bytes(blake2b(x.encode(), digest_size=8).digest(), 'little')
+    return int(x)
+
+
+class Streams:
+    """
+    The random streams of one run, all derived from a single root seed.
+    Every (instance, algorithm) pair gets its own Philox key, and replica j
+    of that pair starts at counter j * 2^128, so streams never overlap and any
+    of them can be created directly, in any process and in any order.
+    Instances are identified by their content, so a stream does not depend
+    on where or when the instance is solved.
+    """
+    def __init__(self, seed: int | None = None) -> None:
+        self.seed = np.random.SeedSequence(seed).entropy
+
+    def key(self, instance: int | str | Instance, algorithm: str) -> np.ndarray:
+        seed = np.random.SeedSequence(self.seed, spawn_key=(_word(instance), _word(algorithm)))
+        return seed.generate_state(2, np.uint64)
+
+    def generator(self, instance: int | str | Instance, algorithm: str, replica: int = 0) -> np.random.Generator:
+        counter = np.array([0, 0, replica & (2**64 - 1), replica >> 64], dtype=np.uint64)
+        return np.random.Generator(np.random.Philox(key=self.key(instance, algorithm), counter=counter))
+
+    def generators(self, instances: Sequence[int | str | Instance], algorithm: str,
+                   replica: int = 0) -> list[np.random.Generator]:
+        """One generator per instance, e.g. for the rows of an InstanceBatch."""
+        return [self.generator(instance, algorithm, replica) for instance in instances]
+
+    def replicas(self, instance: int | str | Instance, algorithm: str,
+                 start: int, stop: int) -> list[np.random.Generator]:
+        """Generators of the replicas start..stop-1 of one instance."""
+        return [self.generator(instance, algorithm, j) for j in range(start, stop)]
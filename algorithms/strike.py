@@ -3,7 +3,36 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from itertools import chain
 from math import sqrt
-import numpy as np
+from struct import pack
+
+# NumPy is imported inside the functions that use it, so that solving a single
+# instance offline (strike.py solve) does not wait for it to load.
+
+
+# The instrument.Recorder that algorithms report to, if any (see instrument.instrument()).
+RECORDER = None
+
+
+def content_digest(*fields: int | list[int]) -> str:
+    """Hash of a sequence of integers and integer lists, stable across runs and processes."""
+    from hashlib import blake2b
+    values = []
+    for x in fields:
+        try:
+            values.extend(map(int, x))
+        except TypeError:  # A single integer
+            values.append(int(x))
+    return blake2b(pack(f'<{len(values)}q', *values), digest_size=16).hexdigest()
+
+
+def parse_instance(text: str) -> tuple[int, int, list[int], list[int], list[int]]:
+    """
+    n, m, s, p and h of one instance in the input/ format, in plain Python and
+    not validated (see files.parse for many instances at once).
+    """
+    tokens = [int(token) for token in text.replace(',', ' ').split()]
+    assert len(tokens) >= 2 and (len(tokens) - 2) % 3 == 0, "expected n, m and then s, p, h per day"
+    return tokens[0], tokens[1], tokens[2::3], tokens[3::3], tokens[4::3]
 
 
 @dataclass(frozen=True)
@@ -25,20 +54,19 @@ class Instance:
 
     @classmethod
     def from_file(cls, file: str) -> Instance:
+        """The instance in the file (see files.load for files with several)."""
         with open(file, 'r') as f:
-            n = int(f.readline())
-            m = int(f.readline())
-            s, p, h = [], [], []
-            for _ in range(m):
-                s_i, p_i, h_i = f.readline().split(', ')
-                s.append(int(s_i))
-                p.append(int(p_i))
-                h.append(int(h_i))
-        return cls(n, m, s, p, h)
+            return cls(*parse_instance(f.read()))
 
     def __iter__(self) -> zip[tuple[int, int, int]]:
         return zip(self.s, self.p, self.h)
 
+    def digest(self) -> str:
+        return content_digest(self.n, self.m, self.s, self.p, self.h)
+
+    def __hash__(self) -> int:
+        return hash(self.digest())
+
     def __eq__(self, other: object) -> bool:
         return (isinstance(other, Instance) and
                 self.n == other.n and
@@ -54,8 +82,10 @@ class BoundedInstance(Instance):
     h_max: int
 
     @classmethod
-    def random(cls, n: int|range, m: int|range, p_max: int|range, h_max: int|range) -> BoundedInstance:
-        rng = np.random.default_rng()
+    def random(cls, n: int|range, m: int|range, p_max: int|range, h_max: int|range,
+               rng: np.random.Generator | None = None) -> BoundedInstance:
+        import numpy as np
+        rng = np.random.default_rng() if rng is None else rng
         s = np.full(m, n).tolist()
         p = rng.integers(1, p_max + 1, size=m).tolist()
         h = rng.integers(0, h_max + 1, size=m).tolist()
@@ -68,6 +98,11 @@ class BoundedInstance(Instance):
         assert all(p_i <= self.p_max for p_i in self.p), "p[i] must be at most p_max"
         assert all(h_i <= self.h_max for h_i in self.h), "h[i] must be at most h_max"
 
+    def digest(self) -> str:
+        return content_digest(self.n, self.m, self.s, self.p, self.h, self.p_max, self.h_max)
+
+    __hash__ = Instance.__hash__
+
     def __eq__(self, other: object) -> bool:
         return (isinstance(other, BoundedInstance) and
                 self.p_max == other.p_max and
@@ -154,27 +189,155 @@ class Welford:
         return self.mean
 
 
+class WelfordArray:
+    """
+    Welford statistics for an array of independent streams. update() takes a
+    whole block of samples at once, and accumulators of the same shape can be
+    merged (Chan et al.), e.g. to combine the statistics of parallel workers.
+    Indexing and iterating give WelfordArrays of the sub-streams.
+    """
+    def __init__(self, shape: int | tuple[int, ...] = ()) -> None:
+        import numpy as np
+        self.k = np.zeros(shape, dtype=np.int64)
+        self.M = np.zeros(shape)
+        self.S = np.zeros(shape)
+        self.max_ = np.full(shape, float('-inf'))
+        self.min_ = np.full(shape, float('inf'))
+
+    @classmethod
+    def from_block(cls, x: np.ndarray) -> WelfordArray:
+        """Statistics of a block of samples with shape (K, *shape)."""
+        import numpy as np
+        x = np.asarray(x, dtype=float)
+        welford = cls(x.shape[1:])
+        if len(x) > 0:
+            welford.k[...] = len(x)
+            welford.M[...] = x.mean(axis=0)
+            welford.S[...] = ((x - welford.M) ** 2).sum(axis=0)
+            welford.max_[...] = x.max(axis=0)
+            welford.min_[...] = x.min(axis=0)
+        return welford
+
+    def update(self, x: np.ndarray) -> np.ndarray:
+        """Add a block of samples with shape (K, *shape). Returns the change of the mean."""
+        mean = self.M.copy()
+        self.merge(WelfordArray.from_block(x))
+        return self.M - mean
+
+    def add(self, x: np.ndarray) -> np.ndarray:
+        """Add a single sample with shape `shape`. Returns the change of the mean."""
+        import numpy as np
+        x = np.asarray(x, dtype=float)
+        self.k = self.k + 1
+        delta = x - self.M
+        self.M = self.M + delta / self.k
+        self.S = self.S + delta * (x - self.M)
+        self.max_ = np.maximum(self.max_, x)
+        self.min_ = np.minimum(self.min_, x)
+        return delta / self.k
+
+    def merge(self, other: WelfordArray) -> WelfordArray:
+        assert self.shape == other.shape, "shape mismatch"
+        import numpy as np
+        k = self.k + other.k
+        with np.errstate(divide='ignore', invalid='ignore'):
+            w = np.where(k > 0, other.k / k, 0)
+        delta = other.M - self.M
+        self.M = self.M + delta * w
+        self.S = self.S + other.S + delta ** 2 * self.k * w
+        self.k = k
+        self.max_ = np.maximum(self.max_, other.max_)
+        self.min_ = np.minimum(self.min_, other.min_)
+        return self
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.M.shape
+
+    @property
+    def count(self) -> np.ndarray:
+        return self.k[()]
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.M[()]
+
+    @property
+    def variance(self) -> np.ndarray:
+        import numpy as np
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.k > 1, self.S / self.k, 0)[()]
+
+    @property
+    def std(self) -> np.ndarray:
+        import numpy as np
+        return np.sqrt(self.variance)
+
+    @property
+    def max(self) -> np.ndarray:
+        return self.max_[()]
+
+    @property
+    def min(self) -> np.ndarray:
+        return self.min_[()]
+
+    def __getitem__(self, key) -> WelfordArray:
+        welford = WelfordArray.__new__(WelfordArray)
+        for name in ('k', 'M', 'S', 'max_', 'min_'):
+            setattr(welford, name, getattr(self, name)[key])
+        return welford
+
+    def __len__(self) -> int:
+        return len(self.M)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"WelfordArray({self.mean}, {self.std})"
+
+    def __float__(self) -> float:
+        return float(self.mean)
+
+
 @dataclass(frozen=True)
 class RandomSolution:
     I: Instance
-    f: list[Welford] = field(init=False)
-    r: list[Welford] = field(init=False)
-    cost: Welford = field(init=False)
+    f: WelfordArray = field(init=False)
+    r: WelfordArray = field(init=False)
+    cost: WelfordArray = field(init=False)
 
     def __post_init__(self) -> None:
         # Use object.__setattr__ to bypass frozen=True
-        object.__setattr__(self, 'f', [Welford() for _ in range(self.I.m)])
-        object.__setattr__(self, 'r', [Welford() for _ in range(self.I.m)])
-        object.__setattr__(self, 'cost', Welford())
+        object.__setattr__(self, 'f', WelfordArray(self.I.m))
+        object.__setattr__(self, 'r', WelfordArray(self.I.m))
+        object.__setattr__(self, 'cost', WelfordArray())
 
     def update(self, solution: Solution) -> float:
         assert self.I == solution.I, "instance mismatch"
-        for i, (f_i, r_i) in enumerate(zip(solution.f, solution.r)):
-            self.f[i].update(f_i)
-            self.r[i].update(r_i)
-        return self.cost.update(solution.cost)
-
-    def __iter__(self) -> zip[tuple[int, int]]:
+        self.f.add(solution.f)
+        self.r.add(solution.r)
+        return float(self.cost.add(solution.cost))
+
+    def update_block(self, f: np.ndarray, r: np.ndarray, cost: np.ndarray) -> float:
+        """
+        Add K runs at once, given as (K, m) arrays f and r and a (K,) array cost.
+        The same as update() on every run, up to the rounding of the mean and S.
+        """
+        assert f.shape == r.shape == (len(cost), self.I.m), "f and r must have shape (K, m)"
+        self.f.update(f)
+        self.r.update(r)
+        return float(self.cost.update(cost))
+
+    def merge(self, other: RandomSolution) -> RandomSolution:
+        """Combine the statistics of two independent sets of runs on the same instance."""
+        assert self.I == other.I, "instance mismatch"
+        self.f.merge(other.f)
+        self.r.merge(other.r)
+        self.cost.merge(other.cost)
+        return self
+
+    def __iter__(self) -> zip[tuple[WelfordArray, WelfordArray]]:
         return zip(self.f, self.r)
 
 
@@ -194,7 +357,10 @@ class Algorithm(ABC):
 
     def __init__(self, I: Instance, *args, **kwargs) -> None:
         self.__I = I
-        self.setup(*args, **kwargs)
+        if RECORDER is None:
+            self.setup(*args, **kwargs)
+        else:
+            RECORDER.setup(self, *args, **kwargs)
 
     @property
     def I(self) -> Instance:
@@ -209,6 +375,8 @@ class Algorithm(ABC):
         raise NotImplementedError
 
     def solution(self) -> Solution:
+        if RECORDER is not None:
+            return RECORDER.solution(self)
         r_i = self.I.n
         # List comprehension has better performance than initializing to zeros
         # or using append.
@@ -218,12 +386,71 @@ class Algorithm(ABC):
 
 
 class RandomAlgorithm(Algorithm):
-    def solution(self, max_iter: int = 1e4, epsilon: float = 1e-5) -> RandomSolution:
-        """Run the algorithm until the cost converges."""
+    """
+    An algorithm that draws its random choices from self.rng, which setup()
+    takes as the keyword argument rng. See streams.Streams for reproducible ones.
+    """
+    def __init__(self, I: Instance, *args, **kwargs) -> None:
+        # Keep the arguments, simulate() passes them on to the batch counterpart.
+        self.__args = args
+        self.__kwargs = kwargs
+        super().__init__(I, *args, **kwargs)
+
+    def simulate(self, K: int, rng: np.random.Generator | list[np.random.Generator] | None = None):
+        """
+        Run K independent trajectories at once, optionally with another rng (or
+        one generator per trajectory). Returns a batch.BatchSolution.
+        """
+        from .batch import InstanceBatch, batch
+        B = InstanceBatch.repeat(self.I, K)
+        kwargs = self.__kwargs if rng is None else {**self.__kwargs, 'rng': rng}
+        return batch(type(self))(B, *self.__args, **kwargs).solution()
+
+    # True for algorithms where every remaining person flies independently with
+    # a probability that only depends on the day. They define buy_probabilities(),
+    # that probability per day, and support exact().
+    exact_supported = False
+
+    def exact(self):
+        """Exact statistics instead of simulation. Returns an exact.ExactSolution."""
+        if not self.exact_supported:
+            raise TypeError(f"{self.name()} does not support exact(), use solution() to simulate it")
+        from .exact import propagate
+        return propagate(self.I, self.buy_probabilities())
+
+    def solution(self, max_iter: int = 1e4, epsilon: float = 1e-5,
+                 vectorized: bool = False, streams=None) -> RandomSolution:
+        """
+        Run the algorithm until the cost converges.
+        If vectorized, trajectories are simulated in blocks of doubling size,
+        until a whole block moves the mean cost by less than epsilon.
+        With streams (a streams.Streams), run k draws from replica k of this
+        instance and algorithm, and is the same trajectory in both modes.
+        Only the trajectories are bit-identical: the modes stop after different
+        numbers of runs (per run or per block), and blocks are merged into the
+        statistics instead of added one run at a time, so even over the same
+        runs the mean and std may differ in the last bits.
+        """
         random_solution = RandomSolution(self.I)
-        for _ in range(int(max_iter)):
-            solution = super().solution()
-            delta = random_solution.update(solution)
-            if abs(delta) < epsilon:
-                break
+        if vectorized:
+            K, total = 64, 0
+            while total < int(max_iter):
+                K = min(K, int(max_iter) - total)
+                rng = None if streams is None else streams.replicas(self.I, self.name(), total, total + K)
+                block = self.simulate(K, rng)
+                delta = random_solution.update_block(block.f, block.r, block.cost)
+                total += K
+                K *= 2
+                if abs(delta) < epsilon:
+                    break
+        else:
+            for k in range(int(max_iter)):
+                if streams is not None:
+                    self.rng = streams.generator(self.I, self.name(), k)
+                solution = super().solution()
+                delta = random_solution.update(solution)
+                if abs(delta) < epsilon:
+                    break
+        if RECORDER is not None:
+            RECORDER.iterations(self, int(random_solution.cost.count))
         return random_solution
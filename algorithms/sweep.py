@@ -0,0 +1,221 @@
+from __future__ import annotations
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import product
+from statistics import NormalDist
+from typing import Iterable, Iterator
+import numpy as np
+from .strike import Algorithm, WelfordArray
+from .batch import InstanceBatch, ratios
+from .offline import offline_batch
+from .streams import Streams
+from .sketch import KLL, LogHistogram
+
+
+@dataclass(frozen=True)
+class Cell:
+    """One point of a sweep: instance parameters, and an algorithm with its parameters."""
+    n: int
+    m: int
+    p_max: int
+    h_max: int
+    algorithm: type[Algorithm]
+    params: tuple[tuple[str, float], ...] = ()  # keyword arguments of the algorithm
+
+    @property
+    def instances(self) -> tuple[int, int, int, int]:
+        return self.n, self.m, self.p_max, self.h_max
+
+    @property
+    def kwargs(self) -> dict[str, float]:
+        return dict(self.params)
+
+    def key(self) -> str:
+        params = ','.join(f"{name}={value!r}" for name, value in self.params)
+        return f"{self.algorithm.name()}({params}) n={self.n} m={self.m} p_max={self.p_max} h_max={self.h_max}"
+
+
+def grid(n: int | Iterable[int], m: int | Iterable[int], p_max: int | Iterable[int],
+         h_max: int | Iterable[int] = 0,
+         algorithms: dict[type[Algorithm], dict[str, Iterable]] | Iterable[type[Algorithm]] = ()) -> list[Cell]:
+    """
+    All combinations of the instance parameters and of the algorithm parameters,
+    e.g. grid([10, 100], 10, 128, algorithms={QThreshold: {'q': [0.1, 0.2]}, FastGreedy: {}}).
+    A parameter value may also be a function of (n, m, p_max, h_max), like
+    q = lambda n, m, p_max, h_max: 1 / np.sqrt(p_max).
+    """
+    values = lambda x: [x] if isinstance(x, (int, np.integer)) else list(x)
+    if not isinstance(algorithms, dict):
+        algorithms = {algorithm: {} for algorithm in algorithms}
+    cells = []
+    for instances in product(values(n), values(m), values(p_max), values(h_max)):
+        instances = tuple(int(x) for x in instances)
+        for algorithm, params in algorithms.items():
+            names = list(params)
+            for combination in product(*(values(params[name]) for name in names)):
+                combination = [value(*instances) if callable(value) else value for value in combination]
+                cells.append(Cell(*instances, algorithm, tuple(zip(names, map(float, combination)))))
+    return cells
+
+
+@dataclass
+class Progress:
+    """
+    Statistics of the ratio in one cell and the number of blocks sampled, with
+    a quantile sketch and a histogram of the ratio for quantile and violin plots.
+    """
+    ratio: WelfordArray = field(default_factory=WelfordArray)
+    blocks: int = 0
+    sketch: KLL = field(default_factory=KLL)
+    histogram: LogHistogram = field(default_factory=LogHistogram)
+
+    def update(self, ratio: np.ndarray) -> None:
+        """Add the ratios of one block."""
+        self.ratio.merge(WelfordArray.from_block(ratio))
+        self.sketch.update(ratio)
+        self.histogram.update(ratio)
+        self.blocks += 1
+
+    def quantile(self, q: float | np.ndarray) -> float | np.ndarray:
+        """
+        The q-quantile(s) of the ratio from the sketch, or NaN when the sketch
+        misses samples: cells continued from a checkpoint written before the
+        sketches existed only have the later blocks in it.
+        """
+        if self.sketch.count != self.ratio.count:
+            return np.full(np.shape(q), np.nan)[()]
+        return self.sketch.quantile(q)
+
+    def halfwidth(self, z: float) -> float:
+        """Half-width of the normal confidence interval of the mean ratio."""
+        k = int(self.ratio.count)
+        return float(z * np.sqrt(self.ratio.S / (k * (k - 1)))) if k > 1 else float('inf')
+
+    def to_json(self) -> dict:
+        r = self.ratio
+        return dict(blocks=self.blocks, k=int(r.k), M=float(r.M), S=float(r.S),
+                    min=float(r.min_), max=float(r.max_),
+                    sketch=self.sketch.to_json(), histogram=self.histogram.to_json())
+
+    @classmethod
+    def from_json(cls, data: dict) -> Progress:
+        ratio = WelfordArray()
+        ratio.k, ratio.M, ratio.S = np.int64(data['k']), np.float64(data['M']), np.float64(data['S'])
+        ratio.min_, ratio.max_ = np.float64(data['min']), np.float64(data['max'])
+        # Checkpoints from before the sketches have only the Welford statistics,
+        # so the sketch and histogram start empty (see quantile()).
+        progress = cls(ratio, data['blocks'])
+        if 'sketch' in data:
+            progress.sketch = KLL.from_json(data['sketch'])
+            progress.histogram = LogHistogram.from_json(data['histogram'])
+        return progress
+
+
+# What the instances of a block are seeded with, saved in the checkpoint: one
+# written with other instances than this Sweep would draw cannot be continued.
+SPAWN_KEY = "n,m,p_max,h_max,block"
+
+
+class Sweep:
+    """
+    Sample every cell in blocks of random instances until the confidence
+    interval of its mean ratio is narrower than target on both sides (or
+    max_samples is reached). All cells with the same instance parameters see
+    the same instances, and block b of those comes from the seed and
+    (n, m, p_max, h_max, b) alone, so the results do not depend on the order
+    of the cells, on which other cells there are, on the number of workers or
+    on interruptions. With a checkpoint file the progress is saved after every
+    round, and a new Sweep with the same file continues where it stopped (with
+    the seed of the checkpoint; passing another seed is an error).
+    """
+    def __init__(self, cells: list[Cell], target: float = 1e-3, confidence: float = 0.95,
+                 min_samples: int = 100, max_samples: int = 100_000, block: int = 100,
+                 seed: int | None = None, checkpoint: str | None = None) -> None:
+        assert 0 < confidence < 1, "confidence must be in (0, 1)"
+        assert 1 < min_samples <= max_samples, "need 1 < min_samples <= max_samples"
+        self.cells = cells
+        self.target = target
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.min_samples, self.max_samples, self.block = min_samples, max_samples, block
+        self.checkpoint = checkpoint
+        self.progress = {cell.key(): Progress() for cell in cells}
+        assert len(self.progress) == len(cells), "duplicate cells"
+        self.seed = np.random.SeedSequence(seed).entropy
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self.load()
+            assert seed is None or self.seed == seed, \
+                f"{checkpoint} was made with seed {self.seed}, not {seed}"
+
+    def done(self, cell: Cell) -> bool:
+        progress = self.progress[cell.key()]
+        k = progress.ratio.count
+        return k >= self.max_samples or (k >= self.min_samples and progress.halfwidth(self.z) <= self.target)
+
+    @property
+    def finished(self) -> bool:
+        return all(self.done(cell) for cell in self.cells)
+
+    def jobs(self) -> list[tuple]:
+        """One job per instance parameters and block, with all cells that still need it."""
+        groups = {}
+        for cell in self.cells:
+            if not self.done(cell):
+                groups.setdefault((cell.instances, self.progress[cell.key()].blocks), []).append(cell)
+        return [(instances, np.random.SeedSequence(self.seed, spawn_key=(*instances, b)), self.block,
+                 [(cell.key(), cell.algorithm, cell.kwargs) for cell in cells], Streams(self.seed))
+                for (instances, b), cells in groups.items()]
+
+    def run(self, workers: int | None = 1, rounds: int | None = None) -> dict[str, WelfordArray]:
+        """Sample until every cell is done (or for a number of rounds); returns the ratio per cell."""
+        pool = ProcessPoolExecutor(workers) if workers != 1 else None
+        try:
+            while not self.finished and rounds != 0:
+                jobs = self.jobs()
+                results = pool.map(_sample, jobs) if pool else map(_sample, jobs)
+                for block in results:
+                    for key, ratio in block.items():
+                        self.progress[key].update(ratio)
+                if self.checkpoint is not None:
+                    self.save()
+                rounds = None if rounds is None else rounds - 1
+        finally:
+            if pool:
+                pool.shutdown()
+        return self.results()
+
+    def results(self) -> dict[str, WelfordArray]:
+        return {key: progress.ratio for key, progress in self.progress.items()}
+
+    def __iter__(self) -> Iterator[tuple[Cell, WelfordArray, float]]:
+        """The cells with the statistics of their ratio and the half-width of its confidence interval."""
+        for cell in self.cells:
+            progress = self.progress[cell.key()]
+            yield cell, progress.ratio, progress.halfwidth(self.z)
+
+    def save(self) -> None:
+        # Write to a temporary file first, so a crash never leaves a corrupt checkpoint.
+        data = dict(seed=self.seed, block=self.block, spawn_key=SPAWN_KEY,
+                    progress={key: progress.to_json() for key, progress in self.progress.items()})
+        with open(self.checkpoint + '.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(self.checkpoint + '.tmp', self.checkpoint)
+
+    def load(self) -> None:
+        with open(self.checkpoint) as f:
+            data = json.load(f)
+        assert data['block'] == self.block, "the checkpoint was made with another block size"
+        assert data.get('spawn_key') == SPAWN_KEY, \
+            f"{self.checkpoint} was made by an older Sweep that seeded the instances by cell position"
+        self.seed = data['seed']
+        for key, progress in data['progress'].items():
+            if key in self.progress:
+                self.progress[key] = Progress.from_json(progress)
+
+
+def _sample(job) -> dict[str, np.ndarray]:
+    (n, m, p_max, h_max), seed, N, cells, streams = job
+    B = InstanceBatch.random(N, n, m, p_max, h_max, np.random.default_rng(seed))
+    opt = offline_batch(B.n, B.s, B.p, B.h)
+    return {key: ratios(algorithm, B, kwargs=kwargs, opt=opt, streams=streams) for key, algorithm, kwargs in cells}
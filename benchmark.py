@@ -0,0 +1,137 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+
+from algorithms.strike import BoundedInstance
+from algorithms.FastGreedy import FastGreedy
+from algorithms.Greedy import GreedyOnline
+from algorithms.Qthreshold import QThreshold
+from algorithms.Random import Random
+from algorithms.RandomizedPmax import RandomizedPmax
+from algorithms.offline import offline
+from algorithms.instrument import instrument
+
+
+# (n, m, p_max, h_max) cells, including a long horizon and a large group.
+GRID = [(10, 10, 128, 0), (10, 10, 128, 10), (100, 10, 128, 0),
+        (10, 1000, 128, 0), (1000, 100, 1024, 10)]
+QUICK_GRID = [(10, 10, 128, 0), (100, 100, 128, 10)]
+MC_RUNS = 100  # Monte Carlo runs per instance for the randomized algorithms
+
+
+def solvers(rng: np.random.Generator):
+    """Name, function solving one instance and number of decide() calls per day."""
+    return [
+        ("offline", lambda I: offline(I), 0),
+        ("QThreshold", lambda I: QThreshold(I, 1/np.sqrt(I.p_max)).solution(), 1),
+        ("FastGreedy", lambda I: FastGreedy(I).solution(), 1),
+        ("GreedyOnline", lambda I: GreedyOnline(I).solution(), 1),
+        # A fixed number of runs (epsilon=0) keeps the work per instance constant.
+        ("Random", lambda I: Random(I, rng=rng).solution(MC_RUNS, 0), MC_RUNS),
+        ("RandomizedPmax", lambda I: RandomizedPmax(I, 0.9, 0.1, rng=rng).solution(MC_RUNS, 0), MC_RUNS),
+    ]
+
+
+def bench(name, solve, decides, n, m, p_max, h_max, rng, min_time=0.5):
+    """Solve fresh random instances until min_time has passed."""
+    instances, elapsed = 0, 0.0
+    while elapsed < min_time:
+        I = BoundedInstance.random(n, m, p_max, h_max, rng)
+        start = time.perf_counter()
+        solve(I)
+        elapsed += time.perf_counter() - start
+        instances += 1
+    return {
+        "algorithm": name, "n": n, "m": m, "p_max": p_max, "h_max": h_max,
+        "instances": instances, "seconds": elapsed,
+        "instances_per_sec": instances / elapsed,
+        "decide_latency_us": elapsed / (instances * m * decides) * 1e6 if decides else None,
+    }
+
+
+def run(grid, min_time=0.5, seed=0, algorithms=None):
+    rng = np.random.default_rng(seed)
+    results = []
+    for name, solve, decides in solvers(rng):
+        if algorithms and name not in algorithms:
+            continue
+        for n, m, p_max, h_max in grid:
+            results.append(bench(name, solve, decides, n, m, p_max, h_max, rng, min_time))
+            print(format_result(results[-1]), flush=True)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "time": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+    }
+
+
+def format_result(result):
+    latency = result["decide_latency_us"]
+    latency = f"{latency:10.2f} us/decide" if latency is not None else ""
+    return (f"{result['algorithm']:>15} n={result['n']:<5} m={result['m']:<5} "
+            f"p_max={result['p_max']:<5} h_max={result['h_max']:<3} "
+            f"{result['instances_per_sec']:12.1f} inst/s {latency}")
+
+
+def key(result):
+    return result["algorithm"], result["n"], result["m"], result["p_max"], result["h_max"]
+
+
+def regressions(baseline, current, tolerance=0.2):
+    """Results whose throughput dropped more than tolerance below the baseline."""
+    old = {key(result): result for result in baseline["results"]}
+    slower = []
+    for result in current["results"]:
+        if key(result) in old:
+            ratio = result["instances_per_sec"] / old[key(result)]["instances_per_sec"]
+            if ratio < 1 - tolerance:
+                slower.append((result, ratio))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the offline solver and the online algorithms.")
+    parser.add_argument("--save", help="write the results as a JSON baseline to this file")
+    parser.add_argument("--compare", help="flag regressions against this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative drop in instances/sec (default 0.2)")
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="seconds to spend on every cell (default 0.5)")
+    parser.add_argument("--quick", action="store_true", help="only run a small grid")
+    parser.add_argument("--algorithm", action="append", help="only run these algorithms")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="instrument the algorithms and write PREFIX.json and PREFIX.prof (pstats)")
+    args = parser.parse_args(argv)
+
+    grid = QUICK_GRID if args.quick else GRID
+    if args.profile:
+        with instrument() as recorder:
+            results = run(grid, args.min_time, algorithms=args.algorithm)
+        recorder.dump_json(args.profile + ".json")
+        recorder.dump_stats(args.profile + ".prof")
+    else:
+        results = run(grid, args.min_time, algorithms=args.algorithm)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        slower = regressions(baseline, results, args.tolerance)
+        for result, ratio in slower:
+            print(f"REGRESSION {format_result(result)} ({ratio:.0%} of baseline)")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import numpy as np
 from itertools import repeat
 from tqdm import tqdm
 from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
 
 from algorithms.strike import *
 from algorithms.FastGreedy import FastGreedy
@@ -11,70 +12,148 @@ from algorithms.Qthreshold import QThreshold
 from algorithms.Random import Random
 from algorithms.RandomizedPmax import RandomizedPmax
 from algorithms.offline import offline
+from algorithms.batch import InstanceBatch, ratios, offline as batch_offline
+from algorithms.cache import ResultCache
+from algorithms.sweep import Sweep, grid
+from algorithms.results import ResultStore
+from algorithms.sketch import Summary
 
 
-ALGS: list[type[Algorithm]] = [FastGreedy, QThreshold, Random, RandomizedPmax]
+ALGS: list[type[Algorithm]] = [FastGreedy, GreedyOnline, QThreshold, Random, RandomizedPmax]
 NS = [1, 2, 4, 6, 8, 10, 15, 20, 25, 30, 40, 50, 75, 100]
 MS = [1, 2, 4, 6, 8, 10, 15, 20, 25, 30, 40, 50, 75, 100]
 P_MAXS = np.logspace(0, 9, 20, base=2, dtype=int)
-
-
-def run_algorithms(ns, ms, p_maxs, writers, total, N):
-    with tqdm(total=N*total) as p:
-        for n, m, p_max in zip(ns, ms, p_maxs):
-            for i in range(N):
-                I = BoundedInstance.random(n, m, p_max, 0)
-                opt_cost = offline(I).cost
-                for alg, writer in zip(ALGS, writers):
-                    if issubclass(alg, RandomAlgorithm):
-                        if alg == RandomizedPmax:
-                            solution = alg(I, 0.9, 0.1).solution()
-                        else:
-                            solution = alg(I).solution()
-                        alg_cost = solution.cost
-                        mean = alg_cost.mean / opt_cost
-                        std = alg_cost.std / opt_cost
-                        min = alg_cost.min / opt_cost
-                        max = alg_cost.max / opt_cost
-                    elif issubclass(alg, Algorithm):
-                        if alg == QThreshold:
-                            solution = alg(I, 1/np.sqrt(p_max)).solution()
-                        else:
-                            solution = alg(I).solution()
-                        alg_cost = solution.cost
-                        mean = min = max = alg_cost / opt_cost
-                        std = 0
-                    else:
-                        raise TypeError(f"Unknown algorithm type {alg}")
-                    writer.writerow([n, m, p_max, i, mean, std, min, max])
-                p.update()
-
-
-def open_files(stack: ExitStack, suffix: str):
-    files = [stack.enter_context(open(f"data/{alg.name()}_{suffix}.csv", "w")) for alg in ALGS]
-    writers = [csv.writer(file) for file in files]
-    for writer in writers:
-        writer.writerow(["n", "m", "p_max", "I", "mean", "std", "min", "max"])
-    return writers
+CHUNK = 250  # instances per parallel task
+
+
+def params(alg, p_max):
+    """The parameters every algorithm is run with."""
+    if alg == QThreshold:
+        return (1/np.sqrt(p_max),)
+    if alg == RandomizedPmax:
+        return (0.9, 0.1)
+    return ()
+
+
+def solve(alg, B, opt_cost):
+    """[mean, std, min, max] of the ratio of alg on every instance of the batch."""
+    # Deterministic algorithms run on the whole batch at once, the randomized
+    # ones go instance by instance, with their exact cost distribution.
+    return ratios(alg, B, params(alg, int(B.p_max[0])), opt=opt_cost, statistics=True).tolist()
+
+
+def run_chunk(n, m, p_max, start, N, seed, cache=None):
+    """
+    Run all algorithms on N random instances of one (n, m, p_max) cell,
+    numbered from start. Returns the CSV rows for every algorithm in ALGS,
+    and per algorithm a Summary (Welford statistics, quantile sketch and
+    histogram) of the mean ratios in this chunk.
+    With a cache file, only the (algorithm, instance) pairs that are not in
+    it yet are solved, so an interrupted or repeated sweep skips finished work.
+    """
+    rng = np.random.default_rng(seed)
+    B = InstanceBatch.random(N, n, m, p_max, 0, rng)
+    with ExitStack() as stack:
+        if cache is None:
+            opt_cost = batch_offline(B).cost
+            results = [solve(alg, B, opt_cost) for alg in ALGS]
+        else:
+            results = run_cached(stack.enter_context(ResultCache(cache)), B)
+    rows = [[[n, m, p_max, start + i, *result] for i, result in enumerate(alg_results)]
+            for alg_results in results]
+    stats = [Summary.from_block([row[4] for row in alg_rows]) for alg_rows in rows]
+    return rows, stats
+
+
+def run_cached(cache, B):
+    """solve() every algorithm on B, looking up and storing the results in the cache."""
+    digests = B.digests()
+    keys = [[ResultCache.key(alg.name(), params(alg, int(p_max)), None, digest)
+             for p_max, digest in zip(B.p_max, digests)] for alg in ALGS]
+    found = cache.get_many([key for alg_keys in keys for key in alg_keys])
+    missing = [[k for k, key in enumerate(alg_keys) if key not in found] for alg_keys in keys]
+    todo = sorted(set().union(*missing))
+    if todo:
+        opt_cost = dict(zip(todo, batch_offline(B.take(todo)).cost))
+        for alg, alg_keys, alg_missing in zip(ALGS, keys, missing):
+            if alg_missing:
+                results = solve(alg, B.take(alg_missing), [opt_cost[k] for k in alg_missing])
+                new = {alg_keys[k]: result for k, result in zip(alg_missing, results)}
+                cache.put_many(new)
+                found.update(new)
+    return [[found[key] for key in alg_keys] for alg_keys in keys]
+
+
+def run_algorithms(ns, ms, p_maxs, store, total, N, workers=None, seed=None, cache=None):
+    """
+    Shard the cells into chunks of CHUNK instances and run them on a process
+    pool. Every chunk gets its own child of the root seed and the results are
+    appended to the ResultStore in chunk order, so the output does not depend on
+    the number of workers.
+    Returns per algorithm the Summary of the mean ratio in every cell,
+    merged from the summaries of the chunks. See run_chunk for the cache.
+    """
+    cells = [(int(n), int(m), int(p_max)) for n, m, p_max in zip(ns, ms, p_maxs)]
+    starts = range(0, N, CHUNK)
+    seeds = iter(np.random.SeedSequence(seed).spawn(len(cells) * len(starts)))
+    jobs = [(n, m, p_max, start, min(CHUNK, N - start), next(seeds), cache)
+            for n, m, p_max in cells for start in starts]
+    with ExitStack() as stack, tqdm(total=N*total) as p:
+        if workers == 1:
+            results = map(run_chunk, *zip(*jobs))
+        else:
+            pool = stack.enter_context(ProcessPoolExecutor(workers))
+            results = pool.map(run_chunk, *zip(*jobs))
+        stats = {alg.name(): [Summary() for _ in cells] for alg in ALGS}
+        for job, (rows, chunk_stats) in enumerate(results):
+            for alg, alg_rows, alg_stats in zip(ALGS, rows, chunk_stats):
+                columns = dict(zip(["n", "m", "p_max", "I", "mean", "std", "min", "max"], np.array(alg_rows).T))
+                store.append(algorithm=alg.name(), params=",".join(map(str, params(alg, rows[0][0][2]))),
+                             **columns)
+                stats[alg.name()][job // len(starts)].merge(alg_stats)
+            p.update(len(rows[0]))
+    return stats
+
+
+def run_sweep(cells, file, target=1e-3, workers=None, seed=None, checkpoint=None):
+    """
+    Sample every cell until its mean ratio is known within target (see Sweep),
+    checkpointing to file + ".checkpoint.json" by default, and write one row
+    per cell to the file. q05, median and q95 are NaN for cells continued from
+    a checkpoint without quantile sketches (see Progress.quantile).
+    """
+    checkpoint = file + ".checkpoint.json" if checkpoint is None else checkpoint
+    sweep = Sweep(cells, target, seed=seed, checkpoint=checkpoint)
+    sweep.run(workers)
+    with open(file, "w") as f:
+        writer = csv.writer(f)
+        writer.writerow(["algorithm", "params", "n", "m", "p_max", "h_max",
+                         "samples", "mean", "std", "min", "max", "halfwidth", "q05", "median", "q95"])
+        for cell, ratio, halfwidth in sweep:
+            quantiles = sweep.progress[cell.key()].quantile([0.05, 0.5, 0.95]).tolist()
+            writer.writerow([cell.algorithm.name(), ";".join(f"{k}={v}" for k, v in cell.params),
+                             cell.n, cell.m, cell.p_max, cell.h_max, int(ratio.count),
+                             float(ratio.mean), float(ratio.std), float(ratio.min), float(ratio.max), halfwidth,
+                             *quantiles])
 
 
 def main():
     N=1000
-    # with ExitStack() as stack:
-    #     writers = open_files(stack, "n")
-    #     run_algorithms(NS, repeat(10), repeat(128), writers, len(NS), N)
+    # with ResultStore("data/n", mode="w") as store:
+    #     run_algorithms(NS, repeat(10), repeat(128), store, len(NS), N)
 
-    # with ExitStack() as stack:
-    #     writers = open_files(stack, "m")
-    #     run_algorithms(repeat(10), MS, repeat(128), writers, len(MS), N)
+    # with ResultStore("data/m", mode="w") as store:
+    #     run_algorithms(repeat(10), MS, repeat(128), store, len(MS), N)
 
-    # with ExitStack() as stack:
-    #     writers = open_files(stack, "p_max")
-    #     run_algorithms(repeat(10), repeat(10), P_MAXS, writers, len(P_MAXS), N)
+    # with ResultStore("data/p_max", mode="w") as store:
+    #     run_algorithms(repeat(10), repeat(10), P_MAXS, store, len(P_MAXS), N)
 
-    with ExitStack() as stack:
-        writers = open_files(stack, "violin")
-        run_algorithms([10], [10], [128], writers, 1, 10_000)
+    # run_sweep(grid(NS, MS, 128, 0, {QThreshold: {"q": [1/16, 1/8, 1/4]}, FastGreedy: {},
+    #                                  RandomizedPmax: {"alpha": [0.9], "beta": [0.1]}}),
+    #           "data/sweep.csv", target=1e-2)
+
+    with ResultStore("data/violin", mode="w") as store:
+        run_algorithms([10], [10], [128], store, 1, 10_000)
 
 
 
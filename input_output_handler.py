@@ -1,21 +1,11 @@
+from algorithms.strike import parse_instance
+
+
 # Loads an input file assuming a certain format, returns a list of parameters.
+# The parameters are not validated here, that is left to validate_params.
 def deserialize(file):
     with open(file, 'r') as f:
-        s = []
-        p = []
-        h = []
-
-        lines = [line for line in f]
-    
-        n = int(lines[0])
-        m = int(lines[1])
-        for i in range(2, len(lines)):
-            sph = lines[i].split(', ')
-            s.append(int(sph[0]))
-            p.append(int(sph[1]))
-            h.append(int(sph[2]))
-    
-    return [n, m, s, p, h]
+        return list(parse_instance(f.read()))
 
 def validate_params(n, m, s, p, h):
     if sum(s) < n:
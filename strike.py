@@ -0,0 +1,234 @@
+"""
+One entry point for everything: python strike.py {solve,generate,run,sweep,bench,plot}.
+The algorithms and their parameters come from algorithms/registry.py. Every
+subcommand imports what it needs itself, so e.g. solving a single instance
+offline does not wait for NumPy, matplotlib or tqdm to load.
+"""
+import argparse
+import os
+import sys
+from algorithms.registry import REGISTRY, get
+
+
+def param(text):
+    """A NAME=VALUE algorithm parameter."""
+    name, _, value = text.partition("=")
+    try:
+        return name, float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text!r}")
+
+
+def solve(args):
+    from algorithms.strike import Algorithm, BoundedInstance, Instance
+    entry = get(args.algorithm)
+    I = Instance.from_file(args.file)
+    if entry.name == "offline":
+        solution = entry.load()(I)
+    else:
+        I = BoundedInstance(I.n, I.m, I.s, I.p, I.h,
+                            args.p_max if args.p_max is not None else max(I.p),
+                            args.h_max if args.h_max is not None else max(I.h))
+        kwargs = entry.kwargs(I, **dict(args.param))
+        if entry.randomized:
+            from algorithms.streams import Streams
+            kwargs["rng"] = Streams(args.seed).generator(I, entry.name)
+        # A single run, also for the randomized algorithms.
+        solution = Algorithm.solution(entry.load()(I, **kwargs))
+    output = "".join(f"{flying}, {staying}\n" for flying, staying in solution)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    sys.stdout.write(output)
+    if args.cost:
+        print(f"Total cost: {solution.cost}")
+
+
+def generate(args):
+    from itertools import chain
+    from algorithms import files
+    from algorithms.generate import blocks
+    instances = chain.from_iterable(blocks(args.N, args.n, args.m, args.p_max, args.h_max, seed=args.seed,
+                                           prices=args.prices, seats=args.seats, **dict(args.param)))
+    (files.write_container if args.container else files.write)(args.output, instances)
+    print(f"{args.N} instances written to {args.output}")
+
+
+def run(args):
+    from itertools import repeat
+    from algorithms.results import ResultStore
+    from generate_data import run_algorithms
+    cells = max(len(args.n), len(args.m), len(args.p_max))
+    assert all(len(x) in (1, cells) for x in (args.n, args.m, args.p_max)), \
+        "--n, --m and --p-max must have the same number of values, or one"
+    column = lambda x: repeat(x[0], cells) if len(x) == 1 else x
+    ns, ms, p_maxs = column(args.n), column(args.m), column(args.p_max)
+    from algorithms.sketch import save
+    # A run replaces the store, so its rows and summaries.json describe the same instances.
+    summaries = os.path.join(args.store, "summaries.json")
+    if os.path.exists(summaries):
+        os.remove(summaries)
+    with ResultStore(args.store, mode="w") as store:
+        stats = run_algorithms(ns, ms, p_maxs, store, cells, args.N, args.workers, args.seed, args.cache)
+    results = {}
+    for name, cell_stats in stats.items():
+        for n, m, p_max, ratio in zip(column(args.n), column(args.m), column(args.p_max), cell_stats):
+            results[f"{name} n={n} m={m} p_max={p_max}"] = ratio
+            print(f"{name:>15} n={n:<5} m={m:<5} p_max={p_max:<6} mean ratio {ratio.mean:.4f} "
+                  f"(std {ratio.std:.4f}, median {float(ratio.quantile(0.5)):.4f}, max {ratio.max:.4f})")
+    # Enough for plot violin and plot quantiles, without reading the store.
+    save(results, summaries)
+
+
+def sweep(args):
+    from algorithms.session import OpenInstance
+    from algorithms.sweep import grid
+    from generate_data import run_sweep
+    names = args.algorithm or [name for name in REGISTRY if name != "offline"]
+    params = dict(args.param)
+    algorithms = {}
+    for entry in map(get, names):
+        assert entry.name != "offline", "offline is the reference of the ratio"
+        # The defaults are functions of the instance parameters, evaluated per cell.
+        defaults = {name: (lambda n, m, p_max, h_max, name=name, entry=entry:
+                           entry.kwargs(OpenInstance.open(n, m, p_max, h_max))[name])
+                    for name, _ in entry.params}
+        algorithms[entry.load()] = {name: [params.get(name, default)] for name, default in defaults.items()}
+    cells = grid(args.n, args.m, args.p_max, args.h_max, algorithms)
+    run_sweep(cells, args.output, args.target, args.workers, args.seed)
+    print(f"{len(cells)} cells written to {args.output}")
+
+
+def bench(args):
+    from benchmark import main
+    main(args.options)
+
+
+def plot(args):
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from algorithms import sketch
+    from algorithms.results import ResultStore, open_results
+    plt.figure(dpi=300)
+    summaries = os.path.join(args.store, "summaries.json")
+    if args.kind in ("violin", "quantiles") and os.path.exists(summaries):
+        # Drawn from the sketches written by strike.py run, in bounded memory.
+        summaries = sketch.load(summaries)
+        names = [name for name in summaries if not args.algorithm or name.split()[0] in args.algorithm]
+        if args.kind == "violin":
+            plt.gca().violin([summaries[name].violin() for name in names], showmeans=True)
+            plt.xticks(ticks=range(1, len(names) + 1), labels=[name.replace(" ", "\n") for name in names])
+        else:
+            q = np.linspace(0, 1, 201)
+            for name in names:
+                plt.plot(q, summaries[name].quantile(q), label=name)
+            plt.xlabel("quantile")
+            plt.legend()
+        plt.ylabel("Competitive ratio")
+        plt.yscale("log")
+        plt.savefig(args.output)
+        return
+    assert args.kind != "quantiles", f"plot quantiles needs {summaries} (see strike.py run)"
+    store = ResultStore(args.store) if os.path.isdir(args.store) else open_results(args.store)
+    names = args.algorithm or sorted(set(store.load(["algorithm"])["algorithm"]))
+    if args.kind == "violin":
+        data = [store.load(["mean"], algorithm=name)["mean"] for name in names]
+        plt.violinplot(data, showmeans=True)
+        plt.xticks(ticks=range(1, len(names) + 1), labels=names)
+    else:
+        for name in names:
+            data = store.load([args.kind, "mean"], algorithm=name)
+            x, inverse = np.unique(data[args.kind], return_inverse=True)
+            counts = np.bincount(inverse)
+            mean = np.bincount(inverse, data["mean"]) / counts
+            std = np.sqrt(np.bincount(inverse, (data["mean"] - mean[inverse]) ** 2) / counts)
+            plt.plot(x, mean, label=name)
+            plt.fill_between(x, mean - std, mean + std, alpha=0.05)
+        plt.xlabel(args.kind)
+        plt.xscale("log")
+        plt.legend()
+    plt.ylabel("Competitive ratio")
+    plt.yscale("log")
+    plt.savefig(args.output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="strike", description="Solve and evaluate the strike problem.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    algorithms = ", ".join(REGISTRY)
+
+    p = commands.add_parser("solve", help="solve one instance file and print the schedule")
+    p.add_argument("file", help="instance file, e.g. input/1")
+    p.add_argument("--algorithm", "-a", default="offline", help=f"one of {algorithms} (default offline)")
+    p.add_argument("--param", "-p", type=param, action="append", default=[], metavar="NAME=VALUE",
+                   help="algorithm parameter, instead of its default")
+    p.add_argument("--p-max", type=int, help="bound on the prices known online (default max(p))")
+    p.add_argument("--h-max", type=int, help="bound on the hotel costs known online (default max(h))")
+    p.add_argument("--seed", type=int, help="root seed of the randomized algorithms")
+    p.add_argument("--output", "-o", help="also write the schedule to this file")
+    p.add_argument("--cost", action="store_true", help="also print the total cost")
+    p.set_defaults(run=solve)
+
+    p = commands.add_parser("generate", help="write random instances to one file, e.g. for the daemon or files.load")
+    p.add_argument("N", type=int, help="number of instances")
+    p.add_argument("--n", type=int, default=10, help="people (default 10)")
+    p.add_argument("--m", type=int, default=10, help="days (default 10)")
+    p.add_argument("--p-max", type=int, default=128, help="maximum price (default 128)")
+    p.add_argument("--h-max", type=int, default=0, help="maximum hotel cost (default 0)")
+    p.add_argument("--prices", default="uniform", help="price model in algorithms/generate.py (default uniform)")
+    p.add_argument("--param", "-p", type=param, action="append", default=[], metavar="NAME=VALUE",
+                   help="parameter of the price model, e.g. sigma=10")
+    p.add_argument("--seats", type=int, nargs=2, metavar=("LOW", "HIGH"),
+                   help="seats per day uniform in [LOW, HIGH] (default n)")
+    p.add_argument("--seed", type=int, help="root seed")
+    p.add_argument("--container", action="store_true", help="write an indexed container (see algorithms/files.py)")
+    p.add_argument("--output", "-o", default="data/instances", help="instance file (default data/instances)")
+    p.set_defaults(run=generate)
+
+    p = commands.add_parser("run", help="run every algorithm on random instances into a result store")
+    p.add_argument("--n", type=int, nargs="+", default=[10], help="people per cell (default 10)")
+    p.add_argument("--m", type=int, nargs="+", default=[10], help="days per cell (default 10)")
+    p.add_argument("--p-max", type=int, nargs="+", default=[128], help="maximum price per cell (default 128)")
+    p.add_argument("-N", type=int, default=1000, help="instances per cell (default 1000)")
+    p.add_argument("--store", default="data/run", help="result store directory, replaced (default data/run)")
+    p.add_argument("--workers", type=int, help="worker processes (default all cores)")
+    p.add_argument("--seed", type=int, help="root seed")
+    p.add_argument("--cache", help="sqlite file to reuse results of earlier runs from")
+    p.set_defaults(run=run)
+
+    p = commands.add_parser("sweep", help="sample a grid of cells until every mean ratio is known to --target")
+    p.add_argument("--n", type=int, nargs="+", default=[10])
+    p.add_argument("--m", type=int, nargs="+", default=[10])
+    p.add_argument("--p-max", type=int, nargs="+", default=[128])
+    p.add_argument("--h-max", type=int, nargs="+", default=[0])
+    p.add_argument("--algorithm", "-a", action="append", help="only these algorithms (default all online ones)")
+    p.add_argument("--param", "-p", type=param, action="append", default=[], metavar="NAME=VALUE",
+                   help="algorithm parameter, for every algorithm that has it")
+    p.add_argument("--target", type=float, default=1e-3, help="confidence halfwidth (default 0.001)")
+    p.add_argument("--workers", type=int, help="worker processes (default all cores)")
+    p.add_argument("--seed", type=int, help="root seed")
+    p.add_argument("--output", "-o", default="data/sweep.csv", help="summary CSV (default data/sweep.csv)")
+    p.set_defaults(run=sweep)
+
+    # The options are parsed by benchmark.py itself, see strike.py bench --help.
+    p = commands.add_parser("bench", help="benchmark the algorithms (options of benchmark.py)", add_help=False)
+    p.set_defaults(run=bench)
+
+    p = commands.add_parser("plot", help="plot the ratios in a result store")
+    p.add_argument("kind", choices=["violin", "quantiles", "n", "m", "p_max"],
+                   help="a violin plot or the quantiles per algorithm, or the mean ratio against n, m or p_max")
+    p.add_argument("store", help="result store directory, or a name in data/ like violin")
+    p.add_argument("--algorithm", "-a", action="append", help="only these algorithms")
+    p.add_argument("--output", "-o", default="figures/plot.png", help="image file (default figures/plot.png)")
+    p.set_defaults(run=plot)
+
+    args, options = parser.parse_known_args(argv)
+    if args.command == "bench":
+        args.options = options
+    elif options:
+        parser.error(f"unrecognized arguments: {' '.join(options)}")
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
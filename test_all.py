@@ -4,8 +4,13 @@ import os
 sys.path.insert(1, os.path.dirname(os.path.dirname(__file__))) # needed to access other code
 
 import numpy as np
-from algorithms.online import QThreshold, Random, RandomizedPmaxProximityOnline, GreedyOnline, FastGreedyOnline
-from utility_functions import generate_test_instances, plot_data, test_online
+from algorithms.store import InstanceStore
+from algorithms.Qthreshold import QThreshold
+from algorithms.Random import Random
+from algorithms.RandomizedPmax import RandomizedPmax
+from algorithms.Greedy import GreedyOnline
+from algorithms.FastGreedy import FastGreedy
+from utility_functions import generate_test_instances, offline_costs, plot_data, test_online
 
 # use this script to automate testing multiple algorithms.
 
@@ -15,21 +20,22 @@ LAMBDA = 1 #The lambda value used as the upper limit for generating random value
 p_min = 1
 p_max = 100
 
-instances = list(generate_test_instances(N=N, n=(10), m=(10), s=1000, h=0, p=(p_min, p_max)))
+instances = InstanceStore.from_instances(generate_test_instances(N=N, n=(10), m=(10), s=1000, h=0, p=(p_min, p_max)))
+opt_costs = offline_costs(instances)
 
-qThreshold_data = test_online(N, instances, QThreshold, np.sqrt(1/p_max))
+qThreshold_data = test_online(N, instances, QThreshold, np.sqrt(1/p_max), opt_costs=opt_costs)
 plot_data('figures', 'qThreshold', qThreshold_data)
 
-randomizedPmaxProximityOnline_data = test_online(N, instances, RandomizedPmaxProximityOnline, 0.9, 0.2)
+randomizedPmaxProximityOnline_data = test_online(N, instances, RandomizedPmax, 0.9, 0.2, opt_costs=opt_costs)
 plot_data('figures', 'RandomizedPmaxProximityOnline', randomizedPmaxProximityOnline_data)
 
-# random_data = test_online(N, instances, Random)
+# random_data = test_online(N, instances, Random, opt_costs=opt_costs)
 # plot_data('figures', 'RandomOnline', random_data)
 
-# greedy_online = test_online(N, instances, GreedyOnline)
+# greedy_online = test_online(N, instances, GreedyOnline, opt_costs=opt_costs)
 # plot_data('figures', 'GreedyOnline', greedy_online)
 
-fast_greedy = test_online(N, instances, FastGreedyOnline)
+fast_greedy = test_online(N, instances, FastGreedy, opt_costs=opt_costs)
 plot_data('figures', 'FastGreedyOnline', fast_greedy)
 
 plot_data('figures', 'violin2',
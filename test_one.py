@@ -1,7 +1,6 @@
 import sys
-import numpy as np
-from algorithms.offline import offline
-from algorithms.Qthreshold import qThresholdOnline, RandomizedQThresholdOnline
+from algorithms.strike import Algorithm, BoundedInstance
+from algorithms.registry import get
 from input_output_handler import deserialize, validate_params, parse_output, serialize
 
 input_file_directory = 'input'
@@ -23,23 +22,23 @@ params = deserialize(f'{input_file_directory}/{case}')
 
 # validate the parameters
 validate_params(*params)
-p_max = np.max(params[3])
+I = BoundedInstance(*params, max(params[3]), max(params[4]))
 
-# select algorithm function
-if algorithm == "offline": # offline algorithm
-    output = offline(*params)
-
-elif algorithm == "deterministic": # online deterministic algorithm
-    output = qThresholdOnline(np.sqrt(1/p_max), p_max).solve_instance(params)
-
-elif algorithm == "random": # online randomized algorithm
-    output = RandomizedQThresholdOnline(np.sqrt(1/p_max), p_max).solve_instance(params)
+# select algorithm, by its name in algorithms/registry.py or one of the aliases below
+aliases = {"deterministic": "QThreshold", "random": "RandomizedPmax"}
+try:
+    entry = get(aliases.get(algorithm, algorithm))
+except KeyError:
+    entry = get("offline") # default, fallback
 
+if entry.name == "offline":
+    solution = entry.load()(I)
 else:
-    output = offline(*params) # default, fallback
+    # a single run, also for the randomized algorithms
+    solution = Algorithm.solution(entry.load()(I, **entry.kwargs(I)))
 
-schedule = output[0]
-total_price = output[1]
+schedule = list(solution)
+total_price = solution.cost
 
 # parse output to the desired format neat
 parsedOutput = parse_output(schedule)
@@ -0,0 +1,25 @@
+from itertools import product
+import pytest
+from algorithms.adversary import worst_case
+from algorithms.strike import BoundedInstance
+from algorithms.FastGreedy import FastGreedy
+from algorithms.Greedy import GreedyOnline
+from algorithms.Qthreshold import QThreshold
+
+
+def brute_force(algorithm, n, m, p_max, kwargs):
+    """The worst ratio over every price sequence, with s[i] = n and h[i] = 0."""
+    worst = 0
+    for p in product(range(1, p_max + 1), repeat=m):
+        I = BoundedInstance(n, m, [n] * m, list(p), [0] * m, p_max, 0)
+        worst = max(worst, float(algorithm(I, **kwargs).solution().cost) / (n * min(p)))
+    return worst
+
+
+@pytest.mark.parametrize("algorithm, kwargs", [(GreedyOnline, {}), (FastGreedy, {}), (QThreshold, {"q": 0.5})])
+def test_worst_case_matches_brute_force(algorithm, kwargs):
+    n, m, p_max = 3, 4, 5
+    witness = worst_case(algorithm, n, m, p_max, kwargs=kwargs, workers=1)
+    assert witness.ratio == pytest.approx(brute_force(algorithm, n, m, p_max, kwargs))
+    I = witness.I
+    assert float(algorithm(I, **kwargs).solution().cost) / (n * min(I.p)) == pytest.approx(witness.ratio)
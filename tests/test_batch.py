@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from algorithms.batch import InstanceBatch, batch, offline as batch_offline
+from algorithms.offline import offline
+from algorithms.FastGreedy import FastGreedy
+from algorithms.Greedy import GreedyOnline
+from algorithms.Qthreshold import QThreshold
+
+
+@pytest.fixture
+def B():
+    return InstanceBatch.random(200, 10, 8, 64, 8, np.random.default_rng(1))
+
+
+@pytest.mark.parametrize("algorithm, kwargs", [(GreedyOnline, {}), (FastGreedy, {}), (QThreshold, {"q": 0.25})])
+def test_batch_matches_scalar(B, algorithm, kwargs):
+    solution = batch(algorithm)(B, **kwargs).solution()
+    for k, I in enumerate(B):
+        scalar = algorithm(I, **kwargs).solution()
+        assert np.array_equal(solution.f[k], scalar.f)
+        assert solution.cost[k] == scalar.cost
+
+
+def test_offline_batch_matches_scalar(B):
+    solution = batch_offline(B)
+    for k, I in enumerate(B):
+        scalar = offline(I)
+        assert np.array_equal(solution.f[k], scalar.f)
+        assert solution.cost[k] == scalar.cost
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run(*args):
+    """Run python with the arguments in the repository, returning the best of three wall times."""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_solve_offline_skips_heavy_modules():
+    script = ("import sys, strike; strike.main(['solve', 'input/1']); "
+              "heavy = [name for name in sys.modules if name.split('.')[0] in ('numpy', 'tqdm', 'matplotlib') "
+              "or name in ('algorithms.store', 'algorithms.batch', 'algorithms.files')]; "
+              "assert not heavy, heavy")
+    run("-c", script)
+
+
+def test_solve_offline_starts_before_numpy_would_have_loaded():
+    assert run("strike.py", "solve", "input/1") < run("-c", "import numpy")
+
+
+def test_solve_matches_output():
+    result = subprocess.run([sys.executable, "strike.py", "solve", "input/1"], cwd=ROOT, check=True,
+                            capture_output=True, text=True)
+    assert result.stdout == (ROOT / "output" / "1").read_text()
@@ -0,0 +1,84 @@
+import io
+import json
+from pathlib import Path
+import pytest
+from algorithms import daemon
+from algorithms.offline import offline
+from algorithms.strike import BoundedInstance, Instance
+from algorithms.FastGreedy import FastGreedy
+
+ROOT = Path(__file__).resolve().parent.parent
+TEXT = "4\n3\n4, 5, 0\n4, 2, 1\n4, 9, 0\n"
+INSTANCE = {"n": 4, "m": 3, "s": [4, 4, 4], "p": [5, 2, 9], "h": [0, 1, 0]}
+
+
+def test_parse_request_kinds():
+    request = daemon.parse(str(ROOT / "input" / "1") + "\n", 7, "offline")
+    assert (request.id, request.algorithm, request.output) == (7, "offline", "1")
+    I = Instance.from_file(str(ROOT / "input" / "1"))
+    assert [(J.n, J.s, J.p, J.h) for J in request.instances] == [(I.n, I.s, I.p, I.h)]
+
+    request = daemon.parse(json.dumps({"text": TEXT, "id": "a", "algorithm": "qthreshold",
+                                       "params": {"q": 0.5}, "output": "a.out"}), 8, "offline")
+    assert (request.id, request.algorithm, request.params, request.output) == ("a", "QThreshold", {"q": 0.5}, "a.out")
+    assert [(I.n, I.s, I.p, I.h) for I in request.instances] == [(4, [4, 4, 4], [5, 2, 9], [0, 1, 0])]
+
+    request = daemon.parse(json.dumps({"instance": INSTANCE}), 9, "FastGreedy")
+    assert (request.id, request.algorithm, request.output) == (9, "FastGreedy", None)
+    assert request.instances == [BoundedInstance(4, 3, [4, 4, 4], [5, 2, 9], [0, 1, 0], 9, 1)]
+    request = daemon.parse(json.dumps({"instance": {**INSTANCE, "p_max": 16}}), 10, "offline")
+    assert request.instances == [BoundedInstance(4, 3, [4, 4, 4], [5, 2, 9], [0, 1, 0], 16, 1)]
+
+
+@pytest.mark.parametrize("output", ["../escape", "dir/file", "/tmp/file", "", ".", "..", 5])
+def test_parse_rejects_output_outside_the_directory(output):
+    with pytest.raises(AssertionError, match="output must be a file name"):
+        daemon.parse(json.dumps({"text": TEXT, "output": output}), 1, "offline")
+
+
+def serve(lines, tmp_path, **kwargs):
+    out = io.StringIO()
+    daemon.serve(io.StringIO("".join(line + "\n" for line in lines)), output=str(tmp_path / "output"),
+                 out=out, **kwargs)
+    return {response["id"]: response for response in map(json.loads, out.getvalue().splitlines())}
+
+
+def test_serve(tmp_path):
+    I = BoundedInstance(4, 3, [4, 4, 4], [5, 2, 9], [0, 1, 0], 9, 1)
+    responses = serve([
+        str(ROOT / "input" / "1"),
+        json.dumps({"id": "text", "text": TEXT + TEXT, "output": "text"}),
+        json.dumps({"id": "greedy", "instance": INSTANCE, "algorithm": "FastGreedy"}),
+        json.dumps({"id": "random", "instance": INSTANCE, "algorithm": "Random"}),
+        "{not json",
+        json.dumps({"id": "escape", "text": TEXT, "output": "../escape"}),
+        json.dumps({"id": "unknown", "instance": INSTANCE, "algorithm": "Oracle"}),
+        str(tmp_path / "missing"),
+        json.dumps({"id": "seats", "instance": {**INSTANCE, "s": [1, 1, 1]}}),
+    ], tmp_path, seed=3)
+    assert len(responses) == 9
+    # The schedule file has the format of output/.
+    assert responses[1]["solutions"][0]["cost"] == offline(Instance.from_file(str(ROOT / "input" / "1"))).cost
+    assert (tmp_path / "output" / "1").read_text() == (ROOT / "output" / "1").read_text()
+    assert [solution["cost"] for solution in responses["text"]["solutions"]] == [offline(I).cost] * 2
+    assert (tmp_path / "output" / "text").read_text() == \
+        "".join(f"{f_i}, {r_i}\n" for f_i, r_i in offline(I)) * 2
+    assert responses["greedy"]["solutions"][0]["cost"] == FastGreedy(I).solution().cost
+    assert responses["random"]["algorithm"] == "Random" and "f" in responses["random"]["solutions"][0]
+    # Every bad request gets an error line, and the others are still answered.
+    assert "Expecting property name" in responses[5]["error"]
+    assert "output must be a file name" in responses[6]["error"]
+    assert "unknown algorithm" in responses[7]["error"]
+    assert "missing" in responses[8]["error"]
+    assert "sum(s) must be at least n" in responses[9]["error"]
+    assert not (tmp_path / "escape").exists()
+
+
+def test_serve_randomized_is_reproducible(tmp_path):
+    line = json.dumps({"instance": INSTANCE, "algorithm": "RandomizedPmax"})
+    assert serve([line], tmp_path, seed=4) == serve([line], tmp_path, seed=4)
+
+
+def test_serve_refuses_to_write_into_the_watched_directory(tmp_path):
+    with pytest.raises(AssertionError, match="must differ"):
+        daemon.serve(None, directory=str(tmp_path), output=str(tmp_path))
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from algorithms.strike import BoundedInstance, RandomAlgorithm
+from algorithms.Random import Random
+from algorithms.RandomizedPmax import RandomizedPmax
+
+
+I = BoundedInstance(12, 6, [12] * 6, [40, 10, 63, 12, 9, 51], [3, 0, 5, 1, 2, 4], 64, 5)
+
+
+@pytest.mark.parametrize("algorithm, kwargs", [(Random, {}), (RandomizedPmax, {"alpha": 0.9, "beta": 0.1})])
+def test_exact_matches_simulation(algorithm, kwargs):
+    K = 100_000
+    exact = algorithm(I, **kwargs).exact()
+    runs = algorithm(I, **kwargs).simulate(K, np.random.default_rng(2))
+    # Within five standard errors of the simulated mean.
+    assert abs(exact.cost.mean - runs.cost.mean()) < 5 * runs.cost.std() / np.sqrt(K)
+    assert exact.cost.std == pytest.approx(runs.cost.std(), rel=0.02)
+    assert np.allclose(exact.f.mean, runs.f.mean(axis=0), atol=0.05)
+    assert exact.cost.min <= runs.cost.min() and runs.cost.max() <= exact.cost.max
+
+
+def test_exact_unsupported():
+    class Unsupported(RandomAlgorithm):
+        def setup(self, rng=None):
+            pass
+
+        def decide(self, i, n_i, s_i, p_i, h_i):
+            return n_i
+
+    with pytest.raises(TypeError):
+        Unsupported(I).exact()
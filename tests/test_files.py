@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from algorithms import files
+from algorithms.batch import InstanceBatch
+
+
+@pytest.fixture
+def instances():
+    return list(InstanceBatch.random(30, 6, 4, 20, 3, np.random.default_rng(10))) + \
+        list(InstanceBatch.random(20, 9, 7, 50, 0, np.random.default_rng(11)))
+
+
+def fields(instances):
+    """What the file format keeps of the instances (their bounds are their own maxima)."""
+    return [(I.n, I.m, I.s, I.p, I.h) for I in instances]
+
+
+def test_write_parse_round_trip(tmp_path, instances):
+    files.write(tmp_path / "instances", instances)
+    assert fields(files.load(tmp_path / "instances")) == fields(instances)
+
+
+@pytest.mark.parametrize("text, message", [
+    ("3\n", "instance 0: the header has no m"),
+    ("3\n2\n1, 2, 3\n", "instance 0: it is truncated"),
+    ("2\n1\n2, 5, 0\n3\n2\n1, x, 1\n1, 1, 1\n", "instance 1: 'x' is not an integer"),
+    ("2\n1\n2, 5, 0\n3\n0\n", "instance 1: m is 0"),
+])
+def test_parse_errors(text, message):
+    with pytest.raises(ValueError, match=message):
+        files.parse(text)
+
+
+def test_load_error_names_the_file(tmp_path):
+    (tmp_path / "bad").write_text("2\n1\n2, 5, 0\n2\n2\n1, 1, 1\n")
+    with pytest.raises(ValueError, match=r"bad, instance 1: it is truncated"):
+        files.load("input/1", tmp_path / "bad")
+
+
+def test_container(tmp_path, instances):
+    files.write_container(tmp_path / "container", instances)
+    with files.Container(tmp_path / "container") as container:
+        assert len(container) == len(instances)
+        assert fields(container.stream(chunk=7)) == fields(instances)
+        assert fields([container[-1], container[12]]) == fields([instances[-1], instances[12]])
+        assert fields(container.read(3, 9)) == fields(instances[3:9])
+        with pytest.raises(IndexError):
+            container[len(instances)]
+
+
+@pytest.mark.parametrize("corrupt, message", [
+    (lambda data: b"#not-instances" + data[14:], "is not an instance container"),
+    (lambda data: data[:data.rstrip().rfind(b"\n") + 1], "has a corrupt index"),
+])
+def test_corrupt_container(tmp_path, instances, monkeypatch, corrupt, message):
+    files.write_container(tmp_path / "container", instances)
+    (tmp_path / "container").write_bytes(corrupt((tmp_path / "container").read_bytes()))
+    opened = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda *args, **kwargs: opened.append(real_open(*args, **kwargs)) or opened[-1])
+    with pytest.raises(AssertionError, match=message):
+        files.Container(tmp_path / "container")
+    assert all(f.closed for f in opened)
@@ -0,0 +1,64 @@
+from statistics import NormalDist
+import numpy as np
+import pytest
+import strike
+from algorithms import files
+from algorithms.generate import PRICE_MODELS, blocks, generate, truncated_normal
+
+
+@pytest.mark.parametrize("mu", [-1e6, 1e6, 150.0])
+def test_truncated_normal_ends_far_outside(mu):
+    x = truncated_normal(np.random.default_rng(1), (50, 4), mu, 1.0, 1, 100)
+    assert np.all(x == (1 if mu < 1 else 100))
+
+
+def test_truncated_normal_distribution_in_the_tail():
+    # mu two standard deviations above high: most samples come from the inverse CDF.
+    mu, sigma, low, high = 12.0, 2.0, 1, 8
+    x = truncated_normal(np.random.default_rng(2), (200_000,), mu, sigma, low, high)
+    assert x.min() >= low and x.max() <= high
+    cdf = NormalDist(mu, sigma).cdf
+    mass = np.array([cdf(k + 0.5) - cdf(k - 0.5) for k in range(low, high + 1)])
+    expected = mass / mass.sum()
+    observed = np.bincount(x - low, minlength=high - low + 1) / len(x)
+    assert np.allclose(observed, expected, atol=3e-3)
+
+
+@pytest.mark.parametrize("prices", sorted(PRICE_MODELS))
+def test_price_models_stay_in_range(prices):
+    B = generate(300, 5, 12, 40, 3, prices=prices, rng=np.random.default_rng(3))
+    assert B.p.min() >= 1 and B.p.max() <= 40 and B.h.max() <= 3
+
+
+def test_seats():
+    B = generate(2000, 20, 5, 16, seats=(1, 6), rng=np.random.default_rng(4))
+    assert np.all(B.s.sum(axis=1) >= 20) and B.s.min() >= 1 and B.s.max() <= 6
+    with pytest.raises(AssertionError, match="never fit"):
+        generate(10, 31, 5, 16, seats=(1, 6))
+    with pytest.raises(AssertionError, match="rarely add up"):
+        generate(10, 30, 5, 16, seats=(1, 6), rng=np.random.default_rng(4))
+    with pytest.raises(AssertionError, match="low <= high"):
+        generate(10, 5, 5, 16, seats=(4, 2))
+
+
+def test_blocks_are_reproducible():
+    first = [B.p for B in blocks(25, 4, 6, 32, block=10, seed=5, prices="walk")]
+    again = [B.p for B in blocks(25, 4, 6, 32, block=10, seed=5, prices="walk")]
+    assert [len(p) for p in first] == [10, 10, 5]
+    assert all(np.array_equal(a, b) for a, b in zip(first, again))
+
+
+@pytest.mark.parametrize("container", [False, True])
+def test_generate_command(tmp_path, capsys, container):
+    output = str(tmp_path / "instances")
+    strike.main(["generate", "30", "--n", "7", "--m", "5", "--p-max", "50", "--prices", "normal",
+                 "-p", "sigma=5", "--seats", "2", "4", "--seed", "6", "-o", output]
+                + ["--container"] * container)
+    assert capsys.readouterr().out == f"30 instances written to {output}\n"
+    if container:
+        with files.Container(output) as f:
+            instances = list(f)
+    else:
+        instances = list(files.load(output))
+    expected = next(blocks(30, 7, 5, 50, seed=6, prices="normal", seats=(2, 4), sigma=5))
+    assert [(I.n, I.s, I.p, I.h) for I in instances] == [(I.n, I.s, I.p, I.h) for I in expected]
@@ -0,0 +1,19 @@
+import numpy as np
+from algorithms.results import ResultStore
+from generate_data import CHUNK, run_algorithms
+
+
+def run(directory, workers):
+    with ResultStore(str(directory), mode="w") as store:
+        stats = run_algorithms([4, 6], [5, 3], [16, 32], store, 2, CHUNK + 10, workers=workers, seed=8)
+    return ResultStore(str(directory)).load(), stats
+
+
+def test_run_algorithms_does_not_depend_on_workers(tmp_path):
+    serial, serial_stats = run(tmp_path / "serial", 1)
+    parallel, parallel_stats = run(tmp_path / "parallel", 2)
+    assert len(serial["mean"]) == 5 * 2 * (CHUNK + 10)
+    for name in serial:
+        assert np.array_equal(serial[name], parallel[name]), name
+    for name in serial_stats:
+        assert [s.mean for s in serial_stats[name]] == [s.mean for s in parallel_stats[name]]
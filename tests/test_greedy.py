@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from algorithms.batch import InstanceBatch, batch
+from algorithms.Greedy import GreedyOnline
+from algorithms.strike import Algorithm
+
+
+class ArgminGreedy(Algorithm):
+    """GreedyOnline as it was before bisection: np.argmin over every f_i in 0..n_i."""
+    def setup(self):
+        self.p_max = self.I.p_max
+        self.hcumsum = [0]
+        self.CC = 0
+
+    def decide(self, i, n_i, s_i, p_i, h_i):
+        if i >= self.I.m:
+            return min(n_i, s_i)
+        self.mineffprice = p_i + self.hcumsum[-1]
+        self.hcumsum.append(self.hcumsum[-1] + h_i)
+        ns = np.linspace(0, n_i, n_i+1)
+        cs = np.maximum((self.CC+p_i*ns+(self.p_max+h_i)*(n_i-ns))
+                        / (self.mineffprice*self.I.n),
+                        (self.CC+p_i*ns+(1+h_i)*(n_i-ns))
+                        / ((np.minimum(self.mineffprice,1+self.hcumsum[-1]))*self.I.n))
+        f_i = np.argmin(cs)
+        self.CC += f_i * p_i + (n_i - f_i) * h_i
+        return f_i
+
+
+@pytest.mark.parametrize("n, m, p_max, h_max", [(1, 5, 10, 0), (17, 8, 64, 0), (40, 12, 100, 9), (5, 20, 3, 2)])
+def test_bisection_matches_argmin(n, m, p_max, h_max):
+    B = InstanceBatch.random(100, n, m, p_max, h_max, np.random.default_rng(9))
+    solution = batch(GreedyOnline)(B).solution()
+    for k, I in enumerate(B):
+        expected = ArgminGreedy(I).solution()
+        assert GreedyOnline(I).solution().f == expected.f
+        assert np.array_equal(solution.f[k], expected.f)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from algorithms import files
+from algorithms.generate import generate
+from algorithms.offline import offline, offline_select, offline_stream
+
+
+def instances(seed):
+    # Few distinct prices, so many ties, and seats both below and above n.
+    yield from generate(40, 9, 30, 6, 2, seats=(1, 5), rng=np.random.default_rng(seed))
+    yield from generate(40, 50, 8, 100, 5, seats=(3, 12), rng=np.random.default_rng(seed))
+    yield from generate(10, 3, 1, 10, 0, rng=np.random.default_rng(seed))
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_offline_select_matches_offline(seed):
+    for I in instances(seed):
+        expected = offline(I)
+        solution = offline_select(I.n, I.s, I.p, I.h)
+        assert solution.cost == expected.cost
+        assert solution.to_solution(I).f == expected.f
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_offline_stream_matches_offline(tmp_path, seed):
+    for k, I in enumerate(instances(seed)):
+        file = str(tmp_path / str(k))
+        files.write(file, [I])
+        n, m, days = files.days(file)
+        solution = offline_stream(n, days)
+        expected = offline(I)
+        assert (solution.n, solution.m, solution.cost) == (I.n, I.m, expected.cost)
+        assert solution.to_solution(I).f == expected.f
+
+
+def test_offline_stream_needs_enough_seats():
+    with pytest.raises(AssertionError, match="not enough seats"):
+        offline_stream(10, [(3, 1, 0), (4, 2, 0)])
@@ -0,0 +1,51 @@
+from math import inf
+import numpy as np
+import pytest
+from algorithms.generate import generate
+from algorithms.offline import offline
+from algorithms.prefix import PrefixOptimum, prefix_costs
+from algorithms.strike import Instance
+
+
+def prefix(I, k, p=None):
+    return Instance(I.n, k, I.s[:k], (I.p if p is None else p)[:k], I.h[:k])
+
+
+def optimum(I, k, p=None):
+    """The offline optimum of the first k days, inf while they do not have enough seats."""
+    return offline(prefix(I, k, p)).cost if sum(I.s[:k]) >= I.n else inf
+
+
+@pytest.mark.parametrize("n, m, p_max, h_max, seats", [(9, 25, 6, 2, (1, 5)), (4, 12, 100, 0, None),
+                                                       (30, 15, 20, 4, (2, 9))])
+def test_prefix_optimum_matches_offline(n, m, p_max, h_max, seats):
+    for I in generate(30, n, m, p_max, h_max, seats=seats, rng=np.random.default_rng(5)):
+        tracker = PrefixOptimum(I.n)
+        for k, day in enumerate(I, 1):
+            assert tracker.append(*day) == optimum(I, k)
+            if tracker.feasible:
+                expected = offline(prefix(I, k)).f
+                assert [tracker.f().get(i, 0) for i in range(k)] == expected
+        assert prefix_costs(I).tolist() == [optimum(I, k) for k in range(1, I.m + 1)]
+
+
+def test_revise_matches_offline():
+    rng = np.random.default_rng(6)
+    for I in generate(20, 10, 20, 30, 3, seats=(1, 6), rng=rng):
+        tracker = PrefixOptimum(I.n, revisable=True)
+        p = list(I.p)
+        for k, day in enumerate(I, 1):
+            tracker.append(*day)
+            # Revise a random earlier day after every append.
+            i = int(rng.integers(0, k))
+            p[i] = int(rng.integers(1, 31))
+            assert tracker.revise(i, p[i]) == optimum(I, k, p)
+            if tracker.feasible:
+                assert [tracker.f().get(j, 0) for j in range(k)] == offline(prefix(I, k, p)).f
+
+
+def test_revise_needs_revisable():
+    tracker = PrefixOptimum(3)
+    tracker.append(5, 1, 0)
+    with pytest.raises(AssertionError, match="revisable"):
+        tracker.revise(0, 2)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from algorithms.batch import InstanceBatch
+from algorithms.offline import offline
+from algorithms.Qthreshold import QThreshold, corpus_curve, threshold_curve
+
+
+@pytest.mark.parametrize("n, m, p_max", [(1, 1, 5), (7, 6, 10), (20, 30, 97), (3, 12, 1000)])
+def test_threshold_curve_matches_qthreshold(n, m, p_max):
+    for I in InstanceBatch.random(50, n, m, p_max, 0, np.random.default_rng(4)):
+        q, cost = threshold_curve(I)
+        assert q[0] == 0 and np.all(np.diff(q) > 0)
+        for k in range(len(q)):
+            # The cost holds from the breakpoint on, and the one before it right below.
+            assert QThreshold(I, q=q[k]).solution().cost == cost[k]
+            if k > 0:
+                assert QThreshold(I, q=np.nextafter(q[k], 0)).solution().cost == cost[k - 1]
+        assert QThreshold(I, q=1.0).solution().cost == cost[-1]
+
+
+def test_corpus_curve_matches_mean_ratio():
+    B = InstanceBatch.random(200, 10, 8, 50, 0, np.random.default_rng(6))
+    instances = list(B)
+    curve = corpus_curve(instances)
+    assert np.array_equal(corpus_curve(B).q, curve.q) and np.allclose(corpus_curve(B).ratio, curve.ratio)
+    opt = [offline(I).cost for I in instances]
+    assert curve.N == len(instances)
+    for q in [0.0, 0.05, 1 / np.sqrt(50), 0.3, 0.5, 0.99, 1.0, *curve.q[1::7]]:
+        ratio = np.mean([QThreshold(I, q=q).solution().cost / opt_I for I, opt_I in zip(instances, opt)])
+        assert curve(q) == pytest.approx(ratio, rel=1e-12)
+    q, ratio = curve.best()
+    assert ratio == min(curve.ratio) and curve(q) == ratio
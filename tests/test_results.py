@@ -0,0 +1,76 @@
+from importlib.util import find_spec
+import numpy as np
+import pytest
+from algorithms.results import ResultStore, import_csv
+
+FORMATS = ["npz", pytest.param("parquet", marks=pytest.mark.skipif(find_spec("pyarrow") is None,
+                                                                    reason="needs pyarrow"))]
+
+
+def rows(n, m, algorithm, I):
+    return dict(n=n, m=m, p_max=16, I=I, algorithm=algorithm, params="",
+                mean=I / 10, std=0.0, min=1.0, max=2.0)
+
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_append_flush_and_filtered_load(tmp_path, format, monkeypatch):
+    with ResultStore(str(tmp_path), chunk=10, format=format) as store:
+        for n in [4, 6, 8]:
+            store.append(**rows(n, 5, "QThreshold", np.arange(10)))
+            store.append(**rows(n, 5, "FastGreedy", np.arange(10)))
+        store.append(**rows(2, 3, "Random", np.arange(4)))
+        # Every full chunk has been written, the last rows are still buffered.
+        assert len(store.chunks) == 6 and store.buffered == 4 and len(store) == 64
+    store = ResultStore(str(tmp_path))
+    assert len(store) == 64 and len(store.chunks) == 7
+
+    everything = store.load()
+    assert list(everything) == list(rows(0, 0, "", 0)) and len(everything["n"]) == 64
+    assert everything["mean"].dtype == np.float64 and everything["n"].dtype == np.int64
+
+    data = store.load(["I", "mean"], n=6, algorithm="FastGreedy")
+    assert list(data) == ["I", "mean"]
+    assert np.array_equal(data["I"], np.arange(10)) and np.array_equal(data["mean"], np.arange(10) / 10)
+    assert len(store.load(["n"], n=[4, 8])["n"]) == 40
+    assert np.array_equal(store.load(["I"], n=4, I=lambda I: I % 3 == 0)["I"], [0, 3, 6, 9] * 2)
+    assert len(store.load(["n"], algorithm="Greedy")["n"]) == 0
+
+    # Chunks whose statistics cannot match are not read.
+    read = []
+    original = store._read
+    monkeypatch.setattr(store, "_read", lambda file, columns: read.append(file) or original(file, columns))
+    store.load(["mean"], n=8, algorithm="QThreshold")
+    assert read == [store.chunks[4]["file"]]
+
+
+def test_modes(tmp_path):
+    with ResultStore(str(tmp_path), mode="w") as store:
+        store.append(**rows(4, 5, "QThreshold", np.arange(3)))
+    with ResultStore(str(tmp_path)) as store:
+        store.append(**rows(6, 5, "QThreshold", np.arange(2)))
+    assert ResultStore(str(tmp_path)).load(["n"])["n"].tolist() == [4, 4, 4, 6, 6]
+    # A chunk left behind by a crash before the index was updated is deleted too.
+    (tmp_path / "chunk-000099.npz").write_bytes(b"")
+    with ResultStore(str(tmp_path), mode="w") as store:
+        assert len(store) == 0
+        store.append(**rows(8, 5, "FastGreedy", 0))
+    assert sorted(file.name for file in tmp_path.iterdir()) == ["chunk-000000.npz", "index.json"]
+    data = ResultStore(str(tmp_path)).load(["n", "algorithm"])
+    assert data["n"].tolist() == [8] and data["algorithm"].tolist() == ["FastGreedy"]
+
+
+def test_append_rejects_wrong_columns(tmp_path):
+    store = ResultStore(str(tmp_path))
+    with pytest.raises(AssertionError, match="columns must be"):
+        store.append(n=1)
+    with pytest.raises(AssertionError, match="wrong length"):
+        store.append(**rows(4, 5, "QThreshold", np.arange(3)) | {"mean": [0.5, 0.6]})
+
+
+def test_import_csv(tmp_path):
+    (tmp_path / "old.csv").write_text("n,m,p_max,I,mean,std,min,max\n4,5,16,0,1.5,0.1,1,2\n4,5,16,1,1.25,0,1,1.5\n")
+    with ResultStore(str(tmp_path / "store")) as store:
+        import_csv(store, str(tmp_path / "old.csv"), "FastGreedy")
+    data = ResultStore(str(tmp_path / "store")).load()
+    assert data["algorithm"].tolist() == ["FastGreedy"] * 2 and data["mean"].tolist() == [1.5, 1.25]
+    assert data["I"].tolist() == [0, 1] and data["params"].tolist() == ["", ""]
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from algorithms.sketch import KLL, Summary, load, save
+
+
+def rank_error(sketch, x):
+    """The largest difference between the estimated and the true rank of the quantiles."""
+    q = np.linspace(0.01, 0.99, 99)
+    x = np.sort(x)
+    return np.max(np.abs(np.searchsorted(x, sketch.quantile(q), side='right') / len(x) - q))
+
+
+def test_kll_rank_error():
+    x = np.random.default_rng(3).pareto(1.5, 200_000) + 1
+    sketch = KLL(200)
+    for block in np.split(x, 200):
+        sketch.update(block)
+    assert sketch.count == len(x)
+    assert sketch.size < 1000
+    assert sketch.quantile(0) == x.min() and sketch.quantile(1) == x.max()
+    assert rank_error(sketch, x) < 0.02
+
+
+def test_kll_merge():
+    rng = np.random.default_rng(4)
+    a, b = rng.pareto(1.5, 50_000) + 1, rng.exponential(2, 70_000) + 1
+    merged = KLL(200, seed=1).update(a).merge(KLL(200, seed=2).update(b))
+    assert merged.count == len(a) + len(b)
+    assert rank_error(merged, np.concatenate([a, b])) < 0.02
+
+
+def test_violin_plot_of_summaries(tmp_path):
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    import strike
+    from utility_functions import violin_plot_summaries
+    rng = np.random.default_rng(5)
+    summaries = {name: Summary.from_block(rng.pareto(1.5, 10_000) + 1) for name in ("A n=10", "B n=10")}
+    save(summaries, tmp_path / "summaries.json")
+    strike.main(["plot", "violin", str(tmp_path), "--output", str(tmp_path / "strike.png")])
+    violin_plot_summaries(tmp_path, "summaries.png", load(tmp_path / "summaries.json"))
+    assert (tmp_path / "strike.png").stat().st_size > 0
+    assert (tmp_path / "summaries.png").stat().st_size > 0
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from algorithms.batch import InstanceBatch
+from algorithms.store import InstanceStore
+from algorithms.strike import BoundedInstance
+
+
+@pytest.fixture
+def instances():
+    rng = np.random.default_rng(6)
+    return [BoundedInstance.random(int(rng.integers(1, 20)), int(rng.integers(1, 12)), 50, 5, rng)
+            for _ in range(40)]
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_round_trip(tmp_path, instances, mmap):
+    InstanceStore.from_instances(instances).save(tmp_path / "store.bin")
+    store = InstanceStore.load(tmp_path / "store.bin", mmap=mmap)
+    assert len(store) == len(instances)
+    assert list(store) == instances
+
+
+def test_negative_and_out_of_range_indices(instances):
+    store = InstanceStore.from_instances(instances)
+    assert store[-1] == instances[-1]
+    assert store[-len(instances)] == instances[0]
+    for k in (len(instances), -len(instances) - 1):
+        with pytest.raises(IndexError):
+            store[k]
+
+
+def test_validation(instances):
+    I = next(I for I in instances if max(I.p) > 1)
+    with pytest.raises(AssertionError, match="sum"):
+        InstanceStore([100], [2], [10], [0], [1, 1], [1, 1], [0, 0])
+    with pytest.raises(AssertionError, match="p_max"):
+        InstanceStore([I.n], [I.m], [max(I.p) - 1], [I.h_max], I.s, I.p, I.h)
+
+
+def test_batches(instances):
+    store = InstanceStore.from_instances(instances)
+    for ks, B in store.batches():
+        assert list(B) == [instances[k] for k in ks]
+    B = InstanceBatch.random(10, 5, 4, 20, 3, np.random.default_rng(7))
+    assert list(InstanceStore.from_batch(B)) == list(B)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from algorithms.Random import Random
+from algorithms.RandomizedPmax import RandomizedPmax
+from algorithms.strike import Algorithm, BoundedInstance
+from algorithms.streams import Streams
+
+I = BoundedInstance(6, 5, [6] * 5, [40, 10, 63, 12, 9], [0, 2, 1, 0, 3], 64, 3)
+ALGORITHMS = [(Random, {}), (RandomizedPmax, {"alpha": 0.5, "beta": 0.5})]
+
+
+@pytest.mark.parametrize("algorithm, kwargs", ALGORITHMS)
+def test_modes_draw_the_same_trajectories(algorithm, kwargs):
+    streams = Streams(3)
+    block = algorithm(I, **kwargs).simulate(10, streams.replicas(I, algorithm.name(), 0, 10))
+    for k in range(10):
+        # A single run, as in RandomAlgorithm.solution without vectorized.
+        solution = Algorithm.solution(algorithm(I, rng=streams.generator(I, algorithm.name(), k), **kwargs))
+        assert list(block.f[k]) == solution.f and list(block.r[k]) == solution.r
+        assert block.cost[k] == solution.cost
+
+
+@pytest.mark.parametrize("algorithm, kwargs", ALGORITHMS)
+def test_modes_agree_up_to_rounding(algorithm, kwargs):
+    # With epsilon 0 both modes run all 64 + 128 runs: the vectorized one in two blocks.
+    solutions = [algorithm(I, **kwargs).solution(max_iter=192, epsilon=0, vectorized=vectorized, streams=Streams(3))
+                 for vectorized in (False, True)]
+    scalar, vectorized = (solution.cost for solution in solutions)
+    assert scalar.count == vectorized.count == 192
+    assert scalar.min == vectorized.min and scalar.max == vectorized.max
+    # Only the trajectories are bit-identical, the statistics are accumulated in another order.
+    assert scalar.mean == pytest.approx(vectorized.mean, rel=1e-12)
+    assert scalar.std == pytest.approx(vectorized.std, rel=1e-9)
+    for (f, r), (f_block, r_block) in zip(*solutions):
+        assert f.mean == pytest.approx(f_block.mean, rel=1e-12, abs=1e-12)
+        assert r.mean == pytest.approx(r_block.mean, rel=1e-12, abs=1e-12)
@@ -0,0 +1,52 @@
+import json
+import pytest
+from algorithms.FastGreedy import FastGreedy
+from algorithms.Qthreshold import QThreshold
+from algorithms.sweep import Sweep, grid
+
+CELLS = grid([4, 6], 5, [16, 32], 0, {QThreshold: {'q': [0.25, 0.5]}, FastGreedy: {}})
+
+
+def state(sweep):
+    return {key: (int(ratio.k), float(ratio.M), float(ratio.S)) for key, ratio in sweep.results().items()}
+
+
+def sweep(cells, **kwargs):
+    return Sweep(cells, target=1e-9, min_samples=20, max_samples=60, block=20, seed=5, **kwargs)
+
+
+def test_resumed_sweep_equals_uninterrupted(tmp_path):
+    uninterrupted = sweep(CELLS)
+    uninterrupted.run()
+    assert uninterrupted.finished
+    checkpoint = str(tmp_path / "sweep.json")
+    sweep(CELLS, checkpoint=checkpoint).run(rounds=1)
+    resumed = sweep(CELLS, checkpoint=checkpoint)
+    assert not resumed.finished
+    resumed.run()
+    assert state(resumed) == state(uninterrupted)
+
+
+def test_sweep_does_not_depend_on_the_other_cells():
+    everything = sweep(CELLS)
+    everything.run()
+    # Reversed, without the first instance parameters, and with a new n in front.
+    cells = grid(8, 5, 16, 0, [FastGreedy]) + [cell for cell in reversed(CELLS) if cell.instances != CELLS[0].instances]
+    fewer = sweep(cells)
+    fewer.run()
+    expected = state(everything)
+    assert {key: expected[key] for key in state(fewer) if key in expected} == \
+        {key: value for key, value in state(fewer).items() if key in expected}
+    assert len(expected.keys() & state(fewer).keys()) == len(cells) - 1
+
+
+def test_checkpoint_from_positional_seeding_is_rejected(tmp_path):
+    checkpoint = str(tmp_path / "sweep.json")
+    sweep(CELLS, checkpoint=checkpoint).run(rounds=1)
+    with open(checkpoint) as f:
+        data = json.load(f)
+    del data['spawn_key']
+    with open(checkpoint, 'w') as f:
+        json.dump(data, f)
+    with pytest.raises(AssertionError, match="older Sweep"):
+        sweep(CELLS, checkpoint=checkpoint)
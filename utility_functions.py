@@ -1,11 +1,13 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from random import randint, normalvariate
 from typing import Iterable
-from tqdm import tqdm
+from collections import defaultdict
 from itertools import *
 from algorithms.strike import *
 from algorithms.offline import *
+from algorithms.store import InstanceStore
+from algorithms.cache import offline_cached
+from algorithms.sketch import Summary
 
 # function to randomly generate test instances with certain bounds
 def generate_test_instances(N=1, n=100, m=10, s=100, p=(10,100), h=(10,100), r='uniform'):
@@ -35,49 +37,72 @@ def generate_test_instances(N=1, n=100, m=10, s=100, p=(10,100), h=(10,100), r='
                        [randint(h_min, h_max) for _ in range(m)],
                        p_max, h_max)
         case 'normal':
-            # Assuming the normal distribution is not skewed.
-            mu_n = (n_max - n_min) / 2
-            mu_m = (m_max - m_min) / 2
-            mu_s = (s_max - s_min) / 2
-            mu_p = (p_max - p_min) / 2
-            mu_h = (h_max - h_min) / 2
-
-            # Assuming that a normal distribution in the root form has 3 standard deviations from both sides of the mean (and is not skewed as well).
-            sigma_n = (n_max - n_min) / 6
-            sigma_m = (m_max - m_min) / 6
-            sigma_s = (s_max - s_min) / 6
-            sigma_p = (p_max - p_min) / 6
-            sigma_h = (h_max - h_min) / 6
+            # Assuming the normal distribution is not skewed: centred in the range,
+            # with 3 standard deviations to either side, redrawn when outside of it.
+            def sample(low, high):
+                while True:
+                    x = round(normalvariate((low + high) / 2, (high - low) / 6))
+                    if low <= x <= high:
+                        return x
 
             for _ in range(N):
-                yield BoundedInstance(round(normalvariate(mu_n, sigma_n)),
-                       m := round(normalvariate(mu_m, sigma_m)),
-                       [round(normalvariate(mu_s, sigma_s)) for _ in range(m)],
-                       [round(normalvariate(mu_p, sigma_p)) for _ in range(m)],
-                       [round(normalvariate(mu_h, sigma_h)) for _ in range(m)],
+                yield BoundedInstance(sample(n_min, n_max),
+                       m := sample(m_min, m_max),
+                       [sample(s_min, s_max) for _ in range(m)],
+                       [sample(p_min, p_max) for _ in range(m)],
+                       [sample(h_min, h_max) for _ in range(m)],
                        p_max, h_max)
 
 
+# function that computes the optimal offline costs of many instances at once
+def offline_costs(instances: Iterable[Instance]) -> np.ndarray:
+    '''
+    INPUT:
+        instances (list[tuples])    -   a list containing (random) test instances
+    OUTPUT:
+        costs (np.ndarray)  -   the optimal offline cost of every instance, computed with
+                                offline_batch on groups of instances with the same m
+    '''
+    if isinstance(instances, InstanceStore):
+        costs = np.empty(len(instances), dtype=np.int64)
+        for ks, B in instances.batches():
+            costs[ks] = offline_batch(B.n, B.s, B.p, B.h)
+        return costs
+    instances = list(instances)
+    costs = np.empty(len(instances), dtype=np.int64)
+    by_m = defaultdict(list)
+    for k, I in enumerate(instances):
+        by_m[I.m].append(k)
+    for ks in by_m.values():
+        group = [instances[k] for k in ks]
+        costs[ks] = offline_batch([I.n for I in group], [I.s for I in group],
+                                  [I.p for I in group], [I.h for I in group])
+    return costs
+
+
 # function that runs an online algorithm and possible tests its solution against optimal offline solution
-def test_online(N: int, instances: Iterable[Instance], algorithm: type[Algorithm], *args, min_iter=1e3, epsilon=1e-5, **kwargs):
+def test_online(N: int, instances: Iterable[Instance], algorithm: type[Algorithm], *args, min_iter=1e3, epsilon=1e-5, opt_costs=None, **kwargs):
     '''
     INPUT:
         instances (list[tuples])    -   a list containing (random) test instances
         online_algorithm    -   an object that takes as input (n,m) and has a function/object that
                                 that can be called repeatedly in a loop
+        opt_costs (np.ndarray)  -   optional precomputed offline costs (see offline_costs); otherwise
+                                    the optimum comes from the in-memory offline cache, so it is
+                                    still not recomputed for every algorithm
     OUTPUT:
         data (list[tuples])     -   list containing the relevant data (c-ratios and costs)
     '''
 
     data = np.zeros((N, 3))
     avg_ratio = 0
+    from tqdm import tqdm
     for i, I in tqdm(zip(range(N), instances), total=N):
         # run the online algoritm on the instance (cost is stored in 'data' variable)
         online_solution = algorithm(I, *args, **kwargs).solution()
-        offline_solution = offline(I)
 
         online_cost = float(online_solution.cost)
-        offline_cost = float(offline_solution.cost)
+        offline_cost = float(opt_costs[i] if opt_costs is not None else offline_cached(I).cost)
         ratio = online_cost / offline_cost
 
         data[i, 0] = ratio
@@ -102,7 +127,7 @@ def run_algorithms(n: int, m: int, p_max: int, h_max: int,
                    *algorithms: tuple[type[Algorithm], tuple, dict],
                    max_iter: int = 1e5):
     """Run the algorithms on random instances."""
-    for _ in range(max_iter):
+    for _ in range(int(max_iter)):
         I = BoundedInstance.random(n, m, p_max, h_max)
         optimal = offline(I)
         for algorithm, args, kwargs in algorithms:
@@ -122,10 +147,8 @@ def vary_and_track_ratios(n: int|range, m: int|range,
     assert sum(isinstance(x, range) for x in (n, m, p_max, h_max)) == 1, \
         "exactly one of n, m, p_max, h_max must be a range"
 
-    n = repeat(n) if isinstance(n, int) else x := n
-    m = repeat(m) if isinstance(m, int) else x := m
-    p_max = repeat(p_max) if isinstance(p_max, int) else x := p_max
-    h_max = repeat(h_max) if isinstance(h_max, int) else x := h_max
+    x = next(v for v in (n, m, p_max, h_max) if isinstance(v, range))
+    n, m, p_max, h_max = (repeat(v) if isinstance(v, int) else v for v in (n, m, p_max, h_max))
 
     ratios = {alg.name(): [Welford() for _ in x] for alg, _, _ in algorithms}
     for i, (n, m, p_max, h_max) in enumerate(zip(n, m, p_max, h_max)):
@@ -138,14 +161,22 @@ def vary_and_track_ratios(n: int|range, m: int|range,
 
 def track_ratios(n: int, m: int, p_max: int, h_max: int,
                  *algorithms: tuple[type[Algorithm], tuple, dict],
-                 max_iter: int = 1e5):
+                 max_iter: int = 1e5, block: int = 1024):
     """
     Basically a replacement for test_online, except no early termination (yet).
+    For each algorithm, the ratios are kept in a sketch.Summary (mean, std,
+    quantiles and histogram) instead of a list, so memory does not grow with max_iter.
+    The ratios are added in blocks of up to block per algorithm.
     """
-    ratios = {alg.name(): [] for alg, _, _ in algorithms}
+    ratios = {alg.name(): Summary() for alg, _, _ in algorithms}
+    buffers = {alg_name: [] for alg_name in ratios}
     for alg_name, solution, optimal in run_algorithms(n, m, p_max, h_max, *algorithms, max_iter=max_iter):
-        ratio = float(solution.cost) / float(optimal.cost)
-        ratios[alg_name].append(ratio)
+        buffers[alg_name].append(float(solution.cost) / float(optimal.cost))
+        if len(buffers[alg_name]) >= block:
+            ratios[alg_name].update(buffers[alg_name])
+            buffers[alg_name] = []
+    for alg_name, buffer in buffers.items():
+        ratios[alg_name].update(buffer)
     return ratios
 
 
@@ -156,13 +187,27 @@ def plot_data(save_location, file_name, *data):
         histogram_plot_data(save_location, file_name, data[0])
 
 def histogram_plot_data(save_location, file_name, data):
+    import matplotlib.pyplot as plt
     plt.figure(dpi=300)
     plt.hist(data[:,0])
     plt.title("Histogram of observed competitive ratios")
     plt.yscale('log')
     plt.savefig(f'{save_location}/{file_name}')
 
+def violin_plot_summaries(save_location, file_name, summaries):
+    """Violin plot from sketch.Summary objects by label, e.g. from track_ratios, without the raw ratios."""
+    import matplotlib.pyplot as plt
+    labels = list(summaries)
+    plt.figure(dpi=300).subplots_adjust(bottom=0.2)
+    plt.gca().violin([summary.violin() for summary in summaries.values()], showmeans=True)
+    plt.rcParams.update({'xtick.labelsize': 'small'})
+    plt.xticks(ticks = range(1, len(labels) + 1), labels = labels)
+    plt.title("Violin plot of observed competitive ratios")
+    plt.yscale('log')
+    plt.savefig(f'{save_location}/{file_name}')
+
 def violin_plot_data(save_location, file_name, data):
+    import matplotlib.pyplot as plt
     labels = [point[1] for point in data]
     data = [point[0][:,0] for point in data]
     plt.figure(dpi=300).subplots_adjust(bottom=0.2)
@@ -1,19 +1,24 @@
 import pandas as pd
 import matplotlib.pyplot as plt
-import os
+
+from algorithms.results import open_results
 
 names = {"FastGreedy_m" : "$\mathrm{ALG}_3$", "FastGreedy_n" : "$\mathrm{ALG}_3$", "FastGreedy_p_max" : "$\mathrm{ALG}_3$",
          "QThreshold_m" : "$\mathrm{ALG}_2$", "QThreshold_n" : "$\mathrm{ALG}_2$", "QThreshold_p_max" : "$\mathrm{ALG}_2$",
+         "GreedyOnline_m" : "$\mathrm{ALG}_4$", "GreedyOnline_n" : "$\mathrm{ALG}_4$", "GreedyOnline_p_max" : "$\mathrm{ALG}_4$",
          "Random_m" : "$\mathrm{ALG}_5$", "Random_n" : "$\mathrm{ALG}_5$", "Random_p_max" : "$\mathrm{ALG}_5$",
          "RandomizedPmax_m" : "$\mathrm{ALG}_6$", "RandomizedPmax_n" : "$\mathrm{ALG}_6$", "RandomizedPmax_p_max" : "$\mathrm{ALG}_6$"}
-names2 = {"Random": "$\mathrm{ALG}_5$", "RandomizedPmax": "$\mathrm{ALG}_6$", "QThreshold": "$\mathrm{ALG}_2$", "FastGreedy": "$\mathrm{ALG}_3$"}
+names2 = {"Random": "$\mathrm{ALG}_5$", "RandomizedPmax": "$\mathrm{ALG}_6$", "QThreshold": "$\mathrm{ALG}_2$", "FastGreedy": "$\mathrm{ALG}_3$", "GreedyOnline": "$\mathrm{ALG}_4$"}
+
+def algorithms(store):
+    return sorted(set(store.load(['algorithm'])['algorithm']))
 
-def plot_means(file_path, param):
-    df = pd.read_csv(file_path, delimiter=',', header = 0)[[param,'mean']]
+def plot_means(store, alg, param):
+    df = pd.DataFrame(store.load([param, 'mean'], algorithm=alg))
     means = (df.groupby(param).mean())
     stds = (df.groupby(param).std())
     # print(stds)
-    label = file_path.split("/")[1].split(".")[0]
+    label = f"{alg}_{param}"
     mean_min_std = means['mean'] - stds['mean']
     mean_plus_std = means['mean'] + stds['mean']
     plt.plot(means.index, means['mean'], label = names[label])
@@ -38,44 +43,34 @@ def violin_plot_data(save_location, file_name, data):
     plt.yscale('log')
     plt.savefig(f'{save_location}/{file_name}')
 
-data_files = os.listdir("data")
-m_files, n_files, p_max_files, violin_files = [], [], [], []
-
-for file in data_files:
-    if "_n.csv" in file:
-        n_files.append(file)
-    elif "_m.csv" in file:
-        m_files.append(file)
-    elif "_p_max.csv" in file:
-        p_max_files.append(file)
-    else:
-        violin_files.append(file)
-
 plt.figure()
-for file in n_files:
-    plot_means(f'data/{file}', 'n')
+n_results = open_results("n")
+for alg in algorithms(n_results):
+    plot_means(n_results, alg, 'n')
 plt.legend()
 plt.savefig("figures/chpt6/n", dpi=300)
 #plt.show()
 
 plt.figure()
-for file in m_files:
-    plot_means(f'data/{file}', 'm')
+m_results = open_results("m")
+for alg in algorithms(m_results):
+    plot_means(m_results, alg, 'm')
 plt.legend()
 plt.savefig("figures/chpt6/m", dpi=300)
 #plt.show()
 
 plt.figure()
-for file in p_max_files:
-    plot_means(f'data/{file}', 'p_max')
+p_max_results = open_results("p_max")
+for alg in algorithms(p_max_results):
+    plot_means(p_max_results, alg, 'p_max')
 plt.legend()
 plt.savefig("figures/chpt6/pmax", dpi=300)
 #plt.show()
 
 violin_data = []
 
-for file in violin_files:
-    label = file.split("_violin")[0]
-    df = pd.read_csv(f'data/{file}', delimiter=',', header = 0)
-    violin_data.append((df, label))
+violin_results = open_results("violin")
+for alg in algorithms(violin_results):
+    df = pd.DataFrame(violin_results.load(['mean'], algorithm=alg))
+    violin_data.append((df, alg))
 violin_plot_data("figures", "violin.png", violin_data)